@@ -0,0 +1,84 @@
+"""
+In-process micro-benchmarks of the pytest-apibean hot paths.
+"""
+
+import timeit
+from types import SimpleNamespace
+
+from dependency_injector import containers, providers
+
+from apibean.pytest.phases import phase
+from apibean.pytest.seeders import SeederIndex, seed_fingerprint
+from apibean.pytest.tokens import TokenCache
+from apibean.pytest.wrappers.container import ServiceWrappingMeta
+
+
+class AuthService:
+    pass
+
+
+class AppContainer(containers.DeclarativeContainer):
+    auth_service = providers.Singleton(AuthService)
+
+
+def _inject(service, api_invoker):
+    return service
+
+
+def _wrapped_container(mode):
+    class TestContainer(AppContainer, metaclass=ServiceWrappingMeta,
+                        injected_func_name="inject", wrapping_mode=mode):
+        api_invoker = providers.Object(object())
+        inject = _inject
+
+    return TestContainer()
+
+
+def _reference():
+    # plain Python work of the same order as the hot paths measured
+    return sum(i * i for i in range(20))
+
+
+def _best_us(func, number: int, repeat: int) -> tuple[float, float]:
+    """
+    Return the best cost of one call of ``func`` and of ``_reference()``,
+    in microseconds. Both are timed in alternation, so that they are
+    equally affected by the load of the machine.
+    """
+    timings, references = [], []
+    for _ in range(repeat):
+        references.append(timeit.timeit(_reference, number=number))
+        timings.append(timeit.timeit(func, number=number))
+    return min(timings) / number * 1e6, min(references) / number * 1e6
+
+
+def measure(number: int = 5000, repeat: int = 20) -> dict[str, tuple[float, float]]:
+    """
+    Return the cost of one call of every hot path, in microseconds, along
+    with the cost of a reference function timed alongside it.
+    """
+    results = {}
+
+    for mode in ("callable", "scoped", "cached"):
+        container = _wrapped_container(mode)
+        results[f"wrapped_service_{mode}"] = _best_us(container.auth_service, number, repeat)
+
+    markers = [SimpleNamespace(args=("users.basic",), kwargs={"count": 3}),
+               SimpleNamespace(args=("orgs.basic",), kwargs={})]
+    results["seed_fingerprint"] = _best_us(lambda: seed_fingerprint(markers), number, repeat)
+
+    index = SeederIndex()
+    index._classes[("tests.seeders", "users")] = AuthService
+    results["seeder_index_resolve"] = _best_us(
+        lambda: index.resolve("tests.seeders", "users", "users.basic"), number, repeat,
+    )
+
+    cache = TokenCache()
+    cache.store("login", "root", None, "secret", "token")
+    results["token_cache_hit"] = _best_us(
+        lambda: cache.get("login", "root", None, "secret", lambda: "token"), number, repeat,
+    )
+
+    config = SimpleNamespace(stash={})
+    results["phase_noop"] = _best_us(lambda: phase(config, "test", "seeder"), number, repeat)
+    return results
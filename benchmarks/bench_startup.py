@@ -0,0 +1,64 @@
+"""
+Measure the import cost of the pytest-apibean plugin.
+
+Each sample imports ``apibean.pytest.plugin`` in a fresh interpreter with
+``-X importtime`` after pytest itself has been imported, so that only the
+cost added by the plugin is reported. The median of all samples is compared
+against a budget:
+
+    python benchmarks/bench_startup.py --samples 15 --budget-ms 25
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+PLUGIN_MODULE = "apibean.pytest.plugin"
+
+
+def sample_import_times() -> dict[str, int]:
+    """
+    Return the cumulative import times, in microseconds, of the top-level
+    modules imported by ``import pytest; import <plugin>``.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import pytest; import {PLUGIN_MODULE}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time: <self us> | <cumulative us> | <module>
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() in ("pytest", PLUGIN_MODULE):
+            times[parts[2].strip()] = int(parts[1])
+    if PLUGIN_MODULE not in times:
+        raise RuntimeError(f"{PLUGIN_MODULE} not found in -X importtime output")
+    return times
+
+
+def sample_import_us() -> int:
+    """Return the cumulative import time of the plugin module, in microseconds"""
+    return sample_import_times()[PLUGIN_MODULE]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    samples = sorted(sample_import_us() / 1000 for _ in range(args.samples))
+    median = statistics.median(samples)
+    print(f"plugin import: median {median:.2f} ms, min {samples[0]:.2f} ms, max {samples[-1]:.2f} ms")
+
+    if args.budget_ms is not None and median > args.budget_ms:
+        print(f"over budget: {median:.2f} ms > {args.budget_ms:.2f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Fixture-overhead benchmark suite for pytest-apibean.
+
+Measures, against stored baselines:
+
+- the per-test overhead of ``apibean_testcase_loop``, of seed resolution in
+  ``apibean_seed_data`` and of the login fixtures, on synthetic suites of
+  1k and 10k tests (``suites.py``)
+- the cost of the hot paths called thousands of times per run, including
+  ``ServiceWrappingMeta`` provider resolution (``bench_micro.py``)
+- the import cost of the plugin (``bench_startup.py``)
+
+Values are reported in microseconds, but absolute timings only hold on the
+machine they were taken on. Every value is therefore measured along with a
+reference taken in the same run, and ``baselines.json`` stores the ratio
+of the two:
+
+- suites: the per-test time of the same suite with the plugin disabled
+- micro-benchmarks: a plain Python function timed in the same process
+- plugin import: the import time of pytest in the same interpreter
+
+Typical usage:
+
+    python benchmarks/run.py --check           # compare with baselines.json
+    python benchmarks/run.py --update          # store new baselines
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import bench_micro
+import bench_startup
+import suites
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+
+def collect(sizes: list[int], repeat: int) -> dict[str, tuple[float, float]]:
+    """Return ``(value, reference)`` pairs in microseconds, by benchmark name"""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="apibean-bench-") as root:
+        for size in sizes:
+            results.update(suites.measure(Path(root), size, repeat))
+    results.update(bench_micro.measure())
+    bench_startup.sample_import_times()  # warm-up
+    samples = [bench_startup.sample_import_times() for _ in range(max(repeat, 5))]
+    results["plugin_import"] = (
+        min(sample[bench_startup.PLUGIN_MODULE] for sample in samples),
+        min(sample["pytest"] for sample in samples),
+    )
+    return results
+
+
+def compare(ratios: dict[str, float], baselines: dict[str, float], tolerance: float) -> list[str]:
+    regressions = []
+    for name, ratio in ratios.items():
+        baseline = baselines.get(name)
+        if baseline is not None and ratio > baseline * (1 + tolerance):
+            regressions.append(f"{name}: x{ratio:.3f} > x{baseline:.3f} (+{tolerance:.0%})")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="pytest-apibean fixture-overhead benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=1.0,
+                        help="allowed increase of a ratio over its baseline (default: 1.0, i.e. 100%%)")
+    parser.add_argument("--check", action="store_true", help="fail when a value regresses")
+    parser.add_argument("--update", action="store_true", help=f"write results to {BASELINES.name}")
+    args = parser.parse_args(argv)
+
+    results = collect(args.sizes, args.repeat)
+    ratios = {name: value / reference for name, (value, reference) in results.items()}
+    baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    for name, (value, reference) in results.items():
+        baseline = baselines.get(name)
+        expected = f"  (baseline x{baseline:.3f})" if baseline is not None else ""
+        print(f"{name:<32} {value:>12.2f}us  x{ratios[name]:<8.3f}{expected}")
+
+    if args.update:
+        BASELINES.write_text(json.dumps({k: round(v, 4) for k, v in ratios.items()}, indent=2) + "\n")
+        print(f"baselines written to {BASELINES}")
+
+    if args.check:
+        regressions = compare(ratios, baselines, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
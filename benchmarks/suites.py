@@ -0,0 +1,151 @@
+"""
+Synthetic pytest-apibean test suites used to measure per-test overhead.
+
+Every suite runs ``size`` trivial tests against a fake ``apibean_container``
+and ``apibean_db``, so that the measured time is the cost added by the
+plugin fixtures rather than by any application code.
+"""
+
+import subprocess
+import sys
+import textwrap
+import time
+from pathlib import Path
+
+SEEDERS = 10
+
+CONFTEST = '''
+import pytest
+
+class AuthService:
+    def login(self, data):
+        return {"access_token": "token-" + data["username"]}
+
+class Container:
+    def auth_service(self):
+        return AuthService()
+
+class Config:
+    ROOT_USER_EMAIL = "root@example.com"
+    ROOT_USER_PASSWORD = "secret"
+    SYNC_USER_EMAIL = "sync@example.com"
+    SYNC_USER_PASSWORD = "secret"
+
+@pytest.fixture(scope="session")
+def apibean_container():
+    return Container()
+
+@pytest.fixture(scope="session")
+def apibean_db():
+    return object()
+
+@pytest.fixture
+def apibean_reset_db():
+    pass
+
+@pytest.fixture
+def apibean_config():
+    return Config()
+'''
+
+SEEDER = '''
+class Synthetic{index}Seeder:
+    def __init__(self, seed, session, container, **kwargs):
+        self.container = container
+
+    def run(self):
+        pass
+'''
+
+# scenario name -> (test module source, plugin enabled)
+SCENARIOS = {
+    "bare": ('''
+        import pytest
+
+        @pytest.mark.parametrize("i", range({size}))
+        def test_case(i):
+            pass
+    ''', False),
+    "loop": ('''
+        import pytest
+
+        @pytest.mark.parametrize("i", range({size}))
+        def test_case(i):
+            pass
+    ''', True),
+    "seeds": ('''
+        import pytest
+
+        CASES = [
+            pytest.param(i, marks=pytest.mark.seed(f"synthetic_{{i % {seeders}}}.basic"))
+            for i in range({size})
+        ]
+
+        @pytest.mark.parametrize("i", CASES)
+        def test_case(i):
+            pass
+    ''', True),
+    "login": ('''
+        import pytest
+
+        @pytest.mark.parametrize("i", range({size}))
+        def test_case(root_access_token, i):
+            assert root_access_token
+    ''', True),
+}
+
+
+def write_suite(root: Path, scenario: str, size: int) -> Path:
+    source, _ = SCENARIOS[scenario]
+    suite = root / f"{scenario}_{size}"
+    seeders = suite / "tests" / "seeders"
+    seeders.mkdir(parents=True, exist_ok=True)
+    (suite / "tests" / "__init__.py").write_text("")
+    (seeders / "__init__.py").write_text("")
+    for index in range(SEEDERS):
+        (seeders / f"synthetic_{index}_seeder.py").write_text(SEEDER.format(index=index))
+    (suite / "conftest.py").write_text(CONFTEST)
+    (suite / "test_synthetic.py").write_text(
+        textwrap.dedent(source).format(size=size, seeders=SEEDERS)
+    )
+    return suite
+
+
+def run_suite(suite: Path, plugin: bool) -> float:
+    """Run a synthetic suite in a fresh interpreter and return its wall time"""
+    command = [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "-p", "no:xdist"]
+    if not plugin:
+        command += ["-p", "no:pytest_apibean"]
+    started = time.perf_counter()
+    result = subprocess.run(command, cwd=suite, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"synthetic suite {suite.name} failed:\n{result.stdout}\n{result.stderr}")
+    return elapsed
+
+
+def measure(root: Path, size: int, repeat: int) -> dict[str, tuple[float, float]]:
+    """
+    Return the per-test overhead of every scenario, in microseconds, along
+    with the per-test time of the ``bare`` scenario as its reference.
+
+    The overhead is measured against the ``bare`` scenario, which runs the
+    same tests with the plugin disabled. Every suite runs once to warm up
+    the file system and interpreter caches, then the scenarios run in turn
+    ``repeat`` times, so that they are equally affected by the load of the
+    machine; the fastest run of each is kept.
+    """
+    suites = {scenario: write_suite(root, scenario, size) for scenario in SCENARIOS}
+    runs = {scenario: [] for scenario in SCENARIOS}
+    for attempt in range(repeat + 1):
+        for scenario, (_, plugin) in SCENARIOS.items():
+            elapsed = run_suite(suites[scenario], plugin)
+            if attempt:
+                runs[scenario].append(elapsed)
+    timings = {scenario: min(elapsed) for scenario, elapsed in runs.items()}
+    reference = timings["bare"] / size * 1e6
+    return {
+        f"suite_{scenario}_{size}": ((timings[scenario] - timings["bare"]) / size * 1e6, reference)
+        for scenario in SCENARIOS
+        if scenario != "bare"
+    }
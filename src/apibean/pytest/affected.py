@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import hashlib
+import inspect
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import pytest
+
+CACHE_KEY = "apibean/affected"
+
+def file_digest(path: str) -> Optional[str]:
+    """
+    Return a digest of the content of a file, or ``None`` if it cannot be
+    read. Digests are cached by path, size and modification time.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return _file_digest(path, stat.st_size, stat.st_mtime_ns)
+
+
+@lru_cache(maxsize=None)
+def _file_digest(path: str, size: int, mtime_ns: int) -> Optional[str]:
+    try:
+        return hashlib.blake2b(Path(path).read_bytes(), digest_size=16).hexdigest()
+    except OSError:
+        return None
+
+
+def _source_file(obj: Any) -> Optional[str]:
+    try:
+        return inspect.getsourcefile(obj)
+    except TypeError:
+        return None
+
+
+def _relative(config: pytest.Config, path: str) -> str:
+    try:
+        return Path(path).resolve().relative_to(config.rootpath).as_posix()
+    except ValueError:
+        return Path(path).as_posix()
+
+
+def _digests(config: pytest.Config, paths: Iterable[Optional[str]]) -> dict[str, Optional[str]]:
+    return {_relative(config, path): file_digest(str(Path(path).resolve())) for path in paths if path}
+
+
+def item_files(config: pytest.Config, item, steps: Optional[list]) -> dict[str, Optional[str]]:
+    """
+    Return the digests of the files a test depends on: its test module and
+    the source (or data) file of every seeder in its seed plan.
+    """
+    paths = [str(item.path)]
+    for step in steps or ():
+        paths.append(str(getattr(step.seeder_cls, "path", None) or _source_file(step.seeder_cls) or ""))
+    return _digests(config, paths)
+
+
+def service_files(config: pytest.Config, container) -> dict[str, Optional[str]]:
+    """
+    Return the digests of the source files of the container class and of
+    the services wrapped by ``ServiceWrappingMeta``.
+    """
+    declarative = getattr(container, "declarative_parent", None) or type(container)
+    paths = {_source_file(cls) for cls in declarative.__mro__ if cls.__module__ != "builtins"}
+    for name in getattr(declarative, "__apibean_wrapped_services__", ()):
+        provider = container.providers.get(name)
+        parent = getattr(provider, "parent", None)
+        provides = getattr(parent, "provides", None)
+        if provides is not None:
+            paths.add(_source_file(provides))
+    return _digests(config, sorted(path for path in paths if path and "site-packages" not in path))
+
+
+def conftest_files(config: pytest.Config) -> dict[str, Optional[str]]:
+    paths = [
+        getattr(plugin, "__file__", None)
+        for plugin in config.pluginmanager.get_plugins()
+        if getattr(plugin, "__name__", "").rpartition(".")[2] == "conftest"
+    ]
+    return _digests(config, sorted(path for path in paths if path))
+
+
+def _changed(config: pytest.Config, files: dict) -> bool:
+    """Return whether any recorded file digest differs from the file on disk"""
+    return any(
+        file_digest(str(config.rootpath / path)) != digest
+        for path, digest in files.items()
+    )
+
+
+def select_affected(config: pytest.Config, items: list, files_key) -> tuple[list, list]:
+    """
+    Split items into ``(selected, deselected)`` using the record of the
+    last passing run stored in the pytest cache.
+
+    Every test is selected when there is no record, or when a conftest file
+    or a file of the container and its wrapped services changed since.
+    Otherwise a test is selected when it has no record, or when the
+    digests of its test module or seeder files differ from the recorded
+    ones.
+    """
+    record = config.cache.get(CACHE_KEY, None)
+    if not record or "global" not in record or _changed(config, record["global"]):
+        return items, []
+    if conftest_files(config).keys() - record["global"].keys():
+        return items, []
+
+    tests = record.get("tests", {})
+    selected, deselected = [], []
+    for item in items:
+        recorded = tests.get(item.nodeid)
+        if recorded is not None and recorded == item.stash.get(files_key, None):
+            deselected.append(item)
+        else:
+            selected.append(item)
+    return selected, deselected
+
+
+class AffectedRecorder:
+    """
+    Plugin collecting, from test reports, the file digests of the tests
+    that passed, and storing them in the pytest cache at the end of the
+    session.
+
+    A test is recorded only when none of its phases failed; failed tests
+    are dropped from the record, so they are selected again by
+    ``--apibean-affected``. The global digests (conftest files, container
+    and wrapped services) are only updated after a passing session, and
+    are merged with the previous ones.
+
+    With pytest-xdist, the recorder runs on the controller and receives
+    the digests computed by the workers as attributes of their reports.
+    """
+
+    def __init__(self, config: pytest.Config):
+        self.config = config
+        self.tests: dict[str, dict] = {}
+        self.failed: set[str] = set()
+        self.services: dict[str, Optional[str]] = {}
+
+    def pytest_runtest_logreport(self, report) -> None:
+        nodeid = report.nodeid
+        if report.failed:
+            self.failed.add(nodeid)
+        services = getattr(report, "apibean_services", None)
+        if services:
+            self.services.update(services)
+        files = getattr(report, "apibean_files", None)
+        if report.when == "teardown" and files is not None and nodeid not in self.failed:
+            self.tests[nodeid] = files
+
+    def pytest_sessionfinish(self, session, exitstatus) -> None:
+        record = self.config.cache.get(CACHE_KEY, None) or {}
+        tests = record.get("tests", {})
+        for nodeid in self.failed:
+            tests.pop(nodeid, None)
+        tests.update(self.tests)
+        record["tests"] = tests
+        if exitstatus == pytest.ExitCode.OK:
+            # merged rather than replaced: a session running a subset of the
+            # tests may not have recorded the container and service files
+            previous = {
+                path: digest for path, digest in record.get("global", {}).items()
+                if (self.config.rootpath / path).exists()
+            }
+            record["global"] = {**previous, **conftest_files(self.config), **self.services}
+        self.config.cache.set(CACHE_KEY, record)
+
+
+item_files_key = pytest.StashKey[dict]()
+service_files_key = pytest.StashKey[dict]()
@@ -0,0 +1,418 @@
+"""
+Record/replay cache for calls made through the ``api_invoker``.
+
+A cassette is made of two files:
+
+- ``<path>`` holds the recorded responses, JSON encoded and appended one
+  after the other (see ``encode_response()``)
+- ``<path>.idx`` is a sorted array of fixed-size entries
+  ``(request digest, offset, length)`` pointing into the data file
+
+In replay, both files are memory-mapped and responses are found with a
+binary search on the index, so opening a large cassette costs nothing and
+only the replayed responses are read.
+
+Cassettes are committed with the tests and replayed from any branch, so
+they only ever hold data: JSON values and HTTP responses (status, headers
+and body), never pickled objects.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import decimal
+import base64
+import enum
+import fnmatch
+import hashlib
+import inspect
+import json
+import mmap
+import os
+import struct
+import tempfile
+import uuid
+import warnings
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import pytest
+
+CASSETTE_MODES = ("off", "record", "replay", "hybrid")
+
+_MAGIC = b"APBC\x02"
+_ENTRY = struct.Struct(">16sQI")
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode for a request that was never recorded"""
+
+
+def request_digest(endpoint: str, args: tuple, kwargs: dict) -> bytes:
+    """
+    Return the digest identifying a request in a cassette.
+
+    Arguments must have a stable serialization: JSON values, sets, bytes,
+    dates, ``UUID``, ``Decimal``, ``Path``, enums, dataclasses and models
+    exposing ``model_dump()``. Other objects raise ``TypeError``, since
+    their ``repr()`` may hold an address that changes between runs and the
+    request could never be replayed.
+    """
+    try:
+        payload = json.dumps([endpoint, args, kwargs], sort_keys=True, default=_stable, separators=(",", ":"))
+    except TypeError as e:
+        raise TypeError(f"apibean cassette cannot identify the request {endpoint}: {e}") from e
+    return hashlib.blake2b(payload.encode(), digest_size=16).digest()
+
+
+def _stable(value: Any) -> Any:
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=lambda item: json.dumps(item, sort_keys=True, default=_stable))
+    if isinstance(value, (bytes, bytearray)):
+        return {"bytes": bytes(value).hex()}
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime.date, datetime.time, uuid.UUID, decimal.Decimal, Path)):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if callable(getattr(value, "model_dump", None)):
+        return value.model_dump(mode="json")
+    raise TypeError(f"arguments of type {type(value).__name__} have no stable serialization")
+
+
+class RecordedResponse:
+    """
+    HTTP response replayed from a cassette when the recorded response was
+    not an ``httpx.Response`` (or httpx is not installed).
+    """
+
+    def __init__(self, status_code: int, headers: list, content: bytes):
+        self.status_code = status_code
+        self.headers = dict(headers)
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode()
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+def encode_response(response: Any) -> bytes:
+    """
+    Serialize a recorded response as JSON.
+
+    HTTP responses, objects exposing ``status_code``, ``headers`` and
+    ``content`` (httpx and requests responses), are stored as their
+    status, headers and body. Other responses must be JSON values; anything
+    else raises ``TypeError``.
+    """
+    if all(hasattr(response, name) for name in ("status_code", "headers", "content")):
+        # content is already decoded: its original encoding no longer applies
+        headers = [
+            [name, value] for name, value in response.headers.items()
+            if name.lower() not in ("content-encoding", "content-length")
+        ]
+        record = {
+            "http": {
+                "status": response.status_code,
+                "headers": headers,
+                "body": base64.b64encode(response.content).decode(),
+                "httpx": type(response).__module__.startswith("httpx"),
+            }
+        }
+    else:
+        record = {"json": response}
+    try:
+        return json.dumps(record, separators=(",", ":")).encode()
+    except (TypeError, ValueError) as e:
+        raise TypeError(f"responses of type {type(response).__name__} cannot be recorded: {e}") from e
+
+
+def decode_response(payload: bytes) -> Any:
+    """Return the response serialized by ``encode_response()``"""
+    record = json.loads(payload)
+    if "json" in record:
+        return record["json"]
+    http = record["http"]
+    content = base64.b64decode(http["body"])
+    if http["httpx"]:
+        try:
+            import httpx
+        except ImportError:
+            pass
+        else:
+            return httpx.Response(http["status"], headers=http["headers"], content=content)
+    return RecordedResponse(http["status"], http["headers"], content)
+
+
+class Cassette:
+    """
+    Request/response store backing ``RecordingInvoker``.
+
+    ``mode`` is one of:
+
+    - ``"record"``: every call reaches the backend and its response is
+      recorded, replacing any previous recording of the same request
+    - ``"replay"``: every call is served from the cassette; unrecorded
+      requests raise ``CassetteMiss``
+    - ``"hybrid"``: calls to endpoints matching one of the ``cacheable``
+      patterns are replayed when recorded, and recorded otherwise; other
+      calls always reach the backend
+
+    Calls returning a coroutine are recorded once it is awaited, and
+    replayed as a coroutine. A response that cannot be serialized (see
+    ``encode_response()``) raises ``TypeError`` in record mode; in hybrid
+    mode it only warns, and the call keeps reaching the backend.
+    """
+
+    def __init__(self, path: os.PathLike | str, mode: str, cacheable: Iterable[str] = ()):
+        if mode not in CASSETTE_MODES or mode == "off":
+            raise ValueError(f"Invalid cassette mode: '{mode}' (must be one of record, replay, hybrid)")
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + ".idx")
+        self.mode = mode
+        self.cacheable = tuple(cacheable)
+        self._recorded: dict[bytes, bytes] = {}
+        self._data: Optional[mmap.mmap] = None
+        self._index: Optional[mmap.mmap] = None
+        self.hits = 0
+        self.misses = 0
+        self._open()
+
+    def is_cacheable(self, endpoint: str) -> bool:
+        return any(fnmatch.fnmatchcase(endpoint, pattern) for pattern in self.cacheable)
+
+    def call(self, endpoint: str, func, args: tuple, kwargs: dict) -> Any:
+        """
+        Serve ``func(*args, **kwargs)`` from the cassette, or call it and
+        record the response, according to the cassette mode.
+        """
+        replay = self.mode == "replay" or (self.mode == "hybrid" and self.is_cacheable(endpoint))
+        record = self.mode == "record" or (self.mode == "hybrid" and replay)
+        if not (replay or record):
+            return func(*args, **kwargs)
+
+        digest = request_digest(endpoint, args, kwargs)
+        if replay:
+            found, response = self.lookup(digest)
+            if found:
+                self.hits += 1
+                if _is_async(func):
+                    return _resolved(response)
+                return response
+            self.misses += 1
+            if not record:
+                raise CassetteMiss(f"No recorded response for {endpoint} in {self.path}")
+
+        response = func(*args, **kwargs)
+        if inspect.isawaitable(response):
+            return self._record_awaited(endpoint, digest, response)
+        self._record(endpoint, digest, response)
+        return response
+
+    async def _record_awaited(self, endpoint: str, digest: bytes, awaitable) -> Any:
+        response = await awaitable
+        self._record(endpoint, digest, response)
+        return response
+
+    def _record(self, endpoint: str, digest: bytes, response: Any) -> None:
+        try:
+            self._recorded[digest] = encode_response(response)
+        except TypeError as e:
+            if self.mode == "record":
+                raise TypeError(f"apibean cassette cannot record the response of {endpoint}: {e}") from e
+            warnings.warn(f"apibean cassette: response of {endpoint} cannot be recorded: {e}")
+
+    def lookup(self, digest: bytes) -> tuple[bool, Any]:
+        if digest in self._recorded:
+            return True, decode_response(self._recorded[digest])
+        location = self._find(digest)
+        if location is None:
+            return False, None
+        offset, length = location
+        return True, decode_response(self._data[offset:offset + length])
+
+    def close(self) -> None:
+        """
+        Write new recordings to disk and release the memory maps.
+
+        The cassette is read again under a lock before writing, so that
+        recordings made concurrently by pytest-xdist workers are merged
+        instead of overwriting each other.
+        """
+        self._release()
+        if self._recorded:
+            with self._lock():
+                self._map()
+                entries = {digest: self._read_raw(digest) for digest in self._iter_digests()}
+                self._release()
+                entries.update(self._recorded)
+                self._write(entries)
+            self._recorded.clear()
+
+    def __len__(self) -> int:
+        return len(set(self._iter_digests()) | set(self._recorded))
+
+    @contextmanager
+    def _lock(self):
+        """
+        Serialize writers of the cassette across processes. The lock file
+        is only honoured where ``fcntl`` is available.
+        """
+        try:
+            import fcntl
+        except ImportError:
+            yield
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_name(self.path.name + ".lock"), "a+b") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _open(self) -> None:
+        if self.path.exists() and self.index_path.exists():
+            # a pytest-xdist worker may be replacing the data and index files
+            with self._lock():
+                self._map()
+
+    def _map(self) -> None:
+        if not (self.path.exists() and self.index_path.exists()):
+            return
+        with self.path.open("rb") as data_file, self.index_path.open("rb") as index_file:
+            if os.fstat(index_file.fileno()).st_size <= len(_MAGIC):
+                return
+            self._data = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._index = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._index[:len(_MAGIC)] != _MAGIC or self._data[:len(_MAGIC)] != _MAGIC:
+            self._release()
+            raise ValueError(f"{self.path} is not an apibean cassette")
+
+    def _release(self) -> None:
+        for mapping in (self._data, self._index):
+            if mapping is not None:
+                mapping.close()
+        self._data = self._index = None
+
+    def _entry_count(self) -> int:
+        if self._index is None:
+            return 0
+        return (len(self._index) - len(_MAGIC)) // _ENTRY.size
+
+    def _entry(self, position: int) -> tuple[bytes, int, int]:
+        return _ENTRY.unpack_from(self._index, len(_MAGIC) + position * _ENTRY.size)
+
+    def _find(self, digest: bytes) -> Optional[tuple[int, int]]:
+        low, high = 0, self._entry_count()
+        while low < high:
+            middle = (low + high) // 2
+            key, offset, length = self._entry(middle)
+            if key < digest:
+                low = middle + 1
+            elif key > digest:
+                high = middle
+            else:
+                return offset, length
+        return None
+
+    def _iter_digests(self):
+        for position in range(self._entry_count()):
+            yield self._entry(position)[0]
+
+    def _read_raw(self, digest: bytes) -> bytes:
+        offset, length = self._find(digest)
+        return bytes(self._data[offset:offset + length])
+
+    def _write(self, entries: dict[bytes, bytes]) -> None:
+        temporary = dict(dir=self.path.parent, prefix=self.path.name + ".", suffix=".tmp", delete=False)
+        with tempfile.NamedTemporaryFile(**temporary) as data_file, \
+                tempfile.NamedTemporaryFile(**temporary) as index_file:
+            data_tmp, index_tmp = data_file.name, index_file.name
+            data_file.write(_MAGIC)
+            index_file.write(_MAGIC)
+            offset = len(_MAGIC)
+            for digest in sorted(entries):
+                payload = entries[digest]
+                data_file.write(payload)
+                index_file.write(_ENTRY.pack(digest, offset, len(payload)))
+                offset += len(payload)
+        os.replace(data_tmp, self.path)
+        os.replace(index_tmp, self.index_path)
+
+
+class RecordingInvoker:
+    """
+    Proxy routing calls made on an ``api_invoker`` through a ``Cassette``.
+
+    Every method call on the proxy (and calls to the proxy itself when the
+    invoker is callable) is identified by an endpoint string made of the
+    method name and, when the first positional argument is a string, that
+    argument, for example ``"get /countries"``. Cacheable patterns of the
+    cassette are matched against that string.
+    """
+
+    def __init__(self, invoker: Any, cassette: Cassette):
+        self._invoker = invoker
+        self._cassette = cassette
+
+    def __call__(self, *args, **kwargs):
+        return self._cassette.call(_endpoint("__call__", args), self._invoker, args, kwargs)
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self._invoker, name)
+        if not callable(attribute):
+            return attribute
+
+        def _invoke(*args, **kwargs):
+            return self._cassette.call(_endpoint(name, args), attribute, args, kwargs)
+        return _invoke
+
+
+def _is_async(func) -> bool:
+    return inspect.iscoroutinefunction(func) or inspect.iscoroutinefunction(getattr(func, "__call__", None))
+
+
+async def _resolved(response: Any) -> Any:
+    return response
+
+
+def _endpoint(name: str, args: tuple) -> str:
+    if args and isinstance(args[0], str):
+        return f"{name} {args[0]}"
+    return name
+
+
+def install_cassette(container: Any, cassette: Cassette) -> bool:
+    """
+    Override the ``api_invoker`` provider of a container instance with a
+    ``RecordingInvoker``. Returns ``False`` when the container has no
+    ``api_invoker`` provider.
+    """
+    provider = getattr(container, "providers", {}).get("api_invoker")
+    if provider is None:
+        return False
+
+    from dependency_injector import providers
+    from apibean.pytest.wrappers.container import WRAPPING_MODES, reset_wrapped_services
+
+    provider.override(providers.Object(RecordingInvoker(provider(), cassette)))
+    # services wrapped before the override still hold the real invoker
+    reset_wrapped_services(container, modes=WRAPPING_MODES)
+    return True
+
+
+def uninstall_cassette(container: Any) -> None:
+    from apibean.pytest.wrappers.container import WRAPPING_MODES, reset_wrapped_services
+
+    container.providers["api_invoker"].reset_last_overriding()
+    reset_wrapped_services(container, modes=WRAPPING_MODES)
+
+
+cassette_key = pytest.StashKey[Cassette]()
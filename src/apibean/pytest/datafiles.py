@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import json
+import re
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+import pytest
+
+from apibean.pytest.settings import get_settings
+
+DATA_FILE_SUFFIXES = (".jsonl", ".csv")
+
+
+def iter_rows(path: Path) -> Iterator[dict]:
+    """
+    Lazily yield the rows of a JSON Lines or CSV data file.
+
+    JSON Lines files hold one JSON object per line; blank lines are
+    ignored. CSV files start with a header line naming the columns, and all
+    their values are strings.
+    """
+    with open(path, newline="", encoding="utf-8") as stream:
+        if path.suffix == ".csv":
+            import csv
+            yield from csv.DictReader(stream)
+        else:
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def iter_batches(rows: Iterable[dict], batch_size: int) -> Iterator[list[dict]]:
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+
+class BatchCache:
+    """
+    Session-wide cache of the batches parsed from data files.
+
+    The first run of a data file streams it and keeps its batches, as long
+    as the size of the cached files stays under ``max_bytes``; later runs
+    replay the parsed batches without reading the file again. Files larger
+    than the remaining budget are streamed on every run. Entries are keyed
+    by path, modification time and batch size.
+
+    Cached rows are shared between tests: bulk-insert hooks must not
+    modify them.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._batches: dict[tuple, list[list[dict]]] = {}
+
+    def batches(self, path: Path, batch_size: int) -> Iterator[list[dict]]:
+        stat = path.stat()
+        key = (str(path), stat.st_mtime_ns, batch_size)
+        cached = self._batches.get(key)
+        if cached is not None:
+            self.hits += 1
+            yield from cached
+            return
+
+        self.misses += 1
+        stream = iter_batches(iter_rows(path), batch_size)
+        if self.size + stat.st_size > self.max_bytes:
+            yield from stream
+            return
+
+        kept = []
+        for batch in stream:
+            kept.append(batch)
+            yield batch
+        self._batches[key] = kept
+        self.size += stat.st_size
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a table or column name for an SQL statement"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def bulk_inserter(db: Any) -> Callable[[str, list[dict]], None]:
+    """
+    Return the bulk-insert hook of a database backend.
+
+    Backends implementing ``ApibeanBulkInsert`` are used as is. DB-API
+    connections exposing ``executemany()`` with the ``qmark`` parameter
+    style (``sqlite3.Connection``) get a default ``INSERT`` statement built
+    from the columns of the first row of each batch; the table and column
+    names are quoted, since they come from data file names and contents.
+    """
+    if hasattr(db, "bulk_insert"):
+        return db.bulk_insert
+    if hasattr(db, "executemany"):
+        def insert(table: str, rows: list[dict]) -> None:
+            columns = list(rows[0])
+            db.executemany(
+                f"INSERT INTO {quote_identifier(table)} ({', '.join(map(quote_identifier, columns))}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                [tuple(row.get(column) for column in columns) for row in rows],
+            )
+        return insert
+    raise TypeError(
+        f"Cannot bulk insert rows into {type(db).__name__!r}; "
+        "implement bulk_insert(table, rows) on apibean_db (see ApibeanBulkInsert)"
+    )
+
+
+class DataFileSeeder:
+    """
+    Seeder pushing the rows of a data file to ``apibean_db`` in batches.
+
+    Subclasses are created by ``find_data_file_seeder()`` for every data
+    file found, with ``path`` and ``table`` set. Rows are read lazily and
+    inserted in batches of ``batch_size`` rows (``seed_batch_size`` option
+    by default) through the bulk-insert hook of the database. The ``table``
+    and ``batch_size`` keyword arguments of the ``seed`` marker override
+    the defaults.
+
+    ``run()`` returns the number of rows inserted.
+    """
+
+    path: Path
+    table: str
+
+    def __init__(
+        self,
+        seed: str,
+        session: Any = None,
+        container: Any = None,
+        db: Any = None,
+        cache: Optional[BatchCache] = None,
+        table: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        **kwargs,
+    ):
+        self.seed = seed
+        self.db = db
+        self.cache = cache
+        self.table = table or self.table
+        self.batch_size = int(batch_size or get_settings().seed_batch_size)
+
+    def run(self) -> int:
+        insert = bulk_inserter(self.db)
+        if self.cache is not None:
+            batches = self.cache.batches(self.path, self.batch_size)
+        else:
+            batches = iter_batches(iter_rows(self.path), self.batch_size)
+        count = 0
+        for batch in batches:
+            insert(self.table, batch)
+            count += len(batch)
+        return count
+
+
+def find_data_file_seeder(seed_modules: str, prefix: str, variant: str) -> Optional[type]:
+    """
+    Return a ``DataFileSeeder`` subclass for the seed ``<prefix>.<variant>``,
+    or ``None`` when there is no data file for it.
+
+    Data files are looked up in the package directory of ``seed_modules``,
+    as ``<prefix>/<variant>.jsonl`` or ``<prefix>/<variant>.csv``. Rows are
+    inserted into the table named ``<prefix>``.
+    """
+    import importlib.util
+
+    try:
+        spec = importlib.util.find_spec(seed_modules)
+    except ImportError:
+        return None
+    if spec is None or not spec.submodule_search_locations:
+        return None
+
+    for location in spec.submodule_search_locations:
+        for suffix in DATA_FILE_SUFFIXES:
+            path = Path(location, prefix, variant + suffix)
+            if path.is_file():
+                name = "".join(part.capitalize() for part in re.split(r"[\W_]+", f"{prefix}_{variant}")) + "DataSeeder"
+                return type(name, (DataFileSeeder,), {"path": path, "table": prefix})
+    return None
+
+
+batch_cache_key = pytest.StashKey[BatchCache]()
+
+
+def get_batch_cache(config: pytest.Config) -> BatchCache:
+    cache = config.stash.get(batch_cache_key, None)
+    if cache is None:
+        cache = config.stash[batch_cache_key] = BatchCache(get_settings().seed_batch_cache_max_bytes)
+    return cache
@@ -0,0 +1,95 @@
+"""
+pytest-xdist integration, registered only when pytest-xdist is installed.
+"""
+
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+from xdist.scheduler import LoadScopeScheduling
+
+from apibean.pytest.seeders import iter_seed_markers, seed_fingerprint
+from apibean.pytest.settings import get_settings
+
+SCOPES_INPUT = "apibean_seed_scopes"
+
+
+class SeedScopeScheduling(LoadScopeScheduling):
+    """
+    Distribute tests so that tests sharing a seed fingerprint run on the
+    same worker.
+
+    Workers store the seed scope of every seeded test in ``item.stash``
+    and write the scopes of their collection to ``scopes_dir`` (see
+    ``pytest_collection_modifyitems`` below); node ids are left untouched.
+    Tests sharing a scope are sent to a worker as a single unit of work,
+    where consecutive tests can reuse snapshots and read-only seeded state.
+    Tests without seed markers are scheduled individually.
+    """
+
+    def __init__(self, config: pytest.Config, log=None, scopes_dir: Path = None):
+        super().__init__(config, log)
+        self.scopes_dir = scopes_dir
+        self._scopes = None
+
+    def _split_scope(self, nodeid: str) -> str:
+        if self._scopes is None:
+            # workers collect the same items: any of their scope files will do
+            self._scopes = {}
+            for path in sorted(self.scopes_dir.glob("*.json")) if self.scopes_dir else ():
+                self._scopes.update(json.loads(path.read_text()))
+        return self._scopes.get(nodeid, nodeid)
+
+
+seed_scope_key = pytest.StashKey[str]()
+scopes_dir_key = pytest.StashKey[Path]()
+
+
+def _scopes_dir(config: pytest.Config) -> Path:
+    path = config.stash.get(scopes_dir_key, None)
+    if path is None:
+        path = config.stash[scopes_dir_key] = Path(tempfile.mkdtemp(prefix="apibean-scopes-"))
+    return path
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_xdist_make_scheduler(config, log):
+    if config.getoption("--apibean-dist-seeds"):
+        return SeedScopeScheduling(config, log, scopes_dir=_scopes_dir(config))
+    return None
+
+
+def pytest_configure_node(node):
+    if node.config.getoption("--apibean-dist-seeds"):
+        node.workerinput[SCOPES_INPUT] = str(_scopes_dir(node.config))
+
+
+def pytest_unconfigure(config):
+    path = config.stash.get(scopes_dir_key, None)
+    if path is not None:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is None or SCOPES_INPUT not in workerinput:
+        return
+
+    chunk = get_settings().dist_seed_chunk
+    counts: dict[str, int] = {}
+    scopes: dict[str, str] = {}
+    for item in items:
+        markers = iter_seed_markers(item)
+        if not markers:
+            continue
+        scope = seed_fingerprint(markers)
+        if chunk > 0:
+            index = counts[scope] = counts.get(scope, -1) + 1
+            scope = f"{scope}-{index // chunk}"
+        item.stash[seed_scope_key] = scopes[item.nodeid] = scope
+
+    path = Path(workerinput[SCOPES_INPUT], f"{workerinput['workerid']}.json")
+    path.write_text(json.dumps(scopes))
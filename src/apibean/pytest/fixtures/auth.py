@@ -1,15 +1,39 @@
 import pytest
 
+from apibean.pytest.phases import phase
+from apibean.pytest.portal import resolve
+from apibean.pytest.tokens import TokenCache, get_token_cache
+
+@pytest.fixture(scope="session")
+def apibean_token_cache(request) -> TokenCache:
+    """
+    Session-wide access token cache shared by the login fixtures.
+
+    Tokens issued by ``login``, ``deprecated_login`` and ``delegated_login``
+    are cached per ``(kind, username, org_slug)`` and reused until shortly
+    before their JWT ``exp`` claim. Tests that rotate secrets or change
+    passwords should invalidate the affected entries:
+
+        apibean_token_cache.invalidate("alice@example.com")
+
+    Caching can be disabled with ``token_cache = false`` in
+    ``[tool.pytest.apibean.options]``.
+    """
+    return get_token_cache(request.config)
+
 @pytest.fixture(scope="function")
-def login(apibean_container):
+def login(request, apibean_container, apibean_token_cache):
     def _login(username: str, password: str) -> str:
-        auth_service = apibean_container.auth_service()
-        result = auth_service.login(dict(username=username, password=password))
-        return result["access_token"]
+        def _fetch():
+            auth_service = apibean_container.auth_service()
+            result = resolve(request, auth_service.login(dict(username=username, password=password)))
+            return result["access_token"]
+        with phase(request.config, request.node.nodeid, "login", "login"):
+            return apibean_token_cache.get("login", username, None, password, _fetch)
     return _login
 
 @pytest.fixture(scope="function")
-def deprecated_login(apibean_container):
+def deprecated_login(request, apibean_container, apibean_token_cache):
     """
     Fixture login: trả về một hàm để thực hiện đăng nhập trong test, tạo access_token bằng
     deprecated_secret_key.
@@ -19,15 +43,18 @@ def deprecated_login(apibean_container):
         headers = {"Authorization": f"Bearer {token}"}
     """
     def _login(username: str, password: str) -> str:
-        auth_service = apibean_container.auth_service()
-        result = auth_service.deprecated_login(dict(username=username, password=password))
-        assert result is not None, f"auth_service.login() failed: { result }"
-        return result["access_token"]
+        def _fetch():
+            auth_service = apibean_container.auth_service()
+            result = resolve(request, auth_service.deprecated_login(dict(username=username, password=password)))
+            assert result is not None, f"auth_service.login() failed: { result }"
+            return result["access_token"]
+        with phase(request.config, request.node.nodeid, "login", "deprecated_login"):
+            return apibean_token_cache.get("deprecated_login", username, None, password, _fetch)
 
     return _login
 
 @pytest.fixture(scope="function")
-def delegated_login(apibean_container):
+def delegated_login(request, apibean_container, apibean_token_cache):
     """
     Fixture delegated_login: trả về một hàm để thực hiện đăng nhập trong test.
 
@@ -36,15 +63,18 @@ def delegated_login(apibean_container):
         headers = {"Authorization": f"Bearer {token}"}
     """
     def _login(username: str, password: str, org_slug: str) -> str:
-        org_service = apibean_container.org_service()
-        org_id = org_service.get_id_by_slug(org_slug)
-        auth_service = apibean_container.auth_service()
-        result = auth_service.delegated_login(dict(
-            org_slug=org_slug,
-            username=username,
-            password=password))
-        assert result is not None, f"auth_service.delegated_login() failed: { result }"
-        return result["access_token"]
+        def _fetch():
+            org_service = apibean_container.org_service()
+            org_id = resolve(request, org_service.get_id_by_slug(org_slug))
+            auth_service = apibean_container.auth_service()
+            result = resolve(request, auth_service.delegated_login(dict(
+                org_slug=org_slug,
+                username=username,
+                password=password)))
+            assert result is not None, f"auth_service.delegated_login() failed: { result }"
+            return result["access_token"]
+        with phase(request.config, request.node.nodeid, "login", "delegated_login"):
+            return apibean_token_cache.get("delegated_login", username, org_slug, password, _fetch)
 
     return _login
 
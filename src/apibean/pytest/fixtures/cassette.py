@@ -0,0 +1,55 @@
+import pytest
+
+from apibean.pytest.settings import get_settings
+
+@pytest.fixture(scope="session")
+def apibean_cassette(request):
+    """
+    Record/replay cassette for calls made through the ``api_invoker``.
+
+    The cassette mode is selected with ``--apibean-cassette`` or the
+    ``cassette_mode`` option:
+
+    - ``"off"`` (default): calls reach the backend and this fixture
+      returns ``None``
+    - ``"record"``: calls reach the backend and their responses are stored
+      in the cassette file (``cassette_path``)
+    - ``"replay"``: calls are served from the cassette, so tests run
+      offline; unrecorded calls raise ``CassetteMiss``
+    - ``"hybrid"``: only endpoints matching one of the
+      ``cassette_cacheable`` patterns (for example ``"get /countries*"``)
+      are replayed, or recorded on first use
+
+    When enabled, the ``api_invoker`` provider of ``apibean_container`` is
+    overridden for the whole session, so that every service wrapped by
+    ``ServiceWrappingMeta`` goes through the cassette. New recordings are
+    written when the session ends.
+    """
+    settings = get_settings()
+    mode = request.config.getoption("--apibean-cassette") or settings.cassette_mode
+    if mode == "off":
+        yield None
+        return
+
+    from apibean.pytest.cassette import (
+        Cassette,
+        cassette_key,
+        install_cassette,
+        uninstall_cassette,
+    )
+
+    cassette = Cassette(
+        request.config.rootpath / settings.cassette_path,
+        mode,
+        cacheable=settings.cassette_cacheable,
+    )
+    request.config.stash[cassette_key] = cassette
+
+    container = request.getfixturevalue("apibean_container")
+    installed = install_cassette(container, cassette)
+    try:
+        yield cassette
+    finally:
+        if installed:
+            uninstall_cassette(container)
+        cassette.close()
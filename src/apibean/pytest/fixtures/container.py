@@ -33,3 +33,51 @@ def apibean_container() -> ApibeanTestContainer:
     This fixture is scoped to the test session to allow container wiring
     and expensive initialization to occur only once per test run.
     """
+
+@pytest.fixture(scope="function")
+def apibean_service_cache(request, apibean_container):
+    """
+    Scope services cached by ``ServiceWrappingMeta`` to the current test.
+
+    Containers created with ``wrapping_mode="cached"`` build each wrapped
+    service once and reuse it for all subsequent calls. This fixture,
+    requested by ``apibean_testcase_loop``, resets those cached services
+    when the test ends, so that no test observes a service instance built
+    for a previous one.
+
+    With ``--apibean-affected``, the first time it runs, it also records
+    the digests of the source files of the container and its wrapped
+    services, used to rerun every test when one of them changes.
+    """
+    if request.config.getoption("--apibean-affected") and getattr(request.config, "cache", None) is not None:
+        from apibean.pytest.affected import service_files, service_files_key
+        if service_files_key not in request.config.stash:
+            request.config.stash[service_files_key] = service_files(request.config, apibean_container)
+    yield
+    declarative = getattr(apibean_container, "declarative_parent", None)
+    if getattr(declarative, "__apibean_wrapped_services__", None):
+        from apibean.pytest.wrappers.container import reset_wrapped_services
+        reset_wrapped_services(apibean_container)
+
+@pytest.fixture(scope="function")
+def apibean_overrides(request, apibean_container):
+    """
+    Override providers of ``apibean_container`` for the current test only.
+
+    Returns a ``ProviderOverlay``:
+
+        def test_offline(apibean_overrides, apibean_container):
+            apibean_overrides.override("mail_service", FakeMailService())
+            apibean_overrides.reset("settings_cache")
+            ...
+
+    At teardown, the overlay removes the overridings it added and resets
+    again the singletons reset during the test, including the singletons
+    and wrapped services depending on an overridden provider. Only the
+    changed providers are touched: the session container is neither rebuilt
+    nor re-wired, and unrelated singletons keep their instances.
+    """
+    from apibean.pytest.wrappers.overrides import ProviderOverlay, get_singleton_dependents
+    overlay = ProviderOverlay(apibean_container, get_singleton_dependents(request.config, apibean_container))
+    yield overlay
+    overlay.restore()
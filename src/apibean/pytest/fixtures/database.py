@@ -1,6 +1,10 @@
 import pytest
 
 from apibean.pytest.abstract import abstract_fixture
+from apibean.pytest.lifecycle import get_db_state
+from apibean.pytest.queries import QueryCounter, query_counter_key
+from apibean.pytest.statements import WriteTracker, attach_statement_tap, write_tracker_key
+from apibean.pytest.transaction import open_test_transaction, reset_tables
 
 @pytest.fixture(scope="session")
 @abstract_fixture
@@ -41,3 +45,116 @@ def apibean_reset_db():
 
     The application must provide an implementation of this fixture.
     """
+
+@pytest.fixture(scope="function")
+def apibean_transaction(request, apibean_db):
+    """
+    Run the current test inside an outer transaction on ``apibean_db``.
+
+    This fixture is requested by ``apibean_testcase_loop`` for tests using
+    the ``"transaction"`` reset mode. It opens a savepoint on the database
+    backend before seeding and rolls it back at teardown, so that the next
+    test starts from the state left by the last ``apibean_reset_db``
+    without truncating any table.
+
+    The default implementation supports SQLAlchemy sessions and connections
+    (``begin_nested()``) and DB-API connections accepting ``SAVEPOINT``
+    statements. Applications using another backend, or whose services do
+    not share the ``apibean_db`` connection, may override this fixture.
+    """
+    state = get_db_state(request.config)
+    state.transaction = open_test_transaction(apibean_db)
+    try:
+        yield state.transaction
+    finally:
+        state.transaction.rollback()
+        state.transaction = None
+        state.clean = True
+
+@pytest.fixture(scope="session")
+def apibean_statement_tap(apibean_db):
+    """
+    Session-wide tap on the SQL statements executed on ``apibean_db``.
+
+    The returned ``StatementTap`` forwards every statement to the listeners
+    registered with ``add()``; it is only installed when a plugin feature
+    needs it, such as the ``"incremental"`` reset mode.
+
+    The default implementation supports ``sqlite3`` connections, SQLAlchemy
+    engines, connections and sessions, and backends exposing
+    ``add_statement_listener()``. Applications using another backend may
+    override this fixture to feed a ``StatementTap`` from their own
+    execution hooks.
+    """
+    tap = attach_statement_tap(apibean_db)
+    yield tap
+    tap.close()
+
+@pytest.fixture(scope="session")
+def apibean_write_tracker(request, apibean_statement_tap):
+    """
+    Session-wide record of the tables written on ``apibean_db``.
+
+    The ``WriteTracker`` listens to ``apibean_statement_tap`` and collects
+    the tables targeted by ``INSERT``, ``UPDATE``, ``DELETE``, ``REPLACE``
+    and ``TRUNCATE`` statements since the last reset. Schema changes, or
+    writes it cannot attribute to a table, make the state unknown until
+    the next full ``apibean_reset_db``.
+    """
+    tracker = WriteTracker()
+    apibean_statement_tap.add(tracker)
+    request.config.stash[write_tracker_key] = tracker
+    yield tracker
+    apibean_statement_tap.remove(tracker)
+    del request.config.stash[write_tracker_key]
+
+@pytest.fixture(scope="function")
+def apibean_dirty_tables(apibean_write_tracker):
+    """
+    Tables written since the database was last reset, as quoted and
+    schema-qualified identifiers such as ``"audit"."events"``.
+    """
+    return frozenset(apibean_write_tracker.dirty or ())
+
+@pytest.fixture(scope="function")
+def apibean_reset_tables(apibean_db, apibean_dirty_tables):
+    """
+    Reset only the tables listed by ``apibean_dirty_tables``.
+
+    This fixture is requested by ``apibean_testcase_loop`` in the
+    ``"incremental"`` reset mode, instead of ``apibean_reset_db``, once the
+    database was fully reset and the written tables are known. The
+    default implementation deletes every row of the dirty tables on
+    SQLAlchemy sessions and connections, or DB-API connections exposing
+    ``execute()``, then commits.
+
+    Applications whose schema relies on foreign keys, sequences or
+    reference data should override this fixture, for example to issue a
+    single ``TRUNCATE ... RESTART IDENTITY CASCADE`` or to reload the
+    reference rows of the dirty tables.
+    """
+    reset_tables(apibean_db, sorted(apibean_dirty_tables))
+
+@pytest.fixture(scope="function")
+def apibean_queries(request, apibean_statement_tap):
+    """
+    Count and time the queries executed on ``apibean_db`` by the current
+    test.
+
+    The returned ``QueryCounter`` keeps separate ``seed`` and ``body``
+    statistics for the seeding phase and the test function:
+
+        def test_list_users(apibean_queries, client):
+            client.get("/users")
+            assert apibean_queries.body.count <= 3
+
+    ``apibean_testcase_loop`` requests this fixture for tests marked with
+    ``@pytest.mark.apibean_query_budget`` or when running with
+    ``--apibean-queries``; otherwise no listener is added to the statement
+    tap and queries are not counted.
+    """
+    counter = QueryCounter()
+    apibean_statement_tap.add(counter)
+    request.node.stash[query_counter_key] = counter
+    yield counter
+    apibean_statement_tap.remove(counter)
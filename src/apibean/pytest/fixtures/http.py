@@ -0,0 +1,59 @@
+import pytest
+
+from apibean.pytest.settings import get_settings
+
+@pytest.fixture(scope="session")
+def apibean_app():
+    """
+    Application served in-process to the HTTP client fixtures.
+
+    By default no application is configured and the clients send their
+    requests to ``base_url`` over the network. Applications may override
+    this fixture to return their ASGI (e.g. FastAPI, Starlette) or WSGI
+    (e.g. Flask) application, so that tests bypass the network stack
+    entirely.
+    """
+    return None
+
+@pytest.fixture(scope="session")
+def apibean_http_client(request, apibean_app, apibean_token_cache):
+    """
+    Session-wide synchronous ``httpx.Client`` configured from settings.
+
+    The client uses ``base_url`` and ``timeout`` from
+    ``[tool.pytest.apibean.options]`` and keeps a pool of keep-alive
+    connections (``http_max_connections``, ``http_max_keepalive``) for the
+    whole session; ``http2 = true`` enables HTTP/2 (requires ``h2``).
+
+    When ``auto_login`` is enabled, a bearer token obtained by posting
+    ``username`` and ``password`` to ``login_path`` is injected into every
+    request that has no ``Authorization`` header. The token is cached in
+    ``apibean_token_cache``.
+
+    When ``apibean_app`` returns an application, requests are dispatched to
+    it in-process. ASGI applications run on the ``apibean_portal`` loop.
+    """
+    from apibean.pytest.httpclient import is_asgi_app, make_client
+
+    portal = None
+    if apibean_app is not None and is_asgi_app(apibean_app):
+        portal = request.getfixturevalue("apibean_portal")
+
+    with make_client(get_settings(), apibean_token_cache, apibean_app, portal) as client:
+        yield client
+
+@pytest.fixture(scope="session")
+def apibean_async_http_client(apibean_app, apibean_token_cache, apibean_portal):
+    """
+    Session-wide ``httpx.AsyncClient`` configured like ``apibean_http_client``.
+
+    The connection pool is bound to the event loop of ``apibean_portal``:
+    use the client from coroutines run on that loop, for example
+    ``apibean_portal.call(apibean_async_http_client.get, "/health")``.
+    ``apibean_app`` must be an ASGI application when it is set.
+    """
+    from apibean.pytest.httpclient import make_async_client
+
+    client = make_async_client(get_settings(), apibean_token_cache, apibean_app)
+    yield client
+    apibean_portal.call(client.aclose)
@@ -0,0 +1,21 @@
+import pytest
+
+from apibean.pytest.portal import get_portal
+
+@pytest.fixture(scope="session")
+def apibean_portal(request):
+    """
+    Session-wide anyio blocking portal owned by pytest-apibean.
+
+    The portal runs one event loop in a background thread for the whole
+    test session. pytest-apibean uses it to run async seeders and async
+    authentication services, and tests may use it to share that loop with
+    async helpers:
+
+        result = apibean_portal.call(client.get, "/health")
+
+    The loop is started the first time this fixture is requested, using
+    the ``anyio_backend`` option (``"asyncio"`` by default), and stopped
+    when the pytest session ends.
+    """
+    return get_portal(request.config)
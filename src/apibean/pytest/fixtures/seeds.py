@@ -1,8 +1,18 @@
-import anyio
-import importlib
+import inspect
+
 import pytest
 
-from apibean.pytest.settings import settings
+from apibean.pytest.phases import phase
+from apibean.pytest.lifecycle import get_db_state, is_readonly, resolve_reset_mode
+from apibean.pytest.seeders import (
+    get_seeder_index,
+    iter_seed_markers,
+    run_seed_plan,
+    seed_fingerprint,
+)
+from apibean.pytest.settings import get_settings
+from apibean.pytest.statements import write_tracker_key
+from apibean.pytest.warmup import warmup_key
 
 @pytest.fixture(scope="function")
 def apibean_seed_modules() -> str:
@@ -17,10 +27,10 @@ def apibean_seed_modules() -> str:
 
     If not explicitly configured, it defaults to "tests.seeders".
     """
-    return settings.seed_modules or "tests.seeders"
+    return get_settings().seed_modules or "tests.seeders"
 
 @pytest.fixture(scope="function")
-def apibean_seed_data(request, apibean_container, apibean_seed_modules):
+def apibean_seed_data(request, apibean_container, apibean_seed_modules, apibean_seed_snapshots):
     """
     Seed test data based on ``@pytest.mark.seed`` markers.
 
@@ -43,13 +53,34 @@ def apibean_seed_data(request, apibean_container, apibean_seed_modules):
     - Seeder module: ``<apibean_seed_modules>.<prefix>_seeder``
     - Seeder class: ``<Prefix>Seeder``
 
+    Seeder classes are indexed once at collection time (see
+    ``SeederIndex``), so resolving a seed marker here is a dictionary
+    lookup.
+
+    Seeds without a seeder module may be backed by a JSON Lines or CSV data
+    file, ``<prefix>/<variant>.jsonl`` or ``.csv`` in the seed modules
+    package. Their rows are streamed in batches of ``seed_batch_size`` to
+    the bulk-insert hook of ``apibean_db`` (see ``DataFileSeeder``), and
+    the parsed batches are cached for later tests.
+
     Seeders receive the application test container via ``apibean_container``
-    and are responsible for creating the required test data.
+    and are responsible for creating the required test data. Seeders whose
+    ``run`` is a coroutine function are awaited on the session event loop of
+    ``apibean_portal``; seeders setting ``run_in_anyio_worker`` run in a
+    worker thread of that same loop.
 
     When multiple ``@pytest.mark.seed`` markers are present, they are
     executed in reverse declaration order, allowing later markers to
     override or extend earlier seeded data.
 
+    Seeders may declare ``requires`` (seed names to run first) and
+    ``provides`` (additional seed names they satisfy). The markers of a
+    test and their requirements then form a dependency graph, in which
+    shared requirements and repeated markers run once (see
+    ``plan_seeders()``). With the ``seed_workers`` option above one,
+    seeders whose requirements completed run concurrently on a thread
+    pool; seeders must then be safe to run from any thread.
+
     This fixture is designed to be driven entirely by test markers.
     Applications may customize seeding behavior by:
 
@@ -57,42 +88,85 @@ def apibean_seed_data(request, apibean_container, apibean_seed_modules):
     - Overriding ``apibean_seed_modules`` to change discovery paths
     - Extending or replacing seeder implementations
 
-    If no ``@pytest.mark.seed`` marker is present, this fixture performs
-    no action.
+    When ``apibean_seed_snapshots`` is enabled, the database state produced
+    by a given seed fingerprint is captured once and restored for later
+    tests with the same fingerprint instead of running the seeders again.
+    Snapshots are not used for tests running inside ``apibean_transaction``.
+
+    Snapshots are keyed by the seed fingerprint and ``apibean_seed_modules``,
+    so that tests overriding the seed modules never share a snapshot with
+    tests seeding other data.
+
+    Read-only tests (``@pytest.mark.apibean_readonly``) for which
+    ``apibean_testcase_loop`` kept the data seeded by a previous test with
+    the same seed fingerprint are not seeded again: the fixture returns
+    the value of that seeding.
+
+    The fixture value maps every seed name that ran to the value returned
+    by its seeder's ``run()``; on a snapshot restore, the values captured
+    with the snapshot are returned. It is empty when no
+    ``@pytest.mark.seed`` marker is present, in which case this fixture
+    performs no action.
     """
 
-    markers = reversed(list(request.node.iter_markers("seed")))
+    markers = iter_seed_markers(request.node)
     if not markers:
+        yield {}
         return
 
-    for marker in markers:
-        # args[0] là seed name, kwargs chứa tham số bổ sung
-        seed_name = marker.args[0] if marker.args else marker.kwargs.get("name")
-        kwargs = marker.kwargs or {}
+    state = get_db_state(request.config)
+    if is_readonly(request.node) and state.seeded == seed_fingerprint(markers):
+        # apibean_testcase_loop kept the data seeded by a previous test
+        yield dict(state.seed_data or {})
+        return
 
-        if not seed_name:
-            raise ValueError("Missing seed name in pytest.mark.seed()")
+    fingerprint = None
+    if apibean_seed_snapshots is not None and get_db_state(request.config).transaction is None:
+        fingerprint = seed_fingerprint(markers, apibean_seed_modules)
+        with phase(request.config, request.node.nodeid, "snapshot_restore", fingerprint):
+            restored = apibean_seed_snapshots.restore(fingerprint)
+        if restored:
+            tracker = request.config.stash.get(write_tracker_key, None)
+            if tracker is not None:
+                # a restored snapshot bypasses the statement tap
+                tracker.invalidate()
+            yield dict(apibean_seed_snapshots.data(fingerprint))
+            return
+
+    steps = get_seeder_index(request.config).plan(apibean_seed_modules, markers)
+    portal = None
+    if any(_needs_portal(step.seeder_cls) for step in steps):
+        portal = request.getfixturevalue("apibean_portal")
+    from apibean.pytest.datafiles import DataFileSeeder, get_batch_cache
+    data_files = None
+    if any(issubclass(step.seeder_cls, DataFileSeeder) for step in steps):
+        data_files = {"db": request.getfixturevalue("apibean_db"), "cache": get_batch_cache(request.config)}
+
+    def run(step):
+        kwargs = markers[step.marker].kwargs if step.marker is not None else {}
+        if issubclass(step.seeder_cls, DataFileSeeder):
+            kwargs = {**data_files, **kwargs}
+        with phase(request.config, request.node.nodeid, "seeder", step.seed_name):
+            seeder = step.seeder_cls(seed=step.seed_name, session=None, container=apibean_container, **kwargs)
+            if inspect.iscoroutinefunction(seeder.run):
+                return portal.call(seeder.run)
+            elif hasattr(seeder, "run_in_anyio_worker") and getattr(seeder, "run_in_anyio_worker"):
+                from anyio.to_thread import run_sync
+                return portal.call(run_sync, seeder.run)
+            else:
+                return seeder.run()
 
-        try:
-            prefix, variant = seed_name.split(".", 1)
-        except ValueError as e:
-            raise ValueError(f"Invalid seed name: '{seed_name}' (must be in format 'module.variant')") from e
+    results = run_seed_plan(steps, run, get_settings().seed_workers)
+    data = {step.seed_name: result for step, result in zip(steps, results)}
 
-        seeder_module_name = f"{apibean_seed_modules}.{prefix}_seeder"
-        seeder_class_name = "".join(part.capitalize() for part in prefix.split("_")) + "Seeder"
+    if fingerprint is not None:
+        with phase(request.config, request.node.nodeid, "snapshot_capture", fingerprint):
+            apibean_seed_snapshots.capture(fingerprint, data)
 
-        try:
-            module = importlib.import_module(seeder_module_name)
-            seeder_cls = getattr(module, seeder_class_name)
-            seeder = seeder_cls(seed=seed_name, session=None, container=apibean_container, **kwargs)
-            if hasattr(seeder, "run_in_anyio_worker") and getattr(seeder, "run_in_anyio_worker"):
-                anyio.run(anyio.to_thread.run_sync, seeder.run)
-            else:
-                seeder.run()
-        except (ImportError, AttributeError) as e:
-            raise RuntimeError(f"Couldn't load the class [{seeder_class_name}] for '{seed_name}': {e}") from e
+    yield dict(data)
 
-    yield
+def _needs_portal(seeder_cls) -> bool:
+    return inspect.iscoroutinefunction(seeder_cls.run) or bool(getattr(seeder_cls, "run_in_anyio_worker", False))
 
 @pytest.fixture(scope="function")
 def apibean_before_reset_db():
@@ -116,7 +190,7 @@ def apibean_before_reset_db():
     yield
 
 @pytest.fixture(autouse=True)
-def apibean_testcase_loop(apibean_before_reset_db, apibean_reset_db, apibean_seed_data):
+def apibean_testcase_loop(request):
     """
     Orchestrate the Apibean test case lifecycle.
 
@@ -128,6 +202,38 @@ def apibean_testcase_loop(apibean_before_reset_db, apibean_reset_db, apibean_see
     2. ``apibean_reset_db`` – reset the persistent state (e.g. database)
     3. ``apibean_seed_data`` – seed the required test data
 
+    The reset strategy is selected per test with
+    ``@pytest.mark.apibean_reset("truncate" | "transaction")`` or globally
+    with the ``reset_mode`` option:
+
+    - ``"truncate"`` (default) runs ``apibean_reset_db`` before every test
+    - ``"transaction"`` runs the test and its seeders inside
+      ``apibean_transaction``, which is rolled back at teardown.
+      ``apibean_reset_db`` only runs when the database is not known to be
+      clean, for example after a test using the truncate path.
+    - ``"incremental"`` tracks the tables written on ``apibean_db`` (see
+      ``apibean_write_tracker``). The first test gets a full
+      ``apibean_reset_db``; later tests only reset the tables written
+      since, through ``apibean_reset_tables``, and skip the reset when
+      nothing was written.
+
+    Tests marked with ``@pytest.mark.apibean_commits`` never use the
+    transaction path, since their writes cannot be rolled back.
+
+    Tests marked with ``@pytest.mark.apibean_readonly`` promise not to write
+    to the database. When the database still holds the data seeded for the
+    same seed fingerprint and no test wrote to it since, such tests skip
+    the three steps above entirely. Running with ``--apibean-group-seeds``
+    orders tests so that this happens as often as possible.
+
+    When background warm-up is enabled, the first test waits for it to
+    complete (see ``apibean_warmup``).
+
+    Tests marked with ``@pytest.mark.apibean_query_budget`` or requesting
+    ``apibean_queries``, and every test with ``--apibean-queries``, get
+    their queries counted separately for the seeding phase and the test
+    body.
+
     The purpose of this fixture is to provide a standardized "test case loop"
     across the Apibean ecosystem, ensuring test isolation and eliminating
     order-dependent behavior.
@@ -135,4 +241,75 @@ def apibean_testcase_loop(apibean_before_reset_db, apibean_reset_db, apibean_see
     Applications may override any of the component fixtures above to customize
     reset or seeding behavior without modifying this orchestration fixture.
     """
+    if warmup_key in request.config.stash:
+        request.getfixturevalue("apibean_warmup")
+    # also needed by read-only tests skipping the reset and the seeding:
+    # cached wrapped services they build must not leak into the next test
+    request.getfixturevalue("apibean_cassette")
+    request.getfixturevalue("apibean_service_cache")
+
+    counter = None
+    if (
+        request.node.get_closest_marker("apibean_query_budget") is not None
+        or "apibean_queries" in request.fixturenames
+        or request.config.getoption("--apibean-queries")
+    ):
+        counter = request.getfixturevalue("apibean_queries")
+
+    state = get_db_state(request.config)
+    markers = iter_seed_markers(request.node)
+    fingerprint = seed_fingerprint(markers)
+    readonly = is_readonly(request.node)
+
+    if readonly and state.seeded == fingerprint:
+        state.resets_avoided += 1
+        state.seedings_avoided += bool(markers)
+        yield
+        return
+
+    mode = resolve_reset_mode(request.node)
+    transactional = mode == "transaction"
+    tracker = None
+    if mode == "incremental":
+        tracker = request.getfixturevalue("apibean_write_tracker")
+        if state.clean:
+            tracker.clear()
+
+    config, nodeid = request.config, request.node.nodeid
+    if transactional and state.clean:
+        state.resets_avoided += 1
+    elif tracker is not None and tracker.dirty is not None and not tracker.dirty:
+        state.resets_avoided += 1
+    else:
+        with phase(config, nodeid, "apibean_before_reset_db"):
+            request.getfixturevalue("apibean_before_reset_db")
+        if tracker is not None and tracker.dirty is not None:
+            with phase(config, nodeid, "apibean_reset_tables"):
+                state.tables_reset += len(request.getfixturevalue("apibean_dirty_tables"))
+                request.getfixturevalue("apibean_reset_tables")
+            state.partial_resets += 1
+        else:
+            with phase(config, nodeid, "apibean_reset_db"):
+                request.getfixturevalue("apibean_reset_db")
+        state.resets += 1
+    state.clean = False
+
+    tracker = config.stash.get(write_tracker_key, None)
+    if tracker is not None:
+        tracker.clear()
+    state.seeded = state.seed_data = None
+
+    if transactional:
+        with phase(config, nodeid, "apibean_transaction"):
+            request.getfixturevalue("apibean_transaction")
+    if counter is not None:
+        counter.phase = "seed"
+    data = request.getfixturevalue("apibean_seed_data")
+    if counter is not None:
+        counter.phase = None
+    state.seedings += bool(markers)
+    if not transactional:
+        state.seeded, state.seed_data = fingerprint, data
     yield
+    if not readonly:
+        state.seeded = state.seed_data = None
@@ -0,0 +1,52 @@
+import pytest
+
+from apibean.pytest.settings import get_settings
+from apibean.pytest.snapshots.store import SnapshotStore, snapshot_store_key
+
+@pytest.fixture(scope="session")
+def apibean_snapshot_backend():
+    """
+    Storage backend used to snapshot seeded database states.
+
+    By default no backend is configured and seed snapshots are disabled:
+    every test runs its seeders after ``apibean_reset_db``. Applications
+    may override this fixture to return an ``ApibeanSnapshotBackend``, for
+    example:
+
+        @pytest.fixture(scope="session")
+        def apibean_snapshot_backend(tmp_path_factory):
+            return SqliteSnapshotBackend("test.db", tmp_path_factory.mktemp("snapshots"))
+
+    Bundled backends are ``SqliteSnapshotBackend`` (file copy through the
+    SQLite backup API) and ``PostgresTemplateBackend`` (``CREATE DATABASE
+    ... TEMPLATE``).
+    """
+    return None
+
+@pytest.fixture(scope="session")
+def apibean_seed_snapshots(request, apibean_snapshot_backend):
+    """
+    Session-wide store of seeded database snapshots.
+
+    When a snapshot backend is configured, ``apibean_seed_data`` captures
+    the database state the first time a seed fingerprint (seed modules,
+    ordered seed names plus marker keyword arguments) is seen, and restores it for later
+    tests with the same fingerprint instead of running the seeders again.
+
+    Snapshots are evicted in least-recently-used order once more than
+    ``seed_snapshot_max_entries`` are kept, or once their total size exceeds
+    ``seed_snapshot_max_bytes`` (``0`` means unlimited). All snapshots are
+    discarded at the end of the session.
+    """
+    if apibean_snapshot_backend is None:
+        yield None
+        return
+
+    store = SnapshotStore(
+        apibean_snapshot_backend,
+        max_entries=get_settings().seed_snapshot_max_entries,
+        max_bytes=get_settings().seed_snapshot_max_bytes or None,
+    )
+    request.config.stash[snapshot_store_key] = store
+    yield store
+    store.close()
@@ -0,0 +1,32 @@
+import pytest
+
+from apibean.pytest.warmup import warmup_key
+
+@pytest.fixture(scope="session")
+def apibean_warmup(request):
+    """
+    Wait for the background warm-up and return its ``WarmupResult``.
+
+    Warm-up is enabled with ``--apibean-warmup`` or ``warmup = true`` in
+    ``[tool.pytest.apibean.options]``, and is driven by the
+    ``pytest_apibean_warmup`` hook. The plugin waits for the warm-up before
+    the first test is set up (for at most ``warmup_timeout`` seconds), so
+    that no fixture runs while services are still being resolved on the
+    warm-up thread. Applications may request this fixture from their
+    session fixtures to reuse the warmed-up objects:
+
+        @pytest.fixture(scope="session")
+        def apibean_container(apibean_warmup):
+            return apibean_warmup.container
+
+    Returns ``None`` when warm-up is disabled. A failed warm-up stops the
+    session before the first test; the exception is raised again here for
+    fixtures requesting it outside of a test run.
+    """
+    warmup = request.config.stash.get(warmup_key, None)
+    if warmup is None:
+        return None
+    result = warmup.join()
+    if result.error is not None:
+        raise result.error
+    return result
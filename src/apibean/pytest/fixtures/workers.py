@@ -0,0 +1,46 @@
+import pytest
+
+from apibean.pytest.settings import get_settings
+
+@pytest.fixture(scope="session")
+def apibean_worker_id(request) -> str:
+    """
+    Return the id of the current test process.
+
+    This is the pytest-xdist worker id (``"gw0"``, ``"gw1"``, ...) when
+    tests are distributed with ``-n``, and ``"master"`` otherwise.
+    """
+    workerinput = getattr(request.config, "workerinput", None)
+    if workerinput is None:
+        return "master"
+    return workerinput["workerid"]
+
+@pytest.fixture(scope="session")
+def apibean_worker_db_name(request, apibean_worker_id) -> str:
+    """
+    Return the name of the database dedicated to the current test process.
+
+    The name is derived from the ``db_name`` option: it is used as is when
+    tests are not distributed, and suffixed with the worker id under
+    pytest-xdist (``apibean_test_gw0``, ``apibean_test_gw1``, ...), so that
+    workers never share a database.
+
+    The first time this fixture is requested in a process, the
+    ``pytest_apibean_provision_worker_db`` hook is called to let the
+    application create the database. Applications typically build their
+    ``apibean_db`` fixture on top of this one:
+
+        @pytest.fixture(scope="session")
+        def apibean_db(apibean_worker_db_name):
+            return create_engine(f"postgresql:///{apibean_worker_db_name}")
+    """
+    db_name = get_settings().db_name
+    if apibean_worker_id != "master":
+        db_name = f"{db_name}_{apibean_worker_id}"
+
+    provisioned = request.config.hook.pytest_apibean_provision_worker_db(
+        config=request.config,
+        worker_id=apibean_worker_id,
+        db_name=db_name,
+    )
+    return provisioned or db_name
@@ -0,0 +1,45 @@
+"""
+Hook specifications added by pytest-apibean.
+
+Applications implement these hooks in their ``conftest.py`` files.
+"""
+
+import pytest
+
+
+@pytest.hookspec(firstresult=True)
+def pytest_apibean_provision_worker_db(config: pytest.Config, worker_id: str, db_name: str):
+    """
+    Provision the database used by one test process.
+
+    Called once per process, the first time ``apibean_worker_db_name`` is
+    requested. ``worker_id`` is the pytest-xdist worker id (``"gw0"``,
+    ``"gw1"``, ...) or ``"master"`` when tests are not distributed, and
+    ``db_name`` is the database name derived from it.
+
+    Implementations typically create the database (or copy a template) when
+    it does not exist yet. Returning a non-``None`` value replaces the
+    database name handed to the application.
+    """
+
+
+@pytest.hookspec(firstresult=True)
+def pytest_apibean_warmup(config: pytest.Config):
+    """
+    Return the objects to warm up in the background, or ``None``.
+
+    Called once per process on a background thread when the session starts,
+    if warm-up is enabled (``--apibean-warmup`` or ``warmup = true``). The
+    result is a mapping with any of the keys:
+
+    - ``"container"``: the application test container
+    - ``"db"``: the application database backend
+    - ``"config"``: the ``ApibeanTestConfig`` holding the root and sync
+      user credentials
+
+    These must be the same objects returned by the ``apibean_container``,
+    ``apibean_db`` and ``apibean_config`` fixtures, for example by building
+    them in a cached function shared by the hook and the fixtures, or by
+    having the fixtures return the attributes of ``apibean_warmup``. The
+    hook runs while tests are being collected and must not use fixtures.
+    """
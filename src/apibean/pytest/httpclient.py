@@ -0,0 +1,155 @@
+"""
+httpx clients configured from ``ApibeanOptions``.
+
+This module imports ``httpx`` and is only imported by the HTTP client
+fixtures, so that pytest-apibean does not require httpx unless they are
+used. Install it with ``pip install pytest-apibean[http]``.
+"""
+
+from __future__ import annotations
+
+import inspect
+from typing import Any, Optional
+
+import httpx
+
+from apibean.pytest.settings import ApibeanOptions
+from apibean.pytest.tokens import TokenCache
+
+LOGIN_KIND = "http_login"
+
+
+def is_asgi_app(app: Any) -> bool:
+    """
+    Tell ASGI applications (``async def __call__(scope, receive, send)``)
+    from WSGI ones.
+    """
+    return inspect.iscoroutinefunction(app) or inspect.iscoroutinefunction(getattr(app, "__call__", None))
+
+
+class CachedBearerAuth(httpx.Auth):
+    """
+    Inject a bearer token obtained from ``login_path`` into every request.
+
+    Tokens are kept in the session ``TokenCache`` under the
+    ``"http_login"`` kind, so they are shared by every client of the
+    session and refreshed shortly before they expire. Requests that already
+    carry an ``Authorization`` header are sent unchanged. When the server
+    answers ``401``, the cached token is dropped and the request is retried
+    once with a fresh token.
+    """
+
+    requires_response_body = True
+
+    def __init__(self, token_cache: TokenCache, login_url: str, username: str, password: str):
+        self.token_cache = token_cache
+        self.login_url = login_url
+        self.username = username
+        self.password = password
+
+    def auth_flow(self, request: httpx.Request):
+        if "Authorization" in request.headers:
+            yield request
+            return
+
+        for attempt in range(2):
+            token = self.token_cache.lookup(LOGIN_KIND, self.username, None, self.password)
+            if token is None:
+                login_response = yield httpx.Request(
+                    "POST",
+                    self.login_url,
+                    json=dict(username=self.username, password=self.password),
+                )
+                login_response.raise_for_status()
+                token = login_response.json()["access_token"]
+                self.token_cache.store(LOGIN_KIND, self.username, None, self.password, token)
+
+            request.headers["Authorization"] = f"Bearer {token}"
+            response = yield request
+            if response.status_code != 401 or attempt:
+                return
+            self.token_cache.invalidate(self.username, kind=LOGIN_KIND)
+
+
+class PortalASGITransport(httpx.BaseTransport):
+    """
+    Synchronous transport calling an ASGI application in-process on the
+    event loop of a blocking portal.
+    """
+
+    def __init__(self, app: Any, portal: Any):
+        self.transport = httpx.ASGITransport(app=app)
+        self.portal = portal
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self.portal.call(self._handle, request)
+
+    async def _handle(self, request: httpx.Request) -> httpx.Response:
+        request = httpx.Request(
+            request.method,
+            request.url,
+            headers=request.headers,
+            content=request.read(),
+            extensions=request.extensions,
+        )
+        response = await self.transport.handle_async_request(request)
+        content = await response.aread()
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            content=content,
+            extensions=response.extensions,
+        )
+
+
+def _client_options(settings: ApibeanOptions, token_cache: Optional[TokenCache]) -> dict:
+    options = dict(
+        base_url=settings.base_url,
+        timeout=settings.timeout,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive,
+        ),
+    )
+    if settings.auto_login and token_cache is not None:
+        login_url = settings.base_url.rstrip("/") + "/" + settings.login_path.lstrip("/")
+        options["auth"] = CachedBearerAuth(token_cache, login_url, settings.username, settings.password)
+    return options
+
+
+def make_client(
+    settings: ApibeanOptions,
+    token_cache: Optional[TokenCache] = None,
+    app: Any = None,
+    portal: Any = None,
+) -> httpx.Client:
+    """
+    Build a pooled synchronous client.
+
+    When ``app`` is given, requests are dispatched to it in-process instead
+    of going through the network: WSGI applications are called directly,
+    ASGI applications on the event loop of ``portal``.
+    """
+    options = _client_options(settings, token_cache)
+    if app is None:
+        return httpx.Client(http2=settings.http2, **options)
+    if is_asgi_app(app):
+        return httpx.Client(transport=PortalASGITransport(app, portal), **options)
+    return httpx.Client(transport=httpx.WSGITransport(app=app), **options)
+
+
+def make_async_client(
+    settings: ApibeanOptions,
+    token_cache: Optional[TokenCache] = None,
+    app: Any = None,
+) -> httpx.AsyncClient:
+    """
+    Build a pooled asynchronous client, dispatching to ``app`` in-process
+    when it is an ASGI application.
+    """
+    options = _client_options(settings, token_cache)
+    if app is None:
+        return httpx.AsyncClient(http2=settings.http2, **options)
+    if not is_asgi_app(app):
+        raise TypeError("apibean_async_http_client requires an ASGI application")
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), **options)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import pytest
+
+from apibean.pytest.settings import get_settings
+
+RESET_MODES = ("truncate", "transaction", "incremental")
+
+
+@dataclass(slots=True)
+class DatabaseState:
+    """
+    What pytest-apibean knows about the database between two tests.
+
+    ``clean`` is true when the database is known to be in the state left by
+    ``apibean_reset_db``, for example after a test ran inside a transaction
+    that was rolled back. ``seeded`` is the seed fingerprint of the data
+    currently in the database, as long as no test wrote to it since it was
+    seeded, and ``seed_data`` the value ``apibean_seed_data`` returned for
+    it. ``transaction`` holds the outer transaction of the running
+    test, if any.
+
+    The remaining fields count how many resets and seedings ran, and how
+    many were avoided, over the session. ``partial_resets`` counts the
+    resets limited to the tables written by the previous tests, and
+    ``tables_reset`` the tables they cleared.
+    """
+    clean: bool = False
+    seeded: Optional[str] = None
+    seed_data: Optional[dict] = None
+    transaction: Optional[Any] = None
+    resets: int = 0
+    resets_avoided: int = 0
+    partial_resets: int = 0
+    tables_reset: int = 0
+    seedings: int = 0
+    seedings_avoided: int = 0
+
+
+db_state_key = pytest.StashKey[DatabaseState]()
+
+
+def get_db_state(config: pytest.Config) -> DatabaseState:
+    state = config.stash.get(db_state_key, None)
+    if state is None:
+        state = config.stash[db_state_key] = DatabaseState()
+    return state
+
+
+def is_readonly(node) -> bool:
+    return node.get_closest_marker("apibean_readonly") is not None
+
+
+def resolve_reset_mode(node) -> str:
+    """
+    Return the reset mode of a test node.
+
+    The closest ``@pytest.mark.apibean_reset(mode)`` marker wins, falling
+    back to the ``reset_mode`` option. ``@pytest.mark.apibean_commits``
+    turns ``"transaction"`` into ``"truncate"``, since a test relying on
+    real commits cannot run inside a rolled back transaction; commits are
+    tracked like any other write by the ``"incremental"`` mode.
+    """
+    marker = node.get_closest_marker("apibean_reset")
+    if marker is not None:
+        mode = marker.args[0] if marker.args else marker.kwargs.get("mode")
+    else:
+        mode = get_settings().reset_mode
+
+    if mode not in RESET_MODES:
+        raise ValueError(f"Invalid apibean reset mode: '{mode}' (must be one of {', '.join(RESET_MODES)})")
+    if mode == "transaction" and node.get_closest_marker("apibean_commits") is not None:
+        return "truncate"
+    return mode
@@ -0,0 +1,192 @@
+"""
+Load-test mode: run a test body repeatedly and concurrently.
+"""
+
+from __future__ import annotations
+
+import inspect
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Optional
+
+import pytest
+
+
+@dataclass(slots=True)
+class LoadResult:
+    nodeid: str
+    concurrency: int
+    elapsed: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    first_error: Optional[BaseException] = None
+
+    @property
+    def iterations(self) -> int:
+        return len(self.latencies) + self.errors
+
+    @property
+    def throughput(self) -> float:
+        return self.iterations / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.iterations if self.iterations else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Nearest-rank percentile of successful iterations, in seconds"""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = max(1, math.ceil(q / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+
+@dataclass(slots=True)
+class LoadSpec:
+    """
+    Arguments of ``@pytest.mark.apibean_load``.
+
+    The test body runs ``concurrency`` copies at once until ``duration``
+    seconds have elapsed or ``iterations`` runs completed. ``rate`` caps
+    the number of iterations started per second across all copies.
+    ``p50_ms``, ``p95_ms``, ``p99_ms`` and ``max_error_rate`` are the SLO
+    thresholds the test fails on.
+    """
+    concurrency: int = 4
+    duration: float = 5.0
+    rate: Optional[float] = None
+    iterations: Optional[int] = None
+    p50_ms: Optional[float] = None
+    p95_ms: Optional[float] = None
+    p99_ms: Optional[float] = None
+    max_error_rate: float = 0.0
+
+    @classmethod
+    def from_marker(cls, marker) -> "LoadSpec":
+        unknown = set(marker.kwargs) - {spec_field.name for spec_field in fields(cls)}
+        if unknown or marker.args:
+            raise pytest.UsageError(
+                f"Unknown apibean_load arguments: {', '.join(sorted(unknown)) or 'positional arguments'}"
+            )
+
+        from apibean.pytest.settings import get_settings
+        settings = get_settings()
+        return cls(**{
+            "concurrency": settings.load_concurrency,
+            "duration": settings.load_duration,
+            **marker.kwargs,
+        })
+
+    def violations(self, result: LoadResult) -> list[str]:
+        found = []
+        for q, threshold in ((50, self.p50_ms), (95, self.p95_ms), (99, self.p99_ms)):
+            value = result.percentile(q) * 1000
+            if threshold is not None and value > threshold:
+                found.append(f"p{q} {value:.2f}ms > {threshold:.2f}ms")
+        if result.error_rate > self.max_error_rate:
+            found.append(f"error rate {result.error_rate:.2%} > {self.max_error_rate:.2%} (first error: {result.first_error!r})")
+        return found
+
+
+class _Pacer:
+    """Hand out start times so that at most ``rate`` iterations start per second"""
+
+    def __init__(self, started: float, rate: Optional[float], iterations: Optional[int], deadline: float):
+        self.started = started
+        self.interval = 1 / rate if rate else 0.0
+        self.iterations = iterations
+        self.deadline = deadline
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def next_slot(self) -> Optional[float]:
+        with self.lock:
+            if self.iterations is not None and self.count >= self.iterations:
+                return None
+            slot = self.started + self.count * self.interval
+            if slot >= self.deadline:
+                return None
+            self.count += 1
+            return slot
+
+
+def run_load(
+    nodeid: str,
+    func: Callable,
+    kwargs: dict,
+    spec: LoadSpec,
+    portal: Any = None,
+) -> LoadResult:
+    """
+    Run ``func(**kwargs)`` under load, on a thread pool, or as ``asyncio``
+    tasks on ``portal`` when ``func`` is a coroutine function.
+    """
+    result = LoadResult(nodeid, spec.concurrency)
+    lock = threading.Lock()
+    started = time.perf_counter()
+    pacer = _Pacer(started, spec.rate, spec.iterations, started + spec.duration)
+
+    def record(latency: Optional[float], error: Optional[BaseException]) -> None:
+        with lock:
+            if error is None:
+                result.latencies.append(latency)
+            else:
+                result.errors += 1
+                result.first_error = result.first_error or error
+
+    if inspect.iscoroutinefunction(func):
+        async def worker():
+            import anyio
+            while (slot := pacer.next_slot()) is not None:
+                await anyio.sleep(max(0.0, slot - time.perf_counter()))
+                begin = time.perf_counter()
+                try:
+                    await func(**kwargs)
+                except Exception as e:
+                    record(None, e)
+                else:
+                    record(time.perf_counter() - begin, None)
+
+        async def run_all():
+            import anyio
+            async with anyio.create_task_group() as tg:
+                for _ in range(spec.concurrency):
+                    tg.start_soon(worker)
+
+        portal.call(run_all)
+    else:
+        def worker():
+            while (slot := pacer.next_slot()) is not None:
+                time.sleep(max(0.0, slot - time.perf_counter()))
+                begin = time.perf_counter()
+                try:
+                    func(**kwargs)
+                except Exception as e:
+                    record(None, e)
+                else:
+                    record(time.perf_counter() - begin, None)
+
+        with ThreadPoolExecutor(max_workers=spec.concurrency, thread_name_prefix="apibean-load") as pool:
+            for future in [pool.submit(worker) for _ in range(spec.concurrency)]:
+                future.result()
+
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def summary_lines(results: list[LoadResult]) -> list[str]:
+    lines = [f"{'iter':>7} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7}  test"]
+    for result in results:
+        lines.append(
+            f"{result.iterations:>7} {result.throughput:>9.1f} "
+            f"{result.percentile(50) * 1000:>7.2f}ms {result.percentile(95) * 1000:>7.2f}ms "
+            f"{result.percentile(99) * 1000:>7.2f}ms {result.errors:>7}  {result.nodeid}"
+        )
+    return lines
+
+
+load_results_key = pytest.StashKey[list]()
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import gc
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Optional
+
+import pytest
+
+
+@dataclass(slots=True)
+class PhaseMemory:
+    phase: str
+    label: Optional[str]
+    deltas: list[int] = field(default_factory=list)
+    levels: list[int] = field(default_factory=list)
+    explained: int = 0
+
+    @property
+    def allocated(self) -> int:
+        return sum(self.deltas)
+
+    @property
+    def growth(self) -> int:
+        return self.levels[-1] - self.levels[0] if self.levels else 0
+
+    @property
+    def name(self) -> str:
+        return self.phase if self.label is None else f"{self.phase} [{self.label}]"
+
+
+class MemoryProfiler:
+    """
+    Phase observer attributing memory growth to the phases of the Apibean
+    test case loop.
+
+    Enabled with ``--apibean-memprofile``, which starts ``tracemalloc``.
+    For every phase (``apibean_before_reset_db``, ``apibean_reset_db``,
+    each seeder, the test body, ...) the profiler records how much traced
+    memory was still allocated when the phase ended, compared to when it
+    started. Fixture values and seeder results are only released at
+    teardown, so this alone does not tell a leak: the traced memory is
+    also sampled before and after each test is torn down.
+
+    A phase is reported as a suspected leak when, over at least
+    ``min_samples`` runs, the memory left after the teardown of the tests
+    it ran in never decreased and grew by more than ``min_growth`` bytes
+    per run, and the memory the phase still held when it ended, beyond
+    what the teardown released, accounts for at least half of that
+    growth.
+
+    A ``tracemalloc`` snapshot is taken after the first test body and at
+    the end of the session; the allocation sites that grew the most in
+    between are listed in the report.
+
+    Memory is traced process-wide: phases running concurrently, such as
+    seeders with ``seed_workers`` above one, see each other's allocations.
+    """
+
+    def __init__(self, min_samples: int = 3, min_growth: int = 1024):
+        self.min_samples = min_samples
+        self.min_growth = min_growth
+        self.phases: dict[tuple, PhaseMemory] = {}
+        self.levels: list[int] = []
+        self.sites: list[tracemalloc.StatisticDiff] = []
+        self._running: dict[str, list[tuple[PhaseMemory, int]]] = {}
+        self._teardown_level: Optional[int] = None
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._owns_tracing = not tracemalloc.is_tracing()
+        if self._owns_tracing:
+            tracemalloc.start()
+
+    def start(self, nodeid: str, phase: str, label: Optional[str]):
+        return nodeid, phase, label, tracemalloc.get_traced_memory()[0]
+
+    def stop(self, token) -> None:
+        nodeid, phase, label, before = token
+        current = tracemalloc.get_traced_memory()[0]
+        entry = self.phases.get((phase, label))
+        if entry is None:
+            entry = self.phases[(phase, label)] = PhaseMemory(phase, label)
+        entry.deltas.append(current - before)
+        self._running.setdefault(nodeid, []).append((entry, current - before))
+        if phase == "test" and self._baseline is None:
+            self._baseline = self._snapshot()
+
+    def teardown_started(self, nodeid: str) -> None:
+        gc.collect()
+        self._teardown_level = tracemalloc.get_traced_memory()[0]
+
+    def sample(self, nodeid: str) -> None:
+        """Record the traced memory left once a test was torn down"""
+        gc.collect()
+        level = tracemalloc.get_traced_memory()[0]
+        growth = level - self.levels[-1] if self.levels else 0
+        # memory released by the teardown may have been held by any phase:
+        # only what a phase held beyond it may be retained by that phase
+        released = max(self._teardown_level - level, 0) if self._teardown_level is not None else 0
+        self._teardown_level = None
+        self.levels.append(level)
+        for entry, delta in self._running.pop(nodeid, ()):
+            entry.levels.append(level)
+            if len(entry.levels) > 1:
+                entry.explained += min(max(delta - released, 0), max(growth, 0))
+
+    def finish(self, top: int) -> None:
+        """Compare the allocation sites with the baseline and stop tracing"""
+        if self._baseline is not None and tracemalloc.is_tracing():
+            stats = self._snapshot().compare_to(self._baseline, "lineno")
+            self.sites = [stat for stat in stats if stat.size_diff > 0][:top]
+        self._baseline = None
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    def suspects(self) -> list[PhaseMemory]:
+        """Phases retaining memory across the tests they ran in, largest growth first"""
+        return sorted(
+            (
+                entry for entry in self.phases.values()
+                if len(entry.levels) >= self.min_samples
+                and all(later >= earlier for earlier, later in zip(entry.levels, entry.levels[1:]))
+                and entry.growth > self.min_growth * (len(entry.levels) - 1)
+                and entry.explained * 2 >= entry.growth
+            ),
+            key=lambda entry: entry.growth,
+            reverse=True,
+        )
+
+    def summary_lines(self, top: int) -> list[str]:
+        lines = []
+        if len(self.levels) > 1:
+            lines.append(
+                f"traced memory after teardown: {_kib(self.levels[0])} -> {_kib(self.levels[-1])} "
+                f"({_kib(self.levels[-1] - self.levels[0], sign=True)})"
+            )
+        lines.append(f"{'held':>12} {'count':>7}  phase")
+        for entry in sorted(self.phases.values(), key=lambda entry: entry.allocated, reverse=True)[:top]:
+            lines.append(f"{_kib(entry.allocated, sign=True):>12} {len(entry.deltas):>7}  {entry.name}")
+
+        suspects = self.suspects()
+        if suspects:
+            lines.append("")
+            lines.append("retaining memory across tests:")
+            for entry in suspects[:top]:
+                lines.append(f"  {entry.name}: {_kib(entry.growth, sign=True)} over {len(entry.levels)} runs")
+
+        if self.sites:
+            lines.append("")
+            lines.append("top allocation sites since the first test:")
+            for stat in self.sites:
+                frame = stat.traceback[0]
+                lines.append(f"  {_kib(stat.size_diff, sign=True):>12} {stat.count_diff:>+8} blocks  {frame.filename}:{frame.lineno}")
+        return lines
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+
+def _kib(size: int, sign: bool = False) -> str:
+    return f"{size / 1024:{'+' if sign else ''}.1f} KiB"
+
+
+memprofiler_key = pytest.StashKey[MemoryProfiler]()
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from contextlib import contextmanager, nullcontext
+from typing import Any, Optional, Protocol
+
+import pytest
+
+
+class PhaseObserver(Protocol):
+    """
+    Receives the start and end of every phase of the Apibean test case loop
+    """
+
+    def start(self, nodeid: str, phase: str, label: Optional[str]) -> Any: ...
+    def stop(self, token: Any) -> None: ...
+
+
+phase_observers_key = pytest.StashKey[list]()
+
+
+def add_phase_observer(config: pytest.Config, observer: PhaseObserver) -> None:
+    config.stash.setdefault(phase_observers_key, []).append(observer)
+
+
+def phase(config: pytest.Config, nodeid: str, name: str, label: Optional[str] = None):
+    """
+    Return a context manager delimiting one phase of a test.
+
+    Phases are named after the fixture or step they cover
+    (``apibean_before_reset_db``, ``apibean_reset_db``, ``seeder``,
+    ``login``, ``test``, ...); ``label`` distinguishes instances of the same
+    phase, such as the seed name of a seeder run.
+
+    When no observer is registered, a shared no-op context manager is
+    returned, so instrumented code paths cost a dictionary lookup.
+    """
+    observers = config.stash.get(phase_observers_key, None)
+    if not observers:
+        return nullcontext()
+    return _observe(observers, nodeid, name, label)
+
+
+@contextmanager
+def _observe(observers: list, nodeid: str, name: str, label: Optional[str]):
+    tokens = [observer.start(nodeid, name, label) for observer in observers]
+    try:
+        yield
+    finally:
+        for observer, token in zip(reversed(observers), reversed(tokens)):
+            observer.stop(token)
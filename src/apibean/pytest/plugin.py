@@ -1,12 +1,25 @@
+import inspect
 from dataclasses import asdict
+from pathlib import Path
 
 import pytest
 
 from .fixtures.auth import *
+from .fixtures.cassette import *
 from .fixtures.config import *
 from .fixtures.container import *
 from .fixtures.database import *
+from .fixtures.http import *
+from .fixtures.portal import *
 from .fixtures.seeds import *
+from .fixtures.snapshots import *
+from .fixtures.warmup import *
+from .fixtures.workers import *
+
+
+def pytest_addhooks(pluginmanager):
+    from . import hooks
+    pluginmanager.add_hookspecs(hooks)
 
 
 def pytest_addoption(parser):
@@ -15,12 +28,419 @@ def pytest_addoption(parser):
         action="store_true",
         help="Show apibean pytest configuration",
     )
+    parser.addoption(
+        "--apibean-group-seeds",
+        action="store_true",
+        help="Run tests sharing the same seed markers next to each other",
+    )
+    parser.addoption(
+        "--apibean-dist-seeds",
+        action="store_true",
+        help="With pytest-xdist, send tests sharing the same seed markers to the same worker",
+    )
+    parser.addoption(
+        "--apibean-cassette",
+        choices=("off", "record", "replay", "hybrid"),
+        default=None,
+        help="Record or replay calls made through the api_invoker (default: cassette_mode option)",
+    )
+    parser.addoption(
+        "--apibean-load",
+        action="store_true",
+        help="Run tests marked with apibean_load under load and report latency percentiles",
+    )
+    parser.addoption(
+        "--apibean-affected",
+        action="store_true",
+        help="Only run tests whose test file, seeders or wrapped services changed since they last passed",
+    )
+    parser.addoption(
+        "--apibean-warmup",
+        action="store_true",
+        help="Warm up container services, database and tokens on a background thread during collection",
+    )
+    parser.addoption(
+        "--apibean-queries",
+        action="store_true",
+        help="Count the queries of every test on apibean_db and report the tests running the most",
+    )
+    parser.addoption(
+        "--apibean-profile",
+        action="store_true",
+        help="Time every phase of the apibean test case loop and report the hot spots",
+    )
+    parser.addoption(
+        "--apibean-profile-top",
+        type=int,
+        default=10,
+        help="Number of entries shown in the apibean profile and memory summaries (default: 10)",
+    )
+    parser.addoption(
+        "--apibean-memprofile",
+        action="store_true",
+        help="Trace memory retained by every phase of the apibean test case loop and report suspected leaks",
+    )
+    parser.addoption(
+        "--apibean-profile-json",
+        metavar="PATH",
+        default=None,
+        help="Write the apibean profile report as JSON to PATH (implies --apibean-profile)",
+    )
+
+
+def pytest_configure(config):
+    if config.pluginmanager.hasplugin("xdist"):
+        from . import distributed
+        config.pluginmanager.register(distributed, "apibean-distributed")
+
+    config.addinivalue_line(
+        "markers",
+        "seed(name, **kwargs): seed test data with the '<module>.<variant>' apibean seeder",
+    )
+    config.addinivalue_line(
+        "markers",
+        "apibean_reset(mode): reset the database with 'truncate', 'transaction' or 'incremental' before this test",
+    )
+    config.addinivalue_line(
+        "markers",
+        "apibean_commits: this test needs real commits and cannot run inside a rolled back transaction",
+    )
+    config.addinivalue_line(
+        "markers",
+        "apibean_readonly: this test does not write to the database and may reuse the seeded state",
+    )
+    config.addinivalue_line(
+        "markers",
+        "apibean_load(concurrency, duration, rate, iterations, p50_ms, p95_ms, p99_ms, max_error_rate): "
+        "run this test body under load with --apibean-load",
+    )
+    config.addinivalue_line(
+        "markers",
+        "apibean_query_budget(max_queries, max_time_ms): fail this test when its body exceeds the query budget on apibean_db",
+    )
+
+    if _affected_enabled(config) and not hasattr(config, "workerinput"):
+        from .affected import AffectedRecorder
+        config.pluginmanager.register(AffectedRecorder(config), "apibean-affected")
+
+    if config.getoption("--apibean-profile") or config.getoption("--apibean-profile-json"):
+        from .phases import add_phase_observer
+        from .profiler import PhaseProfiler, profiler_key
+        profiler = config.stash[profiler_key] = PhaseProfiler()
+        add_phase_observer(config, profiler)
+
+    if config.getoption("--apibean-memprofile"):
+        from .phases import add_phase_observer
+        from .memprofile import MemoryProfiler, memprofiler_key
+        memprofiler = config.stash[memprofiler_key] = MemoryProfiler()
+        add_phase_observer(config, memprofiler)
+
+
+def pytest_sessionstart(session):
+    config = session.config
+    if getattr(config.option, "numprocesses", None) and not hasattr(config, "workerinput"):
+        # pytest-xdist controller: tests run on the workers
+        return
+    if config.getoption("--apibean-warmup") or _warmup_enabled():
+        from .warmup import Warmup, warmup_key
+        warmup = config.stash[warmup_key] = Warmup(config)
+        warmup.start()
+
+
+def _warmup_enabled() -> bool:
+    from .settings import get_settings
+    return get_settings().warmup
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtestloop(session):
+    """
+    Wait for the background warm-up before any test, and so any session
+    fixture, is set up: those fixtures would otherwise build the container,
+    the database and the config on the main thread while the warm-up thread
+    is still building them.
+
+    A warm-up that times out or fails (for example on bad credentials)
+    stops the session: tests would otherwise run against objects the
+    session fixtures silently build again.
+    """
+    from .warmup import warmup_key
+    warmup = session.config.stash.get(warmup_key, None)
+    if warmup is None or session.config.option.collectonly:
+        return None
+    try:
+        result = warmup.join()
+    except TimeoutError as e:
+        pytest.exit(str(e), returncode=pytest.ExitCode.INTERNAL_ERROR)
+    if result.error is not None:
+        error = result.error
+        pytest.exit(
+            f"apibean warm-up failed: {type(error).__name__}: {error}",
+            returncode=pytest.ExitCode.INTERNAL_ERROR,
+        )
+    return None
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    from .phases import phase
+    from .queries import query_counter_key
+    counter = item.stash.get(query_counter_key, None)
+    if counter is not None:
+        counter.phase = "body"
+    with phase(item.config, item.nodeid, "test"):
+        yield
+    if counter is not None:
+        counter.phase = None
+        if item.config.getoption("--apibean-queries"):
+            from .queries import query_results_key
+            item.config.stash.setdefault(query_results_key, []).append((item.nodeid, counter))
+
+
+@pytest.hookimpl(trylast=True, specname="pytest_runtest_call")
+def pytest_runtest_call_query_budget(item):
+    from .queries import query_counter_key
+    counter = item.stash.get(query_counter_key, None)
+    marker = item.get_closest_marker("apibean_query_budget")
+    if counter is None or marker is None:
+        return
+
+    from .queries import QueryBudget, failure_message
+    budget = QueryBudget.from_marker(marker)
+    if budget.max_time_ms is not None and counter.body.count and not counter.body.timed:
+        import warnings
+        warnings.warn(pytest.PytestWarning(
+            "apibean_query_budget(max_time_ms) is not enforced: apibean_db does not report query durations"
+        ))
+    violations = budget.violations(counter.body)
+    if violations:
+        pytest.fail(failure_message(violations, counter), pytrace=False)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_teardown(item):
+    memprofiler = None
+    if item.config.getoption("--apibean-memprofile"):
+        from .memprofile import memprofiler_key
+        memprofiler = item.config.stash.get(memprofiler_key, None)
+    if memprofiler is not None:
+        memprofiler.teardown_started(item.nodeid)
+    yield
+    if memprofiler is not None:
+        memprofiler.sample(item.nodeid)
+
+
+def _affected_enabled(config) -> bool:
+    return config.getoption("--apibean-affected") and getattr(config, "cache", None) is not None
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    if call.when != "teardown" or not _affected_enabled(item.config):
+        return
+    from .affected import item_files_key, service_files_key
+    report = outcome.get_result()
+    report.apibean_files = item.stash.get(item_files_key, None)
+    services = item.config.stash.get(service_files_key, None)
+    if services:
+        report.apibean_services = services
+        item.config.stash[service_files_key] = {}
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    if not pyfuncitem.config.getoption("--apibean-load"):
+        return None
+    marker = pyfuncitem.get_closest_marker("apibean_load")
+    if marker is None:
+        return None
+
+    from .load import LoadSpec, load_results_key, run_load
+    spec = LoadSpec.from_marker(marker)
+    func = pyfuncitem.obj
+    kwargs = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    portal = None
+    if inspect.iscoroutinefunction(func):
+        from .portal import get_portal
+        portal = get_portal(pyfuncitem.config)
+
+    result = run_load(pyfuncitem.nodeid, func, kwargs, spec, portal)
+    pyfuncitem.config.stash.setdefault(load_results_key, []).append(result)
+
+    violations = spec.violations(result)
+    if violations:
+        pytest.fail("apibean load SLO exceeded: " + "; ".join(violations), pytrace=False)
+    return True
+
+
+def pytest_sessionfinish(session, exitstatus):
+    from .memprofile import memprofiler_key
+    memprofiler = session.config.stash.get(memprofiler_key, None)
+    if memprofiler is not None:
+        memprofiler.finish(session.config.getoption("--apibean-profile-top"))
+
+    from .profiler import profiler_key
+    profiler = session.config.stash.get(profiler_key, None)
+    path = session.config.getoption("--apibean-profile-json")
+    if profiler is not None and path:
+        path = Path(path)
+        workerinput = getattr(session.config, "workerinput", None)
+        if workerinput is not None:
+            path = path.with_name(f"{path.stem}.{workerinput['workerid']}{path.suffix}")
+        profiler.write_json(path)
+
+
+def pytest_unconfigure(config):
+    from .portal import close_portal
+    close_portal(config)
 
 
 def pytest_cmdline_main(config):
     if config.getoption("--apibean-show-config"):
-        from .settings import settings
+        from .settings import get_settings
         print("\n[pytest-apibean config]")
-        for k, v in asdict(settings).items():
+        for k, v in asdict(get_settings()).items():
             print(f"  {k} = {v}")
         return pytest.ExitCode.OK
+
+
+def pytest_collection_modifyitems(session, config, items):
+    from .seeders import (
+        find_missing_abstract_fixtures,
+        get_seeder_index,
+        group_by_seed_fingerprint,
+        missing_abstract_key,
+    )
+    from .settings import get_settings
+    settings = get_settings()
+    if config.getoption("--apibean-group-seeds") or settings.group_seeds:
+        items[:] = group_by_seed_fingerprint(items)
+
+    if settings.seed_validate:
+        errors = get_seeder_index(config).build(session, items, settings.seed_modules)
+        if errors:
+            raise pytest.UsageError(
+                "pytest-apibean could not resolve the following seeds:\n  "
+                + "\n  ".join(errors)
+            )
+        config.stash[missing_abstract_key] = find_missing_abstract_fixtures(
+            session, items, required=("apibean_reset_db", "apibean_container"),
+        )
+
+    if _affected_enabled(config):
+        _select_affected(session, config, items, settings)
+
+
+def _select_affected(session, config, items, settings):
+    from .affected import item_files, item_files_key, select_affected
+    from .seeders import overrides_seed_modules, get_seeder_index, iter_seed_markers
+    index = get_seeder_index(config)
+    for item in items:
+        if overrides_seed_modules(session, item):
+            # seed modules chỉ biết khi test chạy: luôn chọn test này
+            continue
+        try:
+            steps = index.plan(settings.seed_modules, iter_seed_markers(item))
+        except (ValueError, RuntimeError):
+            # the seed error is reported when the test runs: always select it
+            continue
+        item.stash[item_files_key] = item_files(config, item, steps)
+
+    selected, deselected = select_affected(config, items, item_files_key)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+
+def pytest_report_collectionfinish(config, items):
+    from .seeders import missing_abstract_key
+    missing = config.stash.get(missing_abstract_key, None)
+    if not missing:
+        return None
+    return [
+        f"pytest-apibean: abstract fixture '{name}' is not provided by the application ({count} tests will be skipped)"
+        for name, count in sorted(missing.items())
+    ]
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    from .tokens import token_cache_key
+    cache = config.stash.get(token_cache_key, None)
+    if cache is not None and (cache.hits or cache.misses):
+        terminalreporter.write_sep("-", "apibean token cache")
+        terminalreporter.write_line(
+            f"{cache.hits} hits, {cache.misses} misses "
+            f"({cache.refreshes} refreshed before expiry)"
+        )
+
+    from .lifecycle import db_state_key
+    state = config.stash.get(db_state_key, None)
+    if state is not None and (state.resets_avoided or state.seedings_avoided or state.partial_resets):
+        terminalreporter.write_sep("-", "apibean test case loop")
+        terminalreporter.write_line(
+            f"{state.resets} resets, {state.resets_avoided} avoided; "
+            f"{state.seedings} seedings, {state.seedings_avoided} avoided"
+        )
+        if state.partial_resets:
+            terminalreporter.write_line(
+                f"{state.partial_resets} incremental resets ({state.tables_reset} tables)"
+            )
+
+    from .warmup import warmup_key
+    warmup = config.stash.get(warmup_key, None)
+    if warmup is not None and warmup.result.duration:
+        result = warmup.result
+        terminalreporter.write_sep("-", "apibean warm-up")
+        terminalreporter.write_line(
+            f"{len(result.services)} services, {len(result.tokens)} tokens in {result.duration:.3f}s"
+            + (f" (failed: {result.error!r})" if result.error is not None else "")
+        )
+
+    from .queries import query_results_key
+    queries = config.stash.get(query_results_key, None)
+    if queries:
+        top = config.getoption("--apibean-profile-top")
+        terminalreporter.write_sep("-", "apibean queries")
+        terminalreporter.write_line(f"{'body':>7} {'seed':>7} {'time':>10}  test")
+        for nodeid, counter in sorted(queries, key=lambda entry: entry[1].body.count, reverse=True)[:top]:
+            time = f"{counter.body.time * 1000:.1f}ms" if counter.body.timed else "-"
+            terminalreporter.write_line(f"{counter.body.count:>7} {counter.seed.count:>7} {time:>10}  {nodeid}")
+
+    from .profiler import profiler_key
+    profiler = config.stash.get(profiler_key, None)
+    if profiler is not None and profiler.timings:
+        terminalreporter.write_sep("-", "apibean profile")
+        for line in profiler.summary_lines(config.getoption("--apibean-profile-top")):
+            terminalreporter.write_line(line)
+
+    from .memprofile import memprofiler_key
+    memprofiler = config.stash.get(memprofiler_key, None)
+    if memprofiler is not None and memprofiler.phases:
+        terminalreporter.write_sep("-", "apibean memory")
+        for line in memprofiler.summary_lines(config.getoption("--apibean-profile-top")):
+            terminalreporter.write_line(line)
+
+    from .load import load_results_key, summary_lines
+    results = config.stash.get(load_results_key, None)
+    if results:
+        terminalreporter.write_sep("-", "apibean load")
+        for line in summary_lines(results):
+            terminalreporter.write_line(line)
+
+    from .cassette import cassette_key
+    cassette = config.stash.get(cassette_key, None)
+    if cassette is not None:
+        terminalreporter.write_sep("-", "apibean cassette")
+        terminalreporter.write_line(
+            f"{cassette.mode}: {cassette.hits} replayed, {cassette.misses} missed ({cassette.path})"
+        )
+
+    from .snapshots.store import snapshot_store_key
+    store = config.stash.get(snapshot_store_key, None)
+    if store is not None and (store.hits or store.misses):
+        terminalreporter.write_sep("-", "apibean seed snapshots")
+        terminalreporter.write_line(
+            f"{store.hits} restored, {store.misses} seeded, "
+            f"{store.evictions} evicted"
+        )
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import inspect
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from apibean.pytest.settings import get_settings
+
+if TYPE_CHECKING:
+    from anyio.from_thread import BlockingPortal
+
+portal_key = pytest.StashKey[tuple]()
+
+
+def get_portal(config: pytest.Config) -> BlockingPortal:
+    """
+    Return the session-wide blocking portal, starting its event loop thread
+    on first use.
+
+    The portal runs a single event loop for the whole session on the
+    ``anyio_backend`` option. It is stopped by
+    ``close_portal()`` when pytest unconfigures.
+    """
+    entry = config.stash.get(portal_key, None)
+    if entry is None:
+        from anyio.from_thread import start_blocking_portal
+        manager = start_blocking_portal(backend=get_settings().anyio_backend)
+        entry = config.stash[portal_key] = (manager.__enter__(), manager)
+    return entry[0]
+
+
+def close_portal(config: pytest.Config) -> None:
+    entry = config.stash.get(portal_key, None)
+    if entry is not None:
+        del config.stash[portal_key]
+        entry[1].__exit__(None, None, None)
+
+
+async def _await(awaitable):
+    return await awaitable
+
+
+def resolve(request: pytest.FixtureRequest, value: Any) -> Any:
+    """
+    Return ``value``, or its result when it is awaitable, awaiting it on the
+    event loop of ``apibean_portal``.
+
+    This lets fixtures call services that may be implemented either
+    synchronously or asynchronously by the application.
+    """
+    if inspect.isawaitable(value):
+        return request.getfixturevalue("apibean_portal").call(_await, value)
+    return value
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+
+@dataclass(slots=True)
+class PhaseTiming:
+    nodeid: str
+    phase: str
+    label: Optional[str]
+    duration: float
+    in_test: bool = False
+
+
+class PhaseProfiler:
+    """
+    Phase observer timing every phase of the Apibean test case loop.
+
+    Enabled with ``--apibean-profile``. Timings are aggregated per phase
+    and label (for example per seeder) and per test; the slowest entries
+    are shown in the terminal summary and the full report can be written
+    as JSON with ``--apibean-profile-json`` to be compared between runs.
+
+    Phases started from the test body, such as ``login`` calls made by the
+    test, are marked ``in_test``: their time is already part of the body.
+    """
+
+    def __init__(self):
+        self.timings: list[PhaseTiming] = []
+        self._running: set[str] = set()
+
+    def start(self, nodeid: str, phase: str, label: Optional[str]):
+        in_test = nodeid in self._running
+        if phase == "test":
+            self._running.add(nodeid)
+        return nodeid, phase, label, in_test, time.perf_counter()
+
+    def stop(self, token) -> None:
+        nodeid, phase, label, in_test, started = token
+        self.timings.append(PhaseTiming(nodeid, phase, label, time.perf_counter() - started, in_test))
+        if phase == "test":
+            self._running.discard(nodeid)
+
+    def by_phase(self) -> list[dict]:
+        """
+        Aggregate timings per ``(phase, label)``, slowest total first.
+        """
+        groups: dict[tuple, list[float]] = {}
+        for timing in self.timings:
+            groups.setdefault((timing.phase, timing.label), []).append(timing.duration)
+        return sorted(
+            (
+                {
+                    "phase": phase,
+                    "label": label,
+                    "count": len(durations),
+                    "total": sum(durations),
+                    "mean": sum(durations) / len(durations),
+                    "max": max(durations),
+                }
+                for (phase, label), durations in groups.items()
+            ),
+            key=lambda entry: entry["total"],
+            reverse=True,
+        )
+
+    def by_test(self) -> list[dict]:
+        """
+        Aggregate timings per test, separating the test body from the
+        fixture overhead added by the test case loop, largest overhead first.
+        Phases nested in the test body count in the body only.
+        """
+        tests: dict[str, dict] = {}
+        for timing in self.timings:
+            entry = tests.setdefault(timing.nodeid, {"nodeid": timing.nodeid, "body": 0.0, "overhead": 0.0})
+            if timing.phase == "test":
+                entry["body"] += timing.duration
+            elif not timing.in_test:
+                entry["overhead"] += timing.duration
+        return sorted(tests.values(), key=lambda entry: entry["overhead"], reverse=True)
+
+    def report(self) -> dict:
+        return {
+            "phases": self.by_phase(),
+            "tests": self.by_test(),
+            "timings": [asdict(timing) for timing in self.timings],
+        }
+
+    def write_json(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2))
+
+    def summary_lines(self, top: int) -> list[str]:
+        lines = [f"{'total':>10} {'mean':>10} {'count':>7}  phase"]
+        for entry in self.by_phase()[:top]:
+            name = entry["phase"] if entry["label"] is None else f"{entry['phase']} [{entry['label']}]"
+            lines.append(f"{entry['total']:>9.3f}s {entry['mean'] * 1000:>8.2f}ms {entry['count']:>7}  {name}")
+        lines.append("")
+        lines.append(f"{'overhead':>10} {'body':>10}  test")
+        for entry in self.by_test()[:top]:
+            lines.append(f"{entry['overhead']:>9.3f}s {entry['body']:>9.3f}s  {entry['nodeid']}")
+        return lines
+
+
+profiler_key = pytest.StashKey[PhaseProfiler]()
@@ -1,5 +1,9 @@
-from typing import Protocol, runtime_checkable
-from dependency_injector.providers import Provider
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Protocol, runtime_checkable
+
+if TYPE_CHECKING:
+    from dependency_injector.providers import Provider
 
 
 @runtime_checkable
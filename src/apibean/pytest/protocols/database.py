@@ -0,0 +1,11 @@
+from typing import Protocol, runtime_checkable
+
+@runtime_checkable
+class ApibeanBulkInsert(Protocol):
+    """
+    Bulk-insert hook of ``apibean_db`` used by data-file seeders
+    """
+
+    def bulk_insert(self, table: str, rows: list[dict]) -> None:
+        """Insert a batch of rows, given as column/value mappings, into ``table``"""
+        ...
@@ -0,0 +1,19 @@
+from typing import Protocol, runtime_checkable
+
+@runtime_checkable
+class ApibeanSnapshotBackend(Protocol):
+    """
+    Storage strategy for seeded database snapshots
+    """
+
+    def capture(self, key: str) -> int:
+        """Capture the current database state under ``key``, returning its size in bytes"""
+        ...
+
+    def restore(self, key: str) -> None:
+        """Replace the current database state with the snapshot stored under ``key``"""
+        ...
+
+    def discard(self, key: str) -> None:
+        """Release the storage held by the snapshot stored under ``key``"""
+        ...
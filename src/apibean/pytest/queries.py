@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+import pytest
+
+from apibean.pytest.statements import is_transaction_control
+
+PHASES = ("seed", "body")
+
+
+@dataclass(slots=True)
+class QueryStats:
+    count: int = 0
+    time: float = 0.0
+    timed: int = 0
+    statements: Counter = field(default_factory=Counter)
+
+    def repeated(self, top: int = 5) -> list[tuple[str, int]]:
+        """
+        Return the most repeated statements, normalized so that statements
+        differing only by literal values are counted together.
+        """
+        normalized: Counter = Counter()
+        for statement, count in self.statements.items():
+            normalized[normalize_statement(statement)] += count
+        return [(statement, count) for statement, count in normalized.most_common(top) if count > 1]
+
+
+class QueryCounter:
+    """
+    Statement tap listener counting and timing the queries of one test.
+
+    Queries are attributed to the ``"seed"`` phase while
+    ``apibean_seed_data`` runs and to the ``"body"`` phase while the test
+    function runs; other queries (resets, fixtures) are ignored, and so
+    are transaction control statements, whose number depends on the reset
+    mode (``"transaction"`` adds savepoints) rather than on the test.
+    Durations are only available on backends reporting them (see
+    ``attach_statement_tap()``).
+    """
+
+    def __init__(self):
+        self.phase: Optional[str] = None
+        self.seed = QueryStats()
+        self.body = QueryStats()
+
+    def __call__(self, statement: str, duration: Optional[float] = None) -> None:
+        if self.phase is None or is_transaction_control(statement):
+            return
+        stats = self.body if self.phase == "body" else self.seed
+        stats.count += 1
+        stats.statements[statement] += 1
+        if duration is not None:
+            stats.time += duration
+            stats.timed += 1
+
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|\$\d+|:\w+|%\(\w+\)s|%s")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    statement = _LITERALS.sub("?", statement)
+    statement = _LISTS.sub("(...)", statement)
+    return _SPACES.sub(" ", statement).strip()
+
+
+@dataclass(frozen=True, slots=True)
+class QueryBudget:
+    """
+    Limits of ``@pytest.mark.apibean_query_budget(max_queries, max_time_ms)``
+    on the queries of the test body.
+    """
+    max_queries: Optional[int] = None
+    max_time_ms: Optional[float] = None
+
+    @classmethod
+    def from_marker(cls, marker) -> "QueryBudget":
+        kwargs = dict(zip(("max_queries", "max_time_ms"), marker.args))
+        kwargs.update(marker.kwargs)
+        unknown = set(kwargs) - {"max_queries", "max_time_ms"}
+        if unknown:
+            raise pytest.UsageError(f"Unknown apibean_query_budget arguments: {', '.join(sorted(unknown))}")
+        return cls(**kwargs)
+
+    def violations(self, stats: QueryStats) -> list[str]:
+        violations = []
+        if self.max_queries is not None and stats.count > self.max_queries:
+            violations.append(f"{stats.count} queries > max_queries={self.max_queries}")
+        if self.max_time_ms is not None and stats.timed and stats.time * 1000 > self.max_time_ms:
+            violations.append(f"{stats.time * 1000:.1f}ms > max_time_ms={self.max_time_ms}")
+        return violations
+
+
+def failure_message(violations: list[str], counter: QueryCounter) -> str:
+    lines = ["apibean query budget exceeded: " + "; ".join(violations)]
+    lines.append(f"  seeding: {counter.seed.count} queries, test body: {counter.body.count} queries")
+    repeated = counter.body.repeated()
+    if repeated:
+        lines.append("  repeated statements in the test body:")
+        lines.extend(f"  {count:>6} x {statement}" for statement, count in repeated)
+    return "\n".join(lines)
+
+
+query_counter_key = pytest.StashKey[QueryCounter]()
+query_results_key = pytest.StashKey[list]()
@@ -0,0 +1,371 @@
+from __future__ import annotations
+
+import hashlib
+import importlib
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+import pytest
+
+
+def iter_seed_markers(node) -> list:
+    """
+    Return the ``seed`` markers of a test node in execution order.
+
+    ``iter_markers()`` yields the closest markers first (function, then
+    class, then module); seeders run in the reverse order so that markers
+    declared closer to the test can override or extend earlier seeded data.
+    """
+    return list(reversed(list(node.iter_markers("seed"))))
+
+
+def seed_fingerprint(markers: Iterable, seed_modules: Optional[str] = None) -> str:
+    """
+    Return a stable fingerprint of an ordered set of ``seed`` markers.
+
+    Two tests share a fingerprint when they declare the same seed names, in
+    the same order, with the same marker keyword arguments. Keyword values
+    that are not JSON serializable are fingerprinted by their ``repr()``.
+    When ``seed_modules`` is given, it is part of the fingerprint as well,
+    since the same markers seed different data from other seed modules.
+    """
+    spec = [
+        [list(marker.args), sorted(marker.kwargs.items())]
+        for marker in markers
+    ]
+    if seed_modules is not None:
+        spec.insert(0, seed_modules)
+    payload = json.dumps(spec, default=repr, separators=(",", ":"))
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def group_by_seed_fingerprint(items: list) -> list:
+    """
+    Reorder items so that tests sharing a seed fingerprint run next to each
+    other.
+
+    Tests are only grouped within their module and class, so that module
+    and class scoped fixtures are set up once, as in the collection order,
+    instead of being torn down and rebuilt for every cluster. Clusters keep
+    the order in which their first test was collected. Within a cluster,
+    ``apibean_readonly`` tests run first so that they can all reuse the
+    data seeded for the first of them; the order of tests is otherwise
+    preserved.
+    """
+    clusters: dict[tuple, list] = {}
+    for item in items:
+        fingerprint = seed_fingerprint(iter_seed_markers(item))
+        key = (getattr(item, "module", None), getattr(item, "cls", None), fingerprint)
+        clusters.setdefault(key, []).append(item)
+    return [
+        item
+        for cluster in clusters.values()
+        for item in sorted(cluster, key=lambda item: item.get_closest_marker("apibean_readonly") is None)
+    ]
+
+
+def parse_seed_marker(marker) -> tuple[str, str, dict]:
+    """
+    Return ``(seed_name, prefix, kwargs)`` for a ``seed`` marker.
+
+    Raises ``ValueError`` when the marker has no seed name or when the name
+    is not in the ``"module.variant"`` format.
+    """
+    # args[0] là seed name, kwargs chứa tham số bổ sung
+    seed_name = marker.args[0] if marker.args else marker.kwargs.get("name")
+    kwargs = marker.kwargs or {}
+
+    if not seed_name:
+        raise ValueError("Missing seed name in pytest.mark.seed()")
+
+    return seed_name, seed_prefix(seed_name), kwargs
+
+
+def seed_prefix(seed_name: str) -> str:
+    """
+    Return the ``module`` part of a ``"module.variant"`` seed name.
+    """
+    try:
+        prefix, variant = seed_name.split(".", 1)
+    except (ValueError, AttributeError) as e:
+        raise ValueError(f"Invalid seed name: '{seed_name}' (must be in format 'module.variant')") from e
+    return prefix
+
+
+def seeder_location(seed_modules: str, prefix: str) -> tuple[str, str]:
+    """
+    Return the ``(module_name, class_name)`` of the seeder handling seeds
+    named ``<prefix>.<variant>``.
+    """
+    module_name = f"{seed_modules}.{prefix}_seeder"
+    class_name = "".join(part.capitalize() for part in prefix.split("_")) + "Seeder"
+    return module_name, class_name
+
+
+@dataclass(frozen=True, slots=True)
+class SeedStep:
+    """
+    One seeder run of a seed plan.
+
+    ``marker`` is the position of the ``seed`` marker the step comes from,
+    whose keyword arguments are forwarded to the seeder, or ``None`` for
+    steps only required by other seeders. ``requires`` holds the positions,
+    in the plan, of the steps that must complete first.
+    """
+    seed_name: str
+    seeder_cls: type
+    marker: Optional[int]
+    requires: tuple[int, ...]
+
+
+def plan_seeders(markers: list, resolve: Callable[[str, str], type]) -> list[SeedStep]:
+    """
+    Return the seeder runs of a test in dependency order.
+
+    ``markers`` are the ``seed`` markers of the test in execution order and
+    ``resolve(prefix, seed_name)`` returns the seeder class of a seed name.
+
+    Seeder classes may declare two optional attributes:
+
+    - ``requires``: seed names that must be seeded before this seeder runs.
+      A requirement is satisfied by a marker, or a required seeder, with
+      that seed name or listing it in its ``provides``; otherwise it is
+      added to the plan without keyword arguments.
+    - ``provides``: additional seed names satisfied once this seeder ran.
+
+    Markers declaring the same seed name with the same keyword arguments
+    are only run once. Seeders that do not declare ``requires`` keep the
+    historical behaviour of running after the previous marker, so that
+    later markers can still override earlier seeded data, unless the
+    previous marker requires them (directly or through other seeders).
+
+    Raises ``ValueError`` when the requirements form a cycle.
+    """
+    names: list[str] = []
+    classes: list[type] = []
+    origins: list[Optional[int]] = []
+    provided: dict[str, int] = {}
+
+    def add(seed_name: str, prefix: str, marker: Optional[int]) -> int:
+        position = len(names)
+        seeder_cls = resolve(prefix, seed_name)
+        names.append(seed_name)
+        classes.append(seeder_cls)
+        origins.append(marker)
+        for name in (seed_name, *getattr(seeder_cls, "provides", ())):
+            provided.setdefault(name, position)
+        return position
+
+    requires: dict[int, list[int]] = {}
+    follows: dict[int, int] = {}
+    seen: set[tuple[str, str]] = set()
+    previous = None
+    for marker_position, marker in enumerate(markers):
+        seed_name, prefix, kwargs = parse_seed_marker(marker)
+        key = (seed_name, json.dumps(sorted(kwargs.items()), default=repr))
+        if key in seen:
+            continue
+        seen.add(key)
+        position = add(seed_name, prefix, marker_position)
+        if previous is not None and not hasattr(classes[position], "requires"):
+            follows[position] = previous
+        previous = position
+
+    position = 0
+    while position < len(names):
+        for name in getattr(classes[position], "requires", ()):
+            if name not in provided:
+                add(name, seed_prefix(name), None)
+            if provided[name] != position:
+                requires.setdefault(position, []).append(provided[name])
+        position += 1
+
+    def depends(position: int, target: int) -> bool:
+        stack, visited = [position], set()
+        while stack:
+            current = stack.pop()
+            if current == target:
+                return True
+            if current not in visited:
+                visited.add(current)
+                stack.extend(requires.get(current, ()))
+        return False
+
+    # the marker order only applies when it does not contradict a declared
+    # requirement: a marker seeding what an earlier marker requires runs first
+    for position, previous in follows.items():
+        if not depends(previous, position):
+            requires.setdefault(position, []).insert(0, previous)
+
+    # Kahn's algorithm, keeping the marker order between independent steps
+    pending = {position: set(requires.get(position, ())) for position in range(len(names))}
+    order: list[int] = []
+    while pending:
+        ready = [position for position, deps in pending.items() if not deps]
+        if not ready:
+            cycle = ", ".join(sorted({names[position] for position in pending}))
+            raise ValueError(f"Seed dependency cycle between: {cycle}")
+        for position in ready:
+            del pending[position]
+            order.append(position)
+        for deps in pending.values():
+            deps.difference_update(ready)
+
+    renumber = {position: index for index, position in enumerate(order)}
+    return [
+        SeedStep(
+            seed_name=names[position],
+            seeder_cls=classes[position],
+            marker=origins[position],
+            requires=tuple(sorted(renumber[dep] for dep in set(requires.get(position, ())))),
+        )
+        for position in order
+    ]
+
+
+def run_seed_plan(steps: list[SeedStep], run: Callable[[SeedStep], Any], workers: int = 1) -> list[Any]:
+    """
+    Call ``run(step)`` for every step of a seed plan and return the results
+    in plan order.
+
+    With ``workers`` greater than one, steps whose requirements completed
+    run concurrently on a thread pool. The first exception raised by a step
+    is propagated once the running steps finished; steps that were not
+    started yet are skipped.
+    """
+    if workers <= 1 or len(steps) <= 1:
+        return [run(step) for step in steps]
+
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    results: list[Any] = [None] * len(steps)
+    pending = {index: set(step.requires) for index, step in enumerate(steps)}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="apibean-seed") as pool:
+        running = {}
+        while pending or running:
+            for index in [index for index, deps in pending.items() if not deps]:
+                del pending[index]
+                running[pool.submit(run, steps[index])] = index
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = running.pop(future)
+                results[index] = future.result()
+                for deps in pending.values():
+                    deps.discard(index)
+    return results
+
+
+class SeederIndex:
+    """
+    Cache of seeder classes resolved from ``seed`` markers.
+
+    The index is filled once at collection time by ``build()``, which also
+    reports every malformed or unresolvable seed name, so that
+    ``apibean_seed_data`` only performs a dictionary lookup per seed marker.
+    Seeds that were not indexed at collection time (for example because the
+    test overrides ``apibean_seed_modules``) are resolved and cached on
+    first use.
+
+    When a seed has no seeder module, it resolves to a ``DataFileSeeder``
+    if a data file exists for it (see ``find_data_file_seeder()``).
+
+    Seed plans (see ``plan_seeders()``) are cached as well, per seed
+    modules and seed fingerprint.
+    """
+
+    def __init__(self):
+        self._classes: dict[tuple[str, str], type] = {}
+        self._plans: dict[tuple[str, str], list[SeedStep]] = {}
+
+    def __len__(self) -> int:
+        return len(self._classes)
+
+    def resolve(self, seed_modules: str, prefix: str, seed_name: str) -> type:
+        seeder_cls = self._classes.get((seed_modules, prefix)) or self._classes.get((seed_modules, seed_name))
+        if seeder_cls is None:
+            module_name, class_name = seeder_location(seed_modules, prefix)
+            try:
+                module = importlib.import_module(module_name)
+                seeder_cls = getattr(module, class_name)
+            except ModuleNotFoundError as e:
+                # không có module seeder: thử tìm data file cho seed này
+                from apibean.pytest.datafiles import find_data_file_seeder
+                seeder_cls = e.name == module_name and find_data_file_seeder(
+                    seed_modules, prefix, seed_name.split(".", 1)[1],
+                )
+                if not seeder_cls:
+                    raise RuntimeError(f"Couldn't load the class [{class_name}] for '{seed_name}': {e}") from e
+                self._classes[(seed_modules, seed_name)] = seeder_cls
+                return seeder_cls
+            except (ImportError, AttributeError) as e:
+                raise RuntimeError(f"Couldn't load the class [{class_name}] for '{seed_name}': {e}") from e
+            self._classes[(seed_modules, prefix)] = seeder_cls
+        return seeder_cls
+
+    def plan(self, seed_modules: str, markers: list) -> list[SeedStep]:
+        key = (seed_modules, seed_fingerprint(markers))
+        steps = self._plans.get(key)
+        if steps is None:
+            steps = plan_seeders(markers, lambda prefix, seed_name: self.resolve(seed_modules, prefix, seed_name))
+            self._plans[key] = steps
+        return steps
+
+    def build(self, session, items: Iterable, seed_modules: str) -> list[str]:
+        """
+        Resolve the seeders of every collected item using ``seed_modules``,
+        including the seeders they require, and cache their seed plans.
+
+        Items overriding the ``apibean_seed_modules`` fixture are skipped,
+        since their seed modules are only known when the test runs. Returns
+        the list of problems found, one line per distinct seed name.
+        """
+        errors: dict[str, str] = {}
+        for item in items:
+            if overrides_seed_modules(session, item):
+                continue
+            try:
+                self.plan(seed_modules, iter_seed_markers(item))
+            except (ValueError, RuntimeError) as e:
+                errors.setdefault(str(e), item.nodeid)
+        return [f"{message} (first used by {nodeid})" for message, nodeid in errors.items()]
+
+
+def overrides_seed_modules(session, item) -> bool:
+    fixturedefs = session._fixturemanager.getfixturedefs("apibean_seed_modules", item)
+    if not fixturedefs:
+        return False
+    return fixturedefs[-1].func.__module__ != "apibean.pytest.fixtures.seeds"
+
+
+def find_missing_abstract_fixtures(session, items: Iterable, required: Iterable[str] = ()) -> dict[str, int]:
+    """
+    Count, per abstract fixture name, the items for which the application
+    does not provide an override.
+
+    Every fixture in the static closure of an item is checked, as well as
+    the ``required`` names, which the Apibean test case loop requests
+    dynamically.
+    """
+    fixturemanager = session._fixturemanager
+    missing: dict[str, int] = {}
+    for item in items:
+        fixturenames = getattr(item, "fixturenames", None)
+        if fixturenames is None:
+            continue
+        for name in dict.fromkeys([*fixturenames, *required]):
+            fixturedefs = fixturemanager.getfixturedefs(name, item)
+            if fixturedefs and getattr(fixturedefs[-1].func, "__apibean_abstract_fixture__", False):
+                missing[name] = missing.get(name, 0) + 1
+    return missing
+
+
+seeder_index_key = pytest.StashKey[SeederIndex]()
+missing_abstract_key = pytest.StashKey[dict]()
+
+
+def get_seeder_index(config: pytest.Config) -> SeederIndex:
+    index = config.stash.get(seeder_index_key, None)
+    if index is None:
+        index = config.stash[seeder_index_key] = SeederIndex()
+    return index
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import os
-import tomllib
+from functools import lru_cache
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional
 
 
 @dataclass(slots=True)
@@ -14,34 +15,94 @@ class ApibeanOptions:
     password: str = "admin"
     timeout: float = 10.0
     auto_login: bool = True
+    http2: bool = False
+    http_max_connections: int = 100
+    http_max_keepalive: int = 20
     seed_modules: str = "tests.seeders"
     seed_marker: str = "seed"   # @pytest.mark.seed(...)
     seed_mode: str = "auto"     # auto | explicit | off
+    seed_validate: bool = True  # resolve all seed markers at collection time
+    seed_workers: int = 1       # threads running independent seeders of a test
+    seed_batch_size: int = 1000  # rows per bulk insert of data-file seeders
+    seed_batch_cache_max_bytes: int = 64 * 1024 * 1024
+    anyio_backend: str = "asyncio"
+    cassette_mode: str = "off"  # off | record | replay | hybrid
+    cassette_path: str = "tests/cassettes/apibean.cassette"
+    cassette_cacheable: list[str] = field(default_factory=list)
+    token_cache: bool = True
+    token_refresh_leeway: float = 30.0
+    seed_snapshot_max_entries: int = 16
+    seed_snapshot_max_bytes: int = 0
+    reset_mode: str = "truncate"  # truncate | transaction | incremental
+    group_seeds: bool = False   # cluster tests by seed fingerprint
+    db_name: str = "apibean_test"
+    load_concurrency: int = 4
+    load_duration: float = 5.0
+    dist_seed_chunk: int = 0    # max tests per xdist seed scope, 0 = unlimited
+    warmup: bool = False        # warm up services and tokens in the background
+    warmup_services: list[str] = field(default_factory=list)  # default: all *_service providers
+    warmup_timeout: float = 300.0  # seconds to wait for the warm-up, 0 = no limit
 
 
 _DEFAULTS = ApibeanOptions()
 
 
-def _load_pyproject_options() -> dict:
+@lru_cache(maxsize=32)
+def _find_pyproject(start: Path) -> Optional[Path]:
     """
-    Load [tool.pytest.apibean.options] từ pyproject.toml
+    Tìm pyproject.toml gần nhất, từ thư mục start đi lên các thư mục cha
     """
-    for path in (Path.cwd(), *Path.cwd().parents):
+    for path in (start, *start.parents):
         pyproject = path / "pyproject.toml"
         if pyproject.exists():
-            with pyproject.open("rb") as f:
-                data = tomllib.load(f)
-            return (
-                data
-                .get("tool", {})
-                .get("pytest", {})
-                .get("apibean", {})
-                .get("options", {})
-            )
-    return {}
+            return pyproject
+    return None
+
+
+@lru_cache(maxsize=8)
+def _read_pyproject_options(pyproject: Path, mtime_ns: int) -> dict:
+    """
+    Load [tool.pytest.apibean.options] từ pyproject.toml
+
+    ``mtime_ns`` is only part of the cache key, so that an edited file is
+    parsed again.
+    """
+    import tomllib
+
+    with pyproject.open("rb") as f:
+        data = tomllib.load(f)
+    return (
+        data
+        .get("tool", {})
+        .get("pytest", {})
+        .get("apibean", {})
+        .get("options", {})
+    )
+
+
+def _locate_pyproject() -> tuple[Optional[Path], int]:
+    pyproject = _find_pyproject(Path.cwd())
+    if pyproject is None:
+        return None, 0
+    try:
+        return pyproject, pyproject.stat().st_mtime_ns
+    except FileNotFoundError:
+        _find_pyproject.cache_clear()
+        return None, 0
+
+
+def _load_pyproject_options() -> dict:
+    pyproject, mtime_ns = _locate_pyproject()
+    if pyproject is None:
+        return {}
+    return _read_pyproject_options(pyproject, mtime_ns)
 
 
 def load_settings() -> ApibeanOptions:
+    """
+    Build the options from pyproject.toml, environment variables and
+    built-in defaults. Prefer ``get_settings()``, which caches the result.
+    """
     defaults = _DEFAULTS
     opts = _load_pyproject_options()
 
@@ -69,6 +130,19 @@ def load_settings() -> ApibeanOptions:
             )
         ),
         auto_login=bool(opts.get("auto_login", defaults.auto_login)),
+        http2=bool(opts.get("http2", defaults.http2)),
+        http_max_connections=int(
+            opts.get(
+                "http_max_connections",
+                os.getenv("APIBEAN_HTTP_MAX_CONNECTIONS", str(defaults.http_max_connections)),
+            )
+        ),
+        http_max_keepalive=int(
+            opts.get(
+                "http_max_keepalive",
+                os.getenv("APIBEAN_HTTP_MAX_KEEPALIVE", str(defaults.http_max_keepalive)),
+            )
+        ),
         seed_modules=opts.get(
             "seed_modules",
             os.getenv("APIBEAN_SEED_MODULES", defaults.seed_modules),
@@ -77,7 +151,132 @@ def load_settings() -> ApibeanOptions:
             "seed_marker",
             os.getenv("APIBEAN_SEED_MARKER", defaults.seed_marker),
         ),
+        seed_validate=bool(opts.get("seed_validate", defaults.seed_validate)),
+        seed_workers=int(
+            opts.get(
+                "seed_workers",
+                os.getenv("APIBEAN_SEED_WORKERS", str(defaults.seed_workers)),
+            )
+        ),
+        seed_batch_size=int(
+            opts.get(
+                "seed_batch_size",
+                os.getenv("APIBEAN_SEED_BATCH_SIZE", str(defaults.seed_batch_size)),
+            )
+        ),
+        seed_batch_cache_max_bytes=int(
+            opts.get(
+                "seed_batch_cache_max_bytes",
+                os.getenv("APIBEAN_SEED_BATCH_CACHE_MAX_BYTES", str(defaults.seed_batch_cache_max_bytes)),
+            )
+        ),
+        group_seeds=bool(opts.get("group_seeds", defaults.group_seeds)),
+        db_name=opts.get(
+            "db_name",
+            os.getenv("APIBEAN_DB_NAME", defaults.db_name),
+        ),
+        load_concurrency=int(
+            opts.get(
+                "load_concurrency",
+                os.getenv("APIBEAN_LOAD_CONCURRENCY", str(defaults.load_concurrency)),
+            )
+        ),
+        load_duration=float(
+            opts.get(
+                "load_duration",
+                os.getenv("APIBEAN_LOAD_DURATION", str(defaults.load_duration)),
+            )
+        ),
+        dist_seed_chunk=int(
+            opts.get(
+                "dist_seed_chunk",
+                os.getenv("APIBEAN_DIST_SEED_CHUNK", str(defaults.dist_seed_chunk)),
+            )
+        ),
+        cassette_mode=opts.get(
+            "cassette_mode",
+            os.getenv("APIBEAN_CASSETTE_MODE", defaults.cassette_mode),
+        ),
+        cassette_path=opts.get(
+            "cassette_path",
+            os.getenv("APIBEAN_CASSETTE_PATH", defaults.cassette_path),
+        ),
+        cassette_cacheable=list(
+            opts.get(
+                "cassette_cacheable",
+                [p for p in os.getenv("APIBEAN_CASSETTE_CACHEABLE", "").split(",") if p],
+            )
+        ),
+        anyio_backend=opts.get(
+            "anyio_backend",
+            os.getenv("APIBEAN_ANYIO_BACKEND", defaults.anyio_backend),
+        ),
+        token_cache=bool(opts.get("token_cache", defaults.token_cache)),
+        warmup=bool(opts.get("warmup", defaults.warmup)),
+        warmup_services=list(
+            opts.get(
+                "warmup_services",
+                [p for p in os.getenv("APIBEAN_WARMUP_SERVICES", "").split(",") if p],
+            )
+        ),
+        warmup_timeout=float(
+            opts.get(
+                "warmup_timeout",
+                os.getenv("APIBEAN_WARMUP_TIMEOUT", str(defaults.warmup_timeout)),
+            )
+        ),
+        token_refresh_leeway=float(
+            opts.get(
+                "token_refresh_leeway",
+                os.getenv("APIBEAN_TOKEN_REFRESH_LEEWAY", str(defaults.token_refresh_leeway)),
+            )
+        ),
+        seed_snapshot_max_entries=int(
+            opts.get(
+                "seed_snapshot_max_entries",
+                os.getenv("APIBEAN_SEED_SNAPSHOT_MAX_ENTRIES", str(defaults.seed_snapshot_max_entries)),
+            )
+        ),
+        seed_snapshot_max_bytes=int(
+            opts.get(
+                "seed_snapshot_max_bytes",
+                os.getenv("APIBEAN_SEED_SNAPSHOT_MAX_BYTES", str(defaults.seed_snapshot_max_bytes)),
+            )
+        ),
+        reset_mode=opts.get(
+            "reset_mode",
+            os.getenv("APIBEAN_RESET_MODE", defaults.reset_mode),
+        ),
     )
 
 
-settings = load_settings()
+@lru_cache(maxsize=8)
+def _cached_settings(pyproject: Optional[Path], mtime_ns: int) -> ApibeanOptions:
+    return load_settings()
+
+
+def get_settings() -> ApibeanOptions:
+    """
+    Return the options of the nearest pyproject.toml.
+
+    Settings are loaded lazily, on first use rather than at import time,
+    and cached by pyproject path and modification time: repeated calls only
+    cost a ``stat()`` of the file. Environment variables are read when the
+    settings are (re)loaded; call ``clear_settings_cache()`` after changing
+    them.
+    """
+    return _cached_settings(*_locate_pyproject())
+
+
+def clear_settings_cache() -> None:
+    _find_pyproject.cache_clear()
+    _read_pyproject_options.cache_clear()
+    _cached_settings.cache_clear()
+
+
+def __getattr__(name: str):
+    # ``from apibean.pytest.settings import settings`` keeps working, but
+    # only loads the settings when it is executed.
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
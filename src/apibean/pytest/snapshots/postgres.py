@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from contextlib import closing
+from typing import Any, Callable, Optional
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+class PostgresTemplateBackend:
+    """
+    Snapshot backend cloning a PostgreSQL database with ``CREATE DATABASE ...
+    TEMPLATE``.
+
+    ``connect`` must return a DB-API connection to a maintenance database
+    (for example ``postgres``) in autocommit mode, because ``CREATE
+    DATABASE`` and ``DROP DATABASE`` cannot run inside a transaction.
+
+    PostgreSQL refuses to use a database as a template while other sessions
+    are connected to it. ``release_connections`` is called before every
+    capture and restore and must close the application's connections to
+    ``database`` (for example ``engine.dispose()``); they are expected to be
+    re-opened lazily by the application.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        database: str,
+        prefix: str = "apibean_snap",
+        release_connections: Optional[Callable[[], None]] = None,
+    ):
+        self.connect = connect
+        self.database = database
+        self.prefix = prefix
+        self.release_connections = release_connections
+
+    def name(self, key: str) -> str:
+        return f"{self.prefix}_{key}"
+
+    def capture(self, key: str) -> int:
+        snapshot = self.name(key)
+        self._release()
+        with closing(self.connect()) as conn, closing(conn.cursor()) as cur:
+            cur.execute(f"DROP DATABASE IF EXISTS {_quote(snapshot)}")
+            cur.execute(f"CREATE DATABASE {_quote(snapshot)} TEMPLATE {_quote(self.database)}")
+            cur.execute("SELECT pg_database_size(%s)", (snapshot,))
+            return int(cur.fetchone()[0])
+
+    def restore(self, key: str) -> None:
+        self._release()
+        with closing(self.connect()) as conn, closing(conn.cursor()) as cur:
+            cur.execute(f"DROP DATABASE IF EXISTS {_quote(self.database)}")
+            cur.execute(f"CREATE DATABASE {_quote(self.database)} TEMPLATE {_quote(self.name(key))}")
+
+    def discard(self, key: str) -> None:
+        with closing(self.connect()) as conn, closing(conn.cursor()) as cur:
+            cur.execute(f"DROP DATABASE IF EXISTS {_quote(self.name(key))}")
+
+    def _release(self) -> None:
+        if self.release_connections is not None:
+            self.release_connections()
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import sqlite3
+import tempfile
+from contextlib import closing
+from pathlib import Path
+from typing import Optional, Union
+
+
+class SqliteSnapshotBackend:
+    """
+    Snapshot backend copying a SQLite database file.
+
+    Snapshots are written with the SQLite online backup API, which produces a
+    consistent copy even while the application keeps connections open on
+    ``database``. Restoring copies the snapshot back page by page, so open
+    connections observe the restored state on their next statement as long
+    as they do not hold an open transaction.
+    """
+
+    def __init__(self, database: Union[str, Path], directory: Optional[Union[str, Path]] = None):
+        self.database = Path(database)
+        self.directory = Path(directory) if directory else Path(tempfile.mkdtemp(prefix="apibean-snapshots-"))
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.sqlite3"
+
+    def capture(self, key: str) -> int:
+        target = self.path(key)
+        self._copy(self.database, target)
+        return target.stat().st_size
+
+    def restore(self, key: str) -> None:
+        self._copy(self.path(key), self.database)
+
+    def discard(self, key: str) -> None:
+        self.path(key).unlink(missing_ok=True)
+
+    @staticmethod
+    def _copy(source: Path, target: Path) -> None:
+        with closing(sqlite3.connect(source)) as src, closing(sqlite3.connect(target)) as dst:
+            src.backup(dst)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Optional
+
+import pytest
+
+from apibean.pytest.protocols.snapshot import ApibeanSnapshotBackend
+
+
+class SnapshotStore:
+    """
+    LRU index of seeded database snapshots keyed by seed fingerprint.
+
+    The store only keeps bookkeeping (key and size of every snapshot); the
+    actual database state is captured, restored and discarded by the
+    configured ``ApibeanSnapshotBackend``. When the number of snapshots
+    exceeds ``max_entries``, or their total size exceeds ``max_bytes``, the
+    least recently used snapshots are discarded.
+
+    The store also keeps, in memory, the seed data captured with every
+    snapshot (the values returned by the seeders), which ``data()``
+    returns once the snapshot is restored.
+    """
+
+    def __init__(
+        self,
+        backend: ApibeanSnapshotBackend,
+        max_entries: int = 16,
+        max_bytes: Optional[int] = None,
+    ):
+        self.backend = backend
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._data: dict[str, Any] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self._entries.values())
+
+    def restore(self, key: str) -> bool:
+        """
+        Restore the snapshot stored under ``key``. Returns ``False`` when no
+        such snapshot exists and the caller must seed the database itself.
+        """
+        if key not in self._entries:
+            self.misses += 1
+            return False
+        self.backend.restore(key)
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True
+
+    def capture(self, key: str, data: Any = None) -> None:
+        """
+        Capture the current database state under ``key``, along with the
+        seed ``data`` it was produced with.
+        """
+        self._entries[key] = self.backend.capture(key)
+        self._data[key] = data
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def data(self, key: str) -> Any:
+        """Return the seed data captured with the snapshot ``key``"""
+        return self._data.get(key)
+
+    def discard(self, key: str) -> None:
+        self._data.pop(key, None)
+        if self._entries.pop(key, None) is not None:
+            self.backend.discard(key)
+
+    def close(self) -> None:
+        for key in list(self._entries):
+            self.discard(key)
+
+    def _evict(self) -> None:
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes and self.total_bytes > self.max_bytes)
+        ):
+            key, _ = self._entries.popitem(last=False)
+            self._data.pop(key, None)
+            self.backend.discard(key)
+            self.evictions += 1
+
+
+snapshot_store_key = pytest.StashKey[SnapshotStore]()
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import re
+import time
+from typing import Any, Callable, Optional
+
+import pytest
+
+from apibean.pytest.datafiles import quote_identifier
+
+StatementListener = Callable[[str, Optional[float]], None]
+
+
+class StatementTap:
+    """
+    Fan out every SQL statement executed on ``apibean_db`` to listeners.
+
+    Database drivers usually accept a single trace callback, so the tap is
+    installed once per session and the plugin features relying on it (such
+    as ``WriteTracker`` and ``QueryCounter``) register themselves as
+    listeners.
+
+    Listeners are called with the statement and its duration in seconds,
+    or ``None`` when the backend does not report durations.
+    """
+
+    def __init__(self):
+        self._listeners: list[StatementListener] = []
+        self._detach: Optional[Callable[[], None]] = None
+
+    def add(self, listener: StatementListener) -> None:
+        self._listeners.append(listener)
+
+    def remove(self, listener: StatementListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def __call__(self, statement: str, duration: Optional[float] = None) -> None:
+        for listener in self._listeners:
+            listener(statement, duration)
+
+    def close(self) -> None:
+        self._listeners.clear()
+        if self._detach is not None:
+            self._detach()
+            self._detach = None
+
+
+def attach_statement_tap(db: Any) -> StatementTap:
+    """
+    Install a ``StatementTap`` on a database backend.
+
+    Supported backends:
+
+    - DB-API connections exposing ``set_trace_callback()``
+      (``sqlite3.Connection``)
+    - SQLAlchemy engines, connections and sessions, through the
+      ``before_cursor_execute`` and ``after_cursor_execute`` events of
+      their engine, which also time every statement
+    - objects exposing ``add_statement_listener(callback)`` and
+      ``remove_statement_listener(callback)``; the callback accepts the
+      statement and, optionally, its duration in seconds
+
+    Other backends must override the ``apibean_statement_tap`` fixture.
+    """
+    tap = StatementTap()
+
+    if hasattr(db, "add_statement_listener"):
+        db.add_statement_listener(tap)
+        tap._detach = lambda: db.remove_statement_listener(tap)
+    elif hasattr(db, "set_trace_callback"):
+        db.set_trace_callback(tap)
+        tap._detach = lambda: db.set_trace_callback(None)
+    elif type(db).__module__.startswith("sqlalchemy"):
+        from sqlalchemy import event
+
+        engine = db.get_bind() if hasattr(db, "get_bind") else getattr(db, "engine", db)
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("apibean_started", {})[id(cursor)] = time.perf_counter()
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            started = conn.info.get("apibean_started", {}).pop(id(cursor), None)
+            tap(statement, None if started is None else time.perf_counter() - started)
+
+        def handle_error(exception_context):
+            # a failed statement never reaches after_cursor_execute
+            conn, cursor = exception_context.connection, exception_context.cursor
+            if conn is not None and cursor is not None:
+                conn.info.get("apibean_started", {}).pop(id(cursor), None)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+        event.listen(engine, "handle_error", handle_error)
+
+        def detach():
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+            event.remove(engine, "after_cursor_execute", after_cursor_execute)
+            event.remove(engine, "handle_error", handle_error)
+
+        tap._detach = detach
+    else:
+        raise TypeError(
+            f"Cannot trace SQL statements on {type(db).__name__!r}; "
+            "override the apibean_statement_tap fixture for this backend"
+        )
+    return tap
+
+
+_IDENTIFIER_PART = r'(?:"(?:[^"]|"")+"|`[^`]+`|\[[^\]]+\]|[\w$]+)'
+_IDENTIFIER = "(" + _IDENTIFIER_PART + r"(?:\s*\.\s*" + _IDENTIFIER_PART + "){0,2})"
+
+_WRITE_TARGETS = re.compile(
+    r"(?<![\w])(?:"
+    r"INSERT\s+(?:OR\s+\w+\s+)?INTO"
+    r"|REPLACE\s+INTO"
+    r"|(?<!DO\s)(?<!FOR\s)(?<!KEY\s)UPDATE\s+(?:OR\s+\w+\s+)?(?:ONLY\s+)?(?!SET\b)"
+    r"|DELETE\s+FROM\s+(?:ONLY\s+)?"
+    r")\s*" + _IDENTIFIER,
+    re.IGNORECASE,
+)
+
+_TRUNCATE_TARGETS = re.compile(
+    r"(?:\bTRUNCATE\s+(?:TABLE\s+)?(?:ONLY\s+)?|,)\s*" + _IDENTIFIER,
+    re.IGNORECASE,
+)
+
+_WRITE_KEYWORDS = frozenset({"INSERT", "REPLACE", "UPDATE", "DELETE", "TRUNCATE", "WITH", "MERGE"})
+_SCHEMA_KEYWORDS = frozenset({"CREATE", "DROP", "ALTER", "RENAME", "VACUUM"})
+_FIRST_KEYWORD = re.compile(r"\s*(?:--[^\n]*\n\s*|/\*.*?\*/\s*)*(\w+)", re.DOTALL)
+_TRANSACTION_KEYWORDS = frozenset({"BEGIN", "START", "COMMIT", "END", "ROLLBACK", "ABORT", "SAVEPOINT", "RELEASE"})
+
+
+def is_transaction_control(statement: str) -> bool:
+    """
+    Return whether a SQL statement only controls transactions (``BEGIN``,
+    ``COMMIT``, ``ROLLBACK``, ``SAVEPOINT``, ``RELEASE``, ...).
+    """
+    match = _FIRST_KEYWORD.match(statement)
+    return match is not None and match.group(1).upper() in _TRANSACTION_KEYWORDS
+
+
+def table_identifier(identifier: str) -> str:
+    """
+    Return a table name, as written in a SQL statement, in a canonical
+    form safe to put back into a statement.
+
+    Every part of a schema-qualified name is quoted (see
+    ``quote_identifier()``): quoted parts keep their case, unquoted parts
+    are lower-cased as the database folds them. ``Audit.Events`` becomes
+    ``"audit"."events"`` and ``"Orders"`` keeps its case.
+    """
+    names = []
+    for part in re.findall(_IDENTIFIER_PART, identifier):
+        if part[0] == '"':
+            names.append(part[1:-1].replace('""', '"'))
+        elif part[0] in "`[":
+            names.append(part[1:-1])
+        else:
+            names.append(part.lower())
+    return ".".join(map(quote_identifier, names))
+
+
+def written_tables(statement: str) -> Optional[frozenset[str]]:
+    """
+    Return the tables a SQL statement writes to, as schema-qualified and
+    quoted identifiers (see ``table_identifier()``).
+
+    Reads and transaction control statements yield an empty set. Schema
+    changes, and write statements whose target cannot be parsed (such as
+    ``MERGE``), yield ``None``, meaning that any table may have changed.
+    """
+    match = _FIRST_KEYWORD.match(statement)
+    keyword = match.group(1).upper() if match else ""
+    if keyword in _SCHEMA_KEYWORDS:
+        return None
+    if keyword not in _WRITE_KEYWORDS:
+        return frozenset()
+    if keyword == "TRUNCATE":
+        targets = _TRUNCATE_TARGETS.findall(statement)
+    else:
+        targets = _WRITE_TARGETS.findall(statement)
+    tables = frozenset(map(table_identifier, targets))
+    if not tables and keyword != "WITH":
+        return None
+    return tables
+
+
+class WriteTracker:
+    """
+    Record which tables were written since the database was last reset.
+
+    ``dirty`` is ``None`` while the state of the database is unknown: before
+    the first full reset of the session, after a schema change or after a
+    write the tracker could not attribute to a table. Otherwise it holds
+    the quoted identifiers of the tables written since ``clear()`` was
+    last called.
+    """
+
+    def __init__(self):
+        self.dirty: Optional[set[str]] = None
+
+    def __call__(self, statement: str, duration: Optional[float] = None) -> None:
+        if self.dirty is None:
+            return
+        tables = written_tables(statement)
+        if tables is None:
+            self.dirty = None
+        else:
+            self.dirty.update(tables)
+
+    def clear(self) -> None:
+        """Mark the database as reset: nothing written since"""
+        self.dirty = set()
+
+    def invalidate(self) -> None:
+        """Mark the database state as unknown, forcing the next full reset"""
+        self.dirty = None
+
+
+write_tracker_key = pytest.StashKey[WriteTracker]()
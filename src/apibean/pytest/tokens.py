@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import pytest
+
+from apibean.pytest.settings import get_settings
+
+
+@dataclass(slots=True)
+class CachedToken:
+    access_token: str
+    expires_at: Optional[float]
+    credential: bytes
+
+
+def decode_jwt_exp(token: str) -> Optional[float]:
+    """
+    Return the ``exp`` claim of a JWT access token, or ``None``.
+
+    The signature is intentionally not verified: the value is only used to
+    decide when a cached token should be refreshed. Tokens that are not
+    JWTs, or that carry no numeric ``exp`` claim, yield ``None`` and are
+    considered valid until explicitly invalidated.
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+    except (IndexError, ValueError, TypeError, AttributeError):
+        return None
+    if isinstance(exp, bool) or not isinstance(exp, (int, float)):
+        return None
+    return float(exp)
+
+
+def _digest(password: str) -> bytes:
+    return hashlib.sha256(str(password).encode()).digest()
+
+
+class TokenCache:
+    """
+    Session-wide cache of access tokens issued by the login fixtures.
+
+    Tokens are keyed by ``(kind, username, org_slug)`` where ``kind`` is the
+    name of the login flow (``"login"``, ``"deprecated_login"`` or
+    ``"delegated_login"``). A cached token is reused until it is within
+    ``refresh_leeway`` seconds of its ``exp`` claim, after which the next
+    request logs in again.
+
+    The password is not part of the key, but a digest of it is kept with
+    the entry: logging in with a different password is treated as a miss,
+    so negative authentication tests never receive a stale token.
+
+    Tests that rotate secrets or change passwords should call
+    ``invalidate()`` (or ``clear()``) so that subsequent tests obtain a
+    fresh token.
+    """
+
+    def __init__(
+        self,
+        refresh_leeway: float = 30.0,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.refresh_leeway = refresh_leeway
+        self.enabled = enabled
+        self._clock = clock
+        self._tokens: dict[tuple, CachedToken] = {}
+        self._lock = threading.RLock()
+        self._identity_locks: dict[tuple, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def get(
+        self,
+        kind: str,
+        username: str,
+        org_slug: Optional[str],
+        password: str,
+        fetch: Callable[[], str],
+    ) -> str:
+        """
+        Return a cached token for the given identity, calling ``fetch`` on a
+        miss or when the cached token is about to expire.
+
+        ``fetch`` runs outside of the cache lock, under a lock of the
+        identity only: concurrent requests for the same identity log in
+        once, while lookups and logins of other identities proceed.
+        """
+        access_token = self.lookup(kind, username, org_slug, password)
+        if access_token is not None:
+            return access_token
+        key = (kind, username, org_slug)
+        with self._identity_lock(key):
+            # another thread may have logged in while we waited
+            with self._lock:
+                cached = self._tokens.get(key) if self.enabled else None
+                if cached is not None and cached.credential == _digest(password) and self._is_fresh(cached):
+                    return cached.access_token
+            access_token = fetch()
+            self.store(kind, username, org_slug, password, access_token)
+            return access_token
+
+    def lookup(
+        self,
+        kind: str,
+        username: str,
+        org_slug: Optional[str],
+        password: str,
+    ) -> Optional[str]:
+        """
+        Return the cached token for the given identity, or ``None`` (counted
+        as a miss) when the caller must log in and ``store()`` a new token.
+        """
+        with self._lock:
+            cached = self._tokens.get((kind, username, org_slug)) if self.enabled else None
+            if cached is not None and cached.credential == _digest(password):
+                if self._is_fresh(cached):
+                    self.hits += 1
+                    return cached.access_token
+                self.refreshes += 1
+            self.misses += 1
+            return None
+
+    def store(
+        self,
+        kind: str,
+        username: str,
+        org_slug: Optional[str],
+        password: str,
+        access_token: str,
+    ) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._tokens[(kind, username, org_slug)] = CachedToken(
+                access_token=access_token,
+                expires_at=decode_jwt_exp(access_token),
+                credential=_digest(password),
+            )
+
+    def invalidate(
+        self,
+        username: Optional[str] = None,
+        *,
+        kind: Optional[str] = None,
+        org_slug: Optional[str] = None,
+    ) -> int:
+        """
+        Drop cached tokens matching every given criterion.
+
+        Calling ``invalidate()`` without arguments drops all tokens. Returns
+        the number of entries removed.
+        """
+        with self._lock:
+            matched = [
+                key for key in self._tokens
+                if (kind is None or key[0] == kind)
+                and (username is None or key[1] == username)
+                and (org_slug is None or key[2] == org_slug)
+            ]
+            for key in matched:
+                del self._tokens[key]
+            return len(matched)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def _identity_lock(self, key: tuple) -> threading.Lock:
+        with self._lock:
+            lock = self._identity_locks.get(key)
+            if lock is None:
+                lock = self._identity_locks[key] = threading.Lock()
+            return lock
+
+    def _is_fresh(self, cached: CachedToken) -> bool:
+        if cached.expires_at is None:
+            return True
+        return self._clock() < cached.expires_at - self.refresh_leeway
+
+
+token_cache_key = pytest.StashKey[TokenCache]()
+
+
+def get_token_cache(config: pytest.Config) -> TokenCache:
+    """
+    Return the token cache of the current pytest session, creating it on
+    first use from the loaded settings.
+    """
+    cache = config.stash.get(token_cache_key, None)
+    if cache is None:
+        settings = get_settings()
+        cache = TokenCache(
+            refresh_leeway=settings.token_refresh_leeway,
+            enabled=settings.token_cache,
+        )
+        config.stash[token_cache_key] = cache
+    return cache
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+
+class SavepointTransaction:
+    """
+    Outer test transaction opened with plain SQL savepoints on a DB-API
+    connection exposing ``execute()`` (for example ``sqlite3.Connection``).
+    """
+
+    name = "apibean_test"
+
+    def __init__(self, connection: Any):
+        self.connection = connection
+        self.connection.execute(f"SAVEPOINT {self.name}")
+
+    def rollback(self) -> None:
+        self.connection.execute(f"ROLLBACK TO SAVEPOINT {self.name}")
+        self.connection.execute(f"RELEASE SAVEPOINT {self.name}")
+
+
+def open_test_transaction(db: Any) -> Any:
+    """
+    Open the outer transaction a test runs in and return a handle whose
+    ``rollback()`` discards everything the test wrote.
+
+    Supported backends:
+
+    - objects exposing ``begin_nested()`` (SQLAlchemy ``Session`` and
+      ``Connection``), which open a SAVEPOINT
+    - DB-API connections exposing ``execute()``, on which a named SAVEPOINT
+      is issued directly
+
+    Other backends must override the ``apibean_transaction`` fixture.
+    """
+    if hasattr(db, "begin_nested"):
+        return db.begin_nested()
+    if hasattr(db, "execute"):
+        return SavepointTransaction(db)
+    raise TypeError(
+        f"Cannot open a test transaction on {type(db).__name__!r}; "
+        "override the apibean_transaction fixture for this backend"
+    )
+
+
+def reset_tables(db: Any, tables: Iterable[str]) -> None:
+    """
+    Delete every row of the given tables and commit.
+
+    ``tables`` are identifiers ready to be put into a statement, as
+    returned by ``written_tables()``: schema-qualified where needed and
+    quoted.
+
+    Supports SQLAlchemy ``Session`` and ``Connection`` objects, and DB-API
+    connections exposing ``execute()``. Other backends must override the
+    ``apibean_reset_tables`` fixture.
+    """
+    if type(db).__module__.startswith("sqlalchemy"):
+        from sqlalchemy import text
+
+        execute = lambda statement: db.execute(text(statement))
+    elif hasattr(db, "execute"):
+        execute = db.execute
+    else:
+        raise TypeError(
+            f"Cannot reset tables on {type(db).__name__!r}; "
+            "override the apibean_reset_tables fixture for this backend"
+        )
+
+    for table in tables:
+        execute(f"DELETE FROM {table}")
+    if hasattr(db, "commit"):
+        db.commit()
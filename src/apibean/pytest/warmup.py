@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import inspect
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import pytest
+
+from apibean.pytest.settings import get_settings
+from apibean.pytest.tokens import get_token_cache
+
+
+@dataclass(slots=True)
+class WarmupResult:
+    """
+    What the background warm-up prepared.
+
+    ``container``, ``db`` and ``config`` are the objects returned by the
+    ``pytest_apibean_warmup`` hook; ``services`` and ``tokens`` list the
+    providers resolved and the users logged in.
+    """
+    container: Any = None
+    db: Any = None
+    config: Any = None
+    services: list[str] = field(default_factory=list)
+    tokens: list[str] = field(default_factory=list)
+    duration: float = 0.0
+    error: Optional[BaseException] = None
+
+
+class Warmup:
+    """
+    Background thread warming up the session while pytest collects tests.
+
+    The thread calls the ``pytest_apibean_warmup`` hook, then:
+
+    - resolves the ``warmup_services`` providers of the returned container,
+      or every provider whose name ends with ``_service`` by default
+    - opens and releases a connection on the returned database when it
+      exposes ``connect()`` (for example a SQLAlchemy engine), filling its
+      connection pool
+    - logs in ``ROOT_USER_EMAIL`` and ``SYNC_USER_EMAIL`` of the returned
+      ``ApibeanTestConfig`` through ``auth_service.login()``, storing the
+      tokens in the session token cache used by the ``login`` fixture
+
+    ``join()`` waits for the thread and returns the ``WarmupResult``. The
+    plugin joins it before the first test is set up, so that session
+    fixtures never build the objects the thread is still building.
+    """
+
+    def __init__(self, config: pytest.Config):
+        self.config = config
+        self.result = WarmupResult()
+        self._thread = threading.Thread(target=self._run, name="apibean-warmup", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def join(self, timeout: Optional[float] = None) -> WarmupResult:
+        """
+        Wait for the thread and return the ``WarmupResult``.
+
+        Defaults to the ``warmup_timeout`` setting; a ``TimeoutError`` is
+        raised when the thread is still running after ``timeout`` seconds.
+        """
+        if timeout is None:
+            timeout = get_settings().warmup_timeout
+        self._thread.join(timeout if timeout > 0 else None)
+        if self._thread.is_alive():
+            raise TimeoutError(
+                f"apibean warm-up did not complete within {timeout:g}s "
+                "(see the warmup_timeout option)"
+            )
+        return self.result
+
+    def _run(self) -> None:
+        started = time.perf_counter()
+        try:
+            targets = self.config.hook.pytest_apibean_warmup(config=self.config)
+            if targets is None:
+                return
+            self.result.container = targets.get("container")
+            self.result.db = targets.get("db")
+            self.result.config = targets.get("config")
+            if self.result.container is not None:
+                self._resolve_services(self.result.container)
+            if callable(getattr(self.result.db, "connect", None)):
+                self.result.db.connect().close()
+            if self.result.container is not None and self.result.config is not None:
+                self._login(self.result.container, self.result.config)
+        except BaseException as e:
+            self.result.error = e
+        finally:
+            self.result.duration = time.perf_counter() - started
+
+    def _resolve_services(self, container) -> None:
+        names = get_settings().warmup_services or [
+            name for name in getattr(container, "providers", {}) if name.endswith("_service")
+        ]
+        for name in names:
+            getattr(container, name)()
+            self.result.services.append(name)
+
+    def _login(self, container, apibean_config) -> None:
+        cache = get_token_cache(self.config)
+        for prefix in ("ROOT", "SYNC"):
+            username = getattr(apibean_config, f"{prefix}_USER_EMAIL", None)
+            password = getattr(apibean_config, f"{prefix}_USER_PASSWORD", None)
+            if not username:
+                continue
+
+            def _fetch():
+                result = container.auth_service().login(dict(username=username, password=password))
+                if inspect.isawaitable(result):
+                    from apibean.pytest.portal import _await, get_portal
+                    result = get_portal(self.config).call(_await, result)
+                return result["access_token"]
+
+            cache.get("login", username, None, password, _fetch)
+            self.result.tokens.append(username)
+
+
+warmup_key = pytest.StashKey[Warmup]()
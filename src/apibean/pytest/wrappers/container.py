@@ -1,5 +1,129 @@
+import threading
+import types
+
 from dependency_injector import containers, providers
 
+WRAPPING_MODES = ("callable", "scoped", "cached")
+
+class WrappedServiceProvider(providers.Provider):
+    """
+    Provider wrapping a service provider of the parent container.
+
+    The wrapped provider, which calls ``inject_func(service, api_invoker)``,
+    is only built on first access, according to ``mode``:
+
+    - ``"callable"``: a ``providers.Callable``; the injection function runs
+      on every call, as a plain ``Callable`` wrapper would.
+    - ``"scoped"``: the scope of the parent provider is preserved. A
+      singleton parent (``Singleton``, ``ThreadSafeSingleton``,
+      ``ThreadLocalSingleton``, ...) is wrapped in a singleton of the same
+      type, so the wrapped service is built once; any other parent is
+      wrapped in a ``Factory``.
+    - ``"cached"``: the wrapped service is built once and kept until
+      ``reset()`` is called, typically at the end of every test by the
+      ``apibean_service_cache`` fixture.
+
+    The wrapped provider is built under a lock, as services may be first
+    requested from several threads (for example by the background warm-up).
+    """
+
+    __slots__ = ("_parent", "_inject_func", "_invoker", "_mode", "_wrapped", "_lock", "_source")
+
+    def __init__(self, parent, inject_func, invoker, mode="callable"):
+        if mode not in WRAPPING_MODES:
+            raise ValueError(f"Invalid wrapping mode: '{mode}' (must be one of {', '.join(WRAPPING_MODES)})")
+        self._parent = parent
+        self._inject_func = inject_func
+        self._invoker = invoker
+        self._mode = mode
+        self._wrapped = None
+        self._lock = threading.Lock()
+        # parent instance the wrapped singleton was built from (scoped mode)
+        self._source = None
+        if mode == "scoped" and isinstance(parent, providers.BaseSingleton):
+            local = isinstance(parent, (providers.ThreadLocalSingleton, providers.ContextLocalSingleton))
+            self._source = threading.local() if local else types.SimpleNamespace()
+        super().__init__()
+
+    def __deepcopy__(self, memo):
+        copied = memo.get(id(self))
+        if copied is not None:
+            return copied
+
+        copied = self.__class__(
+            providers.deepcopy(self._parent, memo),
+            self._inject_func,
+            providers.deepcopy(self._invoker, memo),
+            self._mode,
+        )
+        self._copy_overridings(copied, memo)
+        return copied
+
+    @property
+    def parent(self):
+        return self._parent
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    @property
+    def related(self):
+        yield self._parent
+        yield self._invoker
+        yield from super().related
+
+    def reset(self) -> None:
+        """
+        Drop the wrapped service cached by the ``"scoped"`` and ``"cached"``
+        modes, so that the next call builds a new one.
+        """
+        with self._lock:
+            wrapped, self._wrapped = self._wrapped, None
+        if isinstance(wrapped, providers.BaseSingleton):
+            wrapped.reset()
+
+    def _provide(self, args, kwargs):
+        wrapped = self._wrapped
+        if wrapped is None:
+            with self._lock:
+                wrapped = self._wrapped
+                if wrapped is None:
+                    wrapped = self._wrapped = self._build()
+        if self._source is not None:
+            # the parent singleton was reset: the wrapped one must follow
+            source = self._parent()
+            if getattr(self._source, "value", None) is not source:
+                with self._lock:
+                    if getattr(self._source, "value", None) is not source:
+                        wrapped.reset()
+                        self._source.value = source
+        return wrapped(*args, **kwargs)
+
+    def _build(self):
+        if self._mode == "cached":
+            return providers.Singleton(self._inject_func, self._parent, self._invoker)
+        if self._mode == "scoped":
+            if isinstance(self._parent, providers.BaseSingleton):
+                return type(self._parent)(self._inject_func, self._parent, self._invoker)
+            return providers.Factory(self._inject_func, self._parent, self._invoker)
+        return providers.Callable(self._inject_func, self._parent, self._invoker)
+
+
+def reset_wrapped_services(container, modes=("cached",)) -> int:
+    """
+    Reset the wrapped services of a container instance whose wrapping mode
+    is in ``modes``. Returns the number of providers reset.
+    """
+    declarative = getattr(container, "declarative_parent", None) or container
+    count = 0
+    for name in getattr(declarative, "__apibean_wrapped_services__", ()):
+        provider = container.providers.get(name)
+        if isinstance(provider, WrappedServiceProvider) and provider.mode in modes:
+            provider.reset()
+            count += 1
+    return count
+
 class ServiceWrappingMeta(containers.DeclarativeContainer.__class__):
     """
     Metaclass for dynamically wrapping service providers in a derived container.
@@ -21,13 +145,14 @@ class ServiceWrappingMeta(containers.DeclarativeContainer.__class__):
     - Identifies the nearest parent class that is a ``DeclarativeContainer``
     - Selects providers whose attribute names match a configurable suffix
       (default: ``"_service"``)
-    - Wraps each matched provider using ``providers.Callable`` and a
+    - Wraps each matched provider in a ``WrappedServiceProvider`` calling a
       user-supplied injection function
     - Preserves the original provider interface while extending its behavior
 
-    The wrapping process is entirely declarative and occurs at container
+    The wrapping process is entirely declarative and is set up at container
     class creation time, requiring no changes to the application container
-    itself.
+    itself. The wrapped providers themselves are only built the first time
+    each service is requested.
 
     Typical use cases include:
 
@@ -47,6 +172,16 @@ class ServiceWrappingMeta(containers.DeclarativeContainer.__class__):
         Suffix used to select which providers from the parent container
         should be wrapped. Defaults to ``"_service"``.
 
+    - ``wrapping_mode``:
+        How wrapped services are cached (see ``WrappedServiceProvider``).
+        ``"callable"`` (default) runs the injection function on every call,
+        ``"scoped"`` keeps the scope of the parent provider (a singleton
+        stays a singleton) and ``"cached"`` builds each wrapped service once
+        per test.
+
+    The names of the wrapped providers are recorded in the
+    ``__apibean_wrapped_services__`` attribute of the container class.
+
     ``ServiceWrappingMeta`` is intentionally generic and framework-agnostic
     beyond ``dependency-injector``, making it suitable for reuse across
     different Apibean testing, mocking, and demo environments.
@@ -55,6 +190,7 @@ class ServiceWrappingMeta(containers.DeclarativeContainer.__class__):
     def __new__(cls, name, bases, namespace, **kwargs):
         injected_func_name = kwargs.pop("injected_func_name", None)
         target_name_suffix = kwargs.pop("target_name_suffix", "_service")
+        wrapping_mode = kwargs.pop("wrapping_mode", "callable")
 
         _cls = super().__new__(cls, name, bases, namespace, **kwargs)
 
@@ -73,9 +209,12 @@ class ServiceWrappingMeta(containers.DeclarativeContainer.__class__):
             inject_func = namespace.get(injected_func_name) or getattr(_cls, injected_func_name)
 
             # Tự động wrap mọi provider có hậu tố _service từ Container cha
+            wrapped_names = []
             for attr_name, provider in parent_container.providers.items():
                 if attr_name.endswith(target_name_suffix):
-                    wrapped = providers.Callable(inject_func, provider, _cls.api_invoker)
+                    wrapped = WrappedServiceProvider(provider, inject_func, _cls.api_invoker, wrapping_mode)
                     setattr(_cls, attr_name, wrapped)
+                    wrapped_names.append(attr_name)
+            _cls.__apibean_wrapped_services__ = tuple(wrapped_names)
 
         return _cls
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from typing import Any, Union
+
+import pytest
+from dependency_injector import providers
+
+from apibean.pytest.wrappers.container import WrappedServiceProvider
+
+
+def singleton_dependents(container) -> dict[int, list]:
+    """
+    Map the ``id()`` of every provider of a container to the caching
+    providers depending on it, directly or not.
+
+    Caching providers are singletons and ``WrappedServiceProvider``
+    instances: once built, they keep a service created with the
+    dependencies of that time, and must be reset when one of those
+    dependencies is overridden.
+    """
+    index: dict[int, list] = {}
+    for provider in container.traverse():
+        if isinstance(provider, (providers.BaseSingleton, WrappedServiceProvider)):
+            for dependency in provider.traverse():
+                index.setdefault(id(dependency), []).append(provider)
+    return index
+
+
+class ProviderOverlay:
+    """
+    Provider overrides and singleton resets scoped to a single test.
+
+    Every change made through the overlay is recorded, and ``restore()``
+    undoes exactly those changes: overridings are removed in reverse order
+    and the singletons reset during the test are reset again, so that no
+    instance built with an overridden dependency outlives the test. The
+    cost is proportional to the number of changed providers; the container
+    is neither rebuilt nor re-wired.
+
+    Overriding a provider also resets the singletons and wrapped services
+    depending on it, as listed by ``singleton_dependents()``, since their
+    cached instances were built with the original provider.
+    """
+
+    def __init__(self, container, dependents: dict[int, list]):
+        self._container = container
+        self._dependents = dependents
+        self._overridden: list = []
+        self._resets: dict[int, Any] = {}
+
+    def override(self, target: Union[str, providers.Provider], value: Any) -> providers.Provider:
+        """
+        Override a provider, given by name or instance, until the end of
+        the test. Values that are not providers are wrapped in
+        ``providers.Object``.
+        """
+        provider = self._provider(target)
+        if not isinstance(value, providers.Provider):
+            value = providers.Object(value)
+        provider.override(value)
+        self._overridden.append(provider)
+        for dependent in self._dependents.get(id(provider), ()):
+            self._reset(dependent)
+        return provider
+
+    def override_providers(self, **overrides: Any) -> None:
+        for name, value in overrides.items():
+            self.override(name, value)
+
+    def reset(self, target: Union[str, providers.Provider]) -> None:
+        """
+        Reset a singleton, given by name or instance, now and again at the
+        end of the test.
+        """
+        self._reset(self._provider(target))
+
+    @property
+    def changed(self) -> int:
+        return len(self._overridden) + len(self._resets)
+
+    def restore(self) -> None:
+        while self._overridden:
+            self._overridden.pop().reset_last_overriding()
+        for provider in self._resets.values():
+            provider.reset()
+        self._resets.clear()
+
+    def _provider(self, target):
+        if isinstance(target, str):
+            provider = getattr(self._container, target, None)
+            if not isinstance(provider, providers.Provider):
+                raise ValueError(f"The container has no provider named '{target}'")
+            return provider
+        return target
+
+    def _reset(self, provider) -> None:
+        provider.reset()
+        self._resets[id(provider)] = provider
+
+
+singleton_dependents_key = pytest.StashKey[tuple]()
+
+
+def get_singleton_dependents(config: pytest.Config, container) -> dict[int, list]:
+    """
+    Return ``singleton_dependents(container)``, computed once per session
+    for the session container.
+    """
+    cached = config.stash.get(singleton_dependents_key, None)
+    if cached is None or cached[0] is not container:
+        cached = config.stash[singleton_dependents_key] = (container, singleton_dependents(container))
+    return cached[1]
@@ -0,0 +1,13 @@
+import pytest
+
+pytest_plugins = ["pytester"]
+
+
+@pytest.fixture(scope="session")
+def apibean_container():
+    return None
+
+
+@pytest.fixture(scope="function")
+def apibean_reset_db():
+    return None
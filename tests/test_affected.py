@@ -0,0 +1,92 @@
+def test_affected_selects_tests_whose_seeders_changed(pytester):
+    pytester.mkpydir("tests")
+    seeders = pytester.mkpydir("tests/seeders")
+    for prefix in ("users", "orgs"):
+        seeders.joinpath(f"{prefix}_seeder.py").write_text(
+            f"class {prefix.capitalize()}Seeder:\n"
+            "    def __init__(self, seed, session, container, **kwargs):\n"
+            "        pass\n"
+            "    def run(self):\n"
+            "        pass\n"
+        )
+    pytester.makeconftest("""
+        import pytest
+
+        @pytest.fixture(scope="session")
+        def apibean_container():
+            return None
+
+        @pytest.fixture
+        def apibean_reset_db():
+            pass
+    """)
+    pytester.makepyfile(test_seeds="""
+        import pytest
+
+        @pytest.mark.seed("users.basic")
+        def test_users():
+            pass
+
+        @pytest.mark.seed("orgs.basic")
+        def test_orgs():
+            pass
+
+        def test_plain():
+            pass
+    """)
+    pytester.runpytest("--apibean-affected").assert_outcomes(passed=3)
+
+    result = pytester.runpytest("--apibean-affected")
+    result.assert_outcomes(deselected=3)
+
+    seeders.joinpath("users_seeder.py").write_text(
+        seeders.joinpath("users_seeder.py").read_text() + "# changed\n"
+    )
+    result = pytester.runpytest("--apibean-affected", "-v")
+    result.assert_outcomes(passed=1, deselected=2)
+    result.stdout.fnmatch_lines(["*test_users PASSED*"])
+
+    pytester.makeconftest(pytester.path.joinpath("conftest.py").read_text() + "# changed\n")
+    pytester.runpytest("--apibean-affected").assert_outcomes(passed=3)
+
+
+def test_affected_is_opt_in_and_keeps_global_digests(pytester):
+    import json
+
+    pytester.makeconftest("""
+        import pytest
+
+        @pytest.fixture(scope="session")
+        def apibean_container():
+            return None
+
+        @pytest.fixture
+        def apibean_reset_db():
+            pass
+    """)
+    pytester.makepyfile(test_plain="""
+        def test_a():
+            pass
+
+        def test_b():
+            pass
+    """)
+    record_path = pytester.path / ".pytest_cache" / "v" / "apibean" / "affected"
+
+    pytester.runpytest().assert_outcomes(passed=2)
+    assert not record_path.exists()
+
+    pytester.runpytest("--apibean-affected").assert_outcomes(passed=2)
+    # a container file recorded by an earlier session
+    pytester.path.joinpath("app.py").write_text("VERSION = 1\n")
+    from apibean.pytest.affected import file_digest
+    record = json.loads(record_path.read_text())
+    record["global"]["app.py"] = file_digest(str(pytester.path / "app.py"))
+    del record["tests"]["test_plain.py::test_a"]
+    record_path.write_text(json.dumps(record))
+
+    pytester.runpytest("--apibean-affected", "-k", "test_a").assert_outcomes(passed=1, deselected=1)
+    assert "app.py" in json.loads(record_path.read_text())["global"]
+
+    pytester.path.joinpath("app.py").write_text("VERSION = 2\n")
+    pytester.runpytest("--apibean-affected").assert_outcomes(passed=2)
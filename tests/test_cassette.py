@@ -0,0 +1,113 @@
+import pytest
+
+from apibean.pytest.cassette import Cassette, CassetteMiss, RecordingInvoker
+
+
+class Invoker:
+    def __init__(self):
+        self.calls = []
+
+    def get(self, path, **params):
+        self.calls.append(path)
+        return {"path": path, "params": params}
+
+
+def test_record_then_replay(tmp_path):
+    path = tmp_path / "api.cassette"
+    backend = Invoker()
+
+    cassette = Cassette(path, "record")
+    invoker = RecordingInvoker(backend, cassette)
+    assert invoker.get("/countries", page=1) == {"path": "/countries", "params": {"page": 1}}
+    invoker.get("/currencies")
+    cassette.close()
+
+    cassette = Cassette(path, "replay")
+    invoker = RecordingInvoker(Invoker(), cassette)
+    assert invoker.get("/countries", page=1) == {"path": "/countries", "params": {"page": 1}}
+    assert len(cassette) == 2
+    with pytest.raises(CassetteMiss):
+        invoker.get("/countries", page=2)
+    cassette.close()
+
+
+def test_hybrid_replays_only_cacheable_endpoints(tmp_path):
+    backend = Invoker()
+    cassette = Cassette(tmp_path / "api.cassette", "hybrid", cacheable=["get /countries*"])
+    invoker = RecordingInvoker(backend, cassette)
+
+    for _ in range(3):
+        invoker.get("/countries")
+        invoker.get("/users")
+    assert backend.calls == ["/countries", "/users", "/users", "/users"]
+    assert (cassette.hits, cassette.misses) == (2, 1)
+    cassette.close()
+
+    cassette = Cassette(tmp_path / "api.cassette", "hybrid", cacheable=["get /countries*"])
+    RecordingInvoker(backend, cassette).get("/countries")
+    assert backend.calls.count("/countries") == 1
+
+
+def test_concurrent_recordings_are_merged(tmp_path):
+    path = tmp_path / "api.cassette"
+    first, second = Cassette(path, "record"), Cassette(path, "record")
+    RecordingInvoker(Invoker(), first).get("/countries")
+    RecordingInvoker(Invoker(), second).get("/currencies")
+    first.close()
+    second.close()
+
+    cassette = Cassette(path, "replay")
+    invoker = RecordingInvoker(Invoker(), cassette)
+    assert invoker.get("/countries")["path"] == "/countries"
+    assert invoker.get("/currencies")["path"] == "/currencies"
+    cassette.close()
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_request_digest_requires_stable_arguments():
+    from apibean.pytest.cassette import request_digest
+
+    assert request_digest("get /users", ({"b", "a"},), {}) == request_digest("get /users", ({"a", "b"},), {})
+    with pytest.raises(TypeError, match="cannot identify the request get /users"):
+        request_digest("get /users", (object(),), {})
+
+
+def test_async_invokers_are_recorded_once_awaited(tmp_path):
+    import asyncio
+
+    class AsyncInvoker:
+        async def get(self, path):
+            return {"path": path}
+
+    cassette = Cassette(tmp_path / "api.cassette", "record")
+    assert asyncio.run(RecordingInvoker(AsyncInvoker(), cassette).get("/countries")) == {"path": "/countries"}
+    cassette.close()
+
+    cassette = Cassette(tmp_path / "api.cassette", "replay")
+    assert asyncio.run(RecordingInvoker(AsyncInvoker(), cassette).get("/countries")) == {"path": "/countries"}
+    cassette.close()
+
+
+def test_http_responses_are_recorded_as_data(tmp_path):
+    httpx = pytest.importorskip("httpx")
+
+    class HttpInvoker:
+        def get(self, path):
+            return httpx.Response(201, headers={"x-total": "3"}, json={"path": path})
+
+        def session(self):
+            return object()
+
+    cassette = Cassette(tmp_path / "api.cassette", "record")
+    invoker = RecordingInvoker(HttpInvoker(), cassette)
+    invoker.get("/countries")
+    with pytest.raises(TypeError, match="cannot record the response of session"):
+        invoker.session()
+    cassette.close()
+
+    cassette = Cassette(tmp_path / "api.cassette", "replay")
+    response = RecordingInvoker(HttpInvoker(), cassette).get("/countries")
+    assert isinstance(response, httpx.Response)
+    assert (response.status_code, response.headers["x-total"]) == (201, "3")
+    assert response.json() == {"path": "/countries"}
+    cassette.close()
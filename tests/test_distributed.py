@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip("xdist")
+
+
+def test_dist_seeds_sends_seed_groups_to_one_worker(pytester):
+    pytester.mkpydir("tests")
+    pytester.mkpydir("tests/seeders")
+    pytester.path.joinpath("tests", "seeders", "users_seeder.py").write_text(
+        "class UsersSeeder:\n"
+        "    def __init__(self, seed, session, container, **kwargs):\n"
+        "        pass\n"
+        "    def run(self):\n"
+        "        pass\n"
+    )
+    pytester.makeconftest("""
+        import pytest
+
+        def pytest_apibean_provision_worker_db(config, worker_id, db_name):
+            return db_name + "_provisioned"
+
+        @pytest.fixture(scope="session")
+        def apibean_container():
+            return None
+
+        @pytest.fixture
+        def apibean_reset_db():
+            pass
+    """)
+    pytester.makepyfile("""
+        import pytest
+
+        @pytest.mark.seed("users.basic")
+        @pytest.mark.parametrize("i", range(6))
+        def test_basic(apibean_worker_id, apibean_worker_db_name, i):
+            assert apibean_worker_db_name == f"apibean_test_{apibean_worker_id}_provisioned"
+            print("WORKER", apibean_worker_id)
+
+        @pytest.mark.seed("users.admin")
+        @pytest.mark.parametrize("i", range(6))
+        def test_admin(apibean_worker_id, i):
+            print("WORKER", apibean_worker_id)
+    """)
+    result = pytester.runpytest_subprocess("-n", "2", "--apibean-dist-seeds", "-rA")
+    result.assert_outcomes(passed=12)
+
+    workers = {}
+    current = None
+    for line in result.outlines:
+        if line.startswith("_") and "test_" in line:
+            current = line.strip("_ ").split("[")[0]
+        elif line.startswith("WORKER") and current:
+            workers.setdefault(current, set()).add(line.split()[1])
+    assert set(workers) == {"test_basic", "test_admin"}
+    assert all(len(ids) == 1 for ids in workers.values())
+    result.stdout.fnmatch_lines(["PASSED *test_basic[[]0[]]"])
+    result.stdout.no_fnmatch_line("*@apibean*")
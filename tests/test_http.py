@@ -0,0 +1,77 @@
+import pytest
+
+pytest.importorskip("httpx")
+
+CONFTEST = """
+import json
+import pytest
+
+LOGINS = []
+
+async def asgi_app(scope, receive, send):
+    if scope["path"] == "/api/auth/login":
+        LOGINS.append(1)
+        body = {"access_token": "token-1"}
+    else:
+        body = {"auth": dict(scope["headers"]).get(b"authorization", b"").decode()}
+    await send({"type": "http.response.start", "status": 200,
+                "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": json.dumps(body).encode()})
+
+def wsgi_app(environ, start_response):
+    start_response("200 OK", [("Content-Type", "application/json")])
+    return [json.dumps({"path": environ["PATH_INFO"]}).encode()]
+
+@pytest.fixture(scope="session")
+def apibean_app():
+    return {app}
+
+@pytest.fixture(scope="session")
+def apibean_container():
+    return None
+
+@pytest.fixture
+def apibean_reset_db():
+    pass
+"""
+
+
+@pytest.fixture
+def http_project(pytester):
+    pytester.makepyprojecttoml("""
+        [tool.pytest.apibean.options]
+        base_url = "http://testserver/api"
+        login_path = "/auth/login"
+        username = "root"
+        password = "secret"
+    """)
+    return pytester
+
+
+def test_asgi_clients_inject_cached_bearer_token(http_project):
+    http_project.makeconftest(CONFTEST.replace("{app}", "asgi_app"))
+    http_project.makepyfile("""
+        import pytest
+        from conftest import LOGINS
+
+        @pytest.mark.parametrize("i", range(3))
+        def test_sync(apibean_http_client, i):
+            assert apibean_http_client.get("/me").json() == {"auth": "Bearer token-1"}
+            assert len(LOGINS) == 1
+
+        def test_async(apibean_async_http_client, apibean_portal):
+            response = apibean_portal.call(apibean_async_http_client.get, "/me")
+            assert response.json() == {"auth": "Bearer token-1"}
+            assert len(LOGINS) == 1
+    """)
+    http_project.runpytest().assert_outcomes(passed=4)
+
+
+def test_wsgi_client(http_project):
+    http_project.makeconftest(CONFTEST.replace("{app}", "wsgi_app"))
+    http_project.makepyfile("""
+        def test_wsgi(apibean_http_client):
+            response = apibean_http_client.get("/items", headers={"Authorization": "Bearer x"})
+            assert response.json() == {"path": "/api/items"}
+    """)
+    http_project.runpytest().assert_outcomes(passed=1)
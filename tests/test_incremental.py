@@ -0,0 +1,102 @@
+def test_written_tables():
+    from apibean.pytest.statements import written_tables
+
+    assert written_tables("SELECT * FROM users FOR UPDATE") == frozenset()
+    assert written_tables('INSERT OR REPLACE INTO "Users"(name) VALUES (?)') == {'"Users"'}
+    assert written_tables("UPDATE public.orgs SET name = 'a', slug = 'b'") == {'"public"."orgs"'}
+    assert written_tables('DELETE FROM Audit . "Events" WHERE id = 1') == {'"audit"."Events"'}
+    assert written_tables("INSERT INTO [my table] VALUES (1)") == {'"my table"'}
+    assert written_tables("INSERT INTO t(a) VALUES (1) ON CONFLICT (a) DO UPDATE SET a = 2") == {'"t"'}
+    assert written_tables("TRUNCATE TABLE users, orgs RESTART IDENTITY") == {'"users"', '"orgs"'}
+    assert written_tables("DROP TABLE users") is None
+
+
+def test_incremental_reset_mode(pytester):
+    pytester.makeconftest("""
+        import sqlite3
+        import pytest
+
+        RESETS = []
+        PARTIAL = []
+
+        @pytest.fixture(scope="session")
+        def apibean_db():
+            conn = sqlite3.connect(":memory:", isolation_level=None)
+            for table in ("users", "orgs", "roles"):
+                conn.execute(f"CREATE TABLE {table}(name TEXT)")
+            return conn
+
+        @pytest.fixture(scope="session")
+        def apibean_container():
+            return None
+
+        @pytest.fixture
+        def apibean_reset_db(apibean_db):
+            RESETS.append(1)
+            for table in ("users", "orgs", "roles"):
+                apibean_db.execute(f"DELETE FROM {table}")
+
+        @pytest.fixture
+        def apibean_reset_tables(apibean_reset_tables, apibean_dirty_tables):
+            PARTIAL.append(sorted(apibean_dirty_tables))
+    """)
+    pytester.makepyfile("""
+        import pytest
+        from conftest import PARTIAL, RESETS
+
+        pytestmark = pytest.mark.apibean_reset("incremental")
+
+        def count(db, table):
+            return db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+        def test_first(apibean_db):
+            apibean_db.execute("INSERT INTO users VALUES ('alice')")
+            assert RESETS == [1]
+
+        def test_reads_only(apibean_db):
+            assert count(apibean_db, "users") == 0
+            assert PARTIAL == [['"users"']]
+
+        def test_nothing_written(apibean_db):
+            assert PARTIAL == [['"users"']]
+            apibean_db.execute("UPDATE orgs SET name = 'x'")
+
+        def test_after_update(apibean_db):
+            assert PARTIAL == [['"users"'], ['"orgs"']]
+            apibean_db.execute("CREATE TABLE extra(name TEXT)")
+
+        def test_after_schema_change():
+            assert RESETS == [1, 1]
+            assert PARTIAL == [['"users"'], ['"orgs"']]
+    """)
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=5)
+    result.stdout.fnmatch_lines(["*2 incremental resets (2 tables)*"])
+
+
+
+def test_reset_tables_keeps_schema_and_case():
+    import sqlite3
+
+    from apibean.pytest.statements import written_tables
+    from apibean.pytest.transaction import reset_tables
+
+    db = sqlite3.connect(":memory:")
+    db.execute("ATTACH DATABASE ':memory:' AS audit")
+    db.execute('CREATE TABLE "Orders"(id INTEGER)')
+    db.execute("CREATE TABLE audit.events(id INTEGER)")
+    db.execute("CREATE TABLE events(id INTEGER)")
+    tables = set()
+    for statement in (
+        'INSERT INTO "Orders" VALUES (1)',
+        "INSERT INTO audit.events VALUES (1)",
+        "INSERT INTO events VALUES (1)",
+    ):
+        db.execute(statement)
+        tables |= written_tables(statement)
+    db.execute("INSERT INTO main.events VALUES (2)")
+
+    reset_tables(db, sorted(tables - {'"events"'}))
+    assert db.execute('SELECT COUNT(*) FROM "Orders"').fetchone() == (0,)
+    assert db.execute("SELECT COUNT(*) FROM audit.events").fetchone() == (0,)
+    assert db.execute("SELECT COUNT(*) FROM main.events").fetchone() == (2,)
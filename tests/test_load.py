@@ -0,0 +1,55 @@
+import pytest
+
+pytest.importorskip("httpx")
+
+
+def test_load_mode_reports_percentiles_and_slo(pytester):
+    pytester.makeconftest("""
+        import pytest
+
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        @pytest.fixture(scope="session")
+        def apibean_app():
+            return app
+
+        @pytest.fixture(scope="session")
+        def apibean_container():
+            return None
+
+        @pytest.fixture
+        def apibean_reset_db():
+            pass
+    """)
+    pytester.makepyfile("""
+        import time
+        import pytest
+
+        @pytest.mark.apibean_load(concurrency=3, duration=30, rate=200, iterations=25)
+        def test_health(apibean_http_client):
+            response = apibean_http_client.get("/health", headers={"Authorization": "x"})
+            assert response.text == "ok"
+
+        @pytest.mark.apibean_load(concurrency=2, iterations=4, p95_ms=1)
+        def test_slow():
+            time.sleep(0.01)
+
+        @pytest.mark.apibean_load(concurrency=2, iterations=4)
+        async def test_async_errors():
+            raise RuntimeError("boom")
+
+        @pytest.mark.apibean_load(concurency=2)
+        def test_typo():
+            pass
+    """)
+    result = pytester.runpytest("--apibean-load")
+    result.assert_outcomes(passed=1, failed=3)
+    result.stdout.fnmatch_lines_random([
+        "*apibean load SLO exceeded: p95 *ms > 1.00ms*",
+        "*error rate 100.00% > 0.00% (first error: RuntimeError('boom'))*",
+        "*4 * test_load_mode_reports_percentiles_and_slo.py::test_slow",
+        "*25 * test_load_mode_reports_percentiles_and_slo.py::test_health",
+        "*Unknown apibean_load arguments: concurency*",
+    ])
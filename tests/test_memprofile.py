@@ -0,0 +1,80 @@
+def test_memprofile_flags_seeders_retaining_memory(pytester):
+    pytester.mkpydir("tests")
+    pytester.mkpydir("tests/seeders")
+    pytester.path.joinpath("tests", "seeders", "users_seeder.py").write_text(
+        "RETAINED = []\n"
+        "class UsersSeeder:\n"
+        "    def __init__(self, seed, session, container, **kwargs):\n"
+        "        pass\n"
+        "    def run(self):\n"
+        "        RETAINED.append(bytearray(256 * 1024))\n"
+    )
+    pytester.makeconftest("""
+        import pytest
+
+        @pytest.fixture(scope="session")
+        def apibean_container():
+            return None
+
+        @pytest.fixture
+        def apibean_reset_db():
+            pass
+    """)
+    pytester.makepyfile("""
+        import pytest
+
+        @pytest.mark.seed("users.basic")
+        @pytest.mark.parametrize("i", range(4))
+        def test_users(i):
+            pass
+    """)
+    result = pytester.runpytest("--apibean-memprofile")
+    result.assert_outcomes(passed=4)
+    result.stdout.fnmatch_lines([
+        "*apibean memory*",
+        "retaining memory across tests:",
+        "  seeder [[]users.basic[]]: +* KiB over 4 runs",
+        "top allocation sites since the first test:",
+        "*users_seeder.py:6",
+    ])
+    for phase in ("test", "apibean_reset_db", "apibean_before_reset_db"):
+        result.stdout.no_fnmatch_line(f"  {phase}: *")
+
+
+def test_memprofile_does_not_flag_memory_released_at_teardown(pytester):
+    pytester.mkpydir("tests")
+    pytester.mkpydir("tests/seeders")
+    pytester.path.joinpath("tests", "seeders", "users_seeder.py").write_text(
+        "class UsersSeeder:\n"
+        "    def __init__(self, seed, session, container, **kwargs):\n"
+        "        pass\n"
+        "    def run(self):\n"
+        "        return bytearray(256 * 1024)\n"
+    )
+    pytester.makeconftest("""
+        import pytest
+
+        @pytest.fixture(scope="session")
+        def apibean_container():
+            return None
+
+        @pytest.fixture
+        def apibean_before_reset_db():
+            pass
+
+        @pytest.fixture
+        def apibean_reset_db():
+            pass
+    """)
+    pytester.makepyfile("""
+        import pytest
+
+        @pytest.mark.seed("users.basic")
+        @pytest.mark.parametrize("i", range(6))
+        def test_users(i):
+            pass
+    """)
+    result = pytester.runpytest("--apibean-memprofile")
+    result.assert_outcomes(passed=6)
+    result.stdout.fnmatch_lines(["*apibean memory*", "*+15*.* KiB       6  seeder [[]users.basic[]]"])
+    result.stdout.no_fnmatch_line("retaining memory*")
@@ -0,0 +1,164 @@
+def test_group_seeds_reuses_state_for_readonly_tests(pytester):
+    pytester.mkpydir("tests")
+    pytester.mkpydir("tests/seeders")
+    pytester.path.joinpath("tests", "seeders", "users_seeder.py").write_text(
+        "RUNS = []\n"
+        "class UsersSeeder:\n"
+        "    def __init__(self, seed, session, container, **kwargs):\n"
+        "        self.seed = seed\n"
+        "    def run(self):\n"
+        "        RUNS.append(self.seed)\n"
+    )
+    pytester.makeconftest("""
+        import pytest
+
+        RESETS = []
+
+        @pytest.fixture(scope="session")
+        def apibean_container():
+            return None
+
+        @pytest.fixture
+        def apibean_reset_db():
+            RESETS.append(1)
+    """)
+    pytester.makepyfile("""
+        import pytest
+        from conftest import RESETS
+        from tests.seeders.users_seeder import RUNS
+
+        @pytest.mark.seed("users.basic")
+        @pytest.mark.apibean_readonly
+        def test_a():
+            pass
+
+        @pytest.mark.seed("users.admin")
+        @pytest.mark.apibean_readonly
+        def test_b():
+            pass
+
+        @pytest.mark.seed("users.basic")
+        def test_c_writes():
+            pass
+
+        @pytest.mark.seed("users.basic")
+        @pytest.mark.apibean_readonly
+        def test_d():
+            pass
+
+        def test_zz_totals():
+            assert RUNS == ["users.basic", "users.basic", "users.admin"]
+            assert len(RESETS) == 4
+    """)
+    result = pytester.runpytest("--apibean-group-seeds", "-v")
+    result.assert_outcomes(passed=5)
+    result.stdout.fnmatch_lines([
+        "*test_a PASSED*",
+        "*test_d PASSED*",
+        "*test_c_writes PASSED*",
+        "*test_b PASSED*",
+        "*test_zz_totals PASSED*",
+        "*4 resets, 1 avoided; 3 seedings, 1 avoided*",
+    ])
+
+
+def test_group_seeds_keeps_module_fixtures_local(pytester):
+    pytester.mkpydir("tests")
+    pytester.mkpydir("tests/seeders")
+    pytester.path.joinpath("tests", "seeders", "users_seeder.py").write_text(
+        "class UsersSeeder:\n"
+        "    def __init__(self, seed, session, container, **kwargs):\n"
+        "        pass\n"
+        "    def run(self):\n"
+        "        pass\n"
+    )
+    pytester.makeconftest("""
+        import pytest
+
+        SETUPS = []
+
+        @pytest.fixture(scope="session")
+        def apibean_container():
+            return None
+
+        @pytest.fixture
+        def apibean_reset_db():
+            pass
+
+        @pytest.fixture(scope="module")
+        def module_resource(request):
+            SETUPS.append(request.module.__name__)
+    """)
+    body = """
+        import pytest
+
+        @pytest.mark.seed("users.basic")
+        def test_1(module_resource):
+            pass
+
+        @pytest.mark.seed("users.admin")
+        def test_2(module_resource):
+            pass
+
+        @pytest.mark.seed("users.basic")
+        def test_3(module_resource):
+            pass
+    """
+    pytester.makepyfile(test_one=body, test_two=body)
+    pytester.makepyfile(test_zz_totals="""
+        from conftest import SETUPS
+
+        def test_totals():
+            assert SETUPS == ["test_one", "test_two"]
+    """)
+    result = pytester.runpytest("--apibean-group-seeds", "-v")
+    result.assert_outcomes(passed=7)
+    result.stdout.fnmatch_lines([
+        "*test_one.py::test_1 PASSED*",
+        "*test_one.py::test_3 PASSED*",
+        "*test_one.py::test_2 PASSED*",
+        "*test_two.py::test_1 PASSED*",
+        "*test_two.py::test_3 PASSED*",
+        "*test_two.py::test_2 PASSED*",
+    ])
+
+
+def test_readonly_tests_requesting_seed_data_are_not_seeded_again(pytester):
+    pytester.mkpydir("tests")
+    pytester.mkpydir("tests/seeders")
+    pytester.path.joinpath("tests", "seeders", "users_seeder.py").write_text(
+        "RUNS = []\n"
+        "class UsersSeeder:\n"
+        "    def __init__(self, seed, session, container, **kwargs):\n"
+        "        self.seed = seed\n"
+        "    def run(self):\n"
+        "        RUNS.append(self.seed)\n"
+        "        return len(RUNS)\n"
+    )
+    pytester.makeconftest("""
+        import pytest
+
+        @pytest.fixture(scope="session")
+        def apibean_container():
+            return None
+
+        @pytest.fixture
+        def apibean_reset_db():
+            pass
+    """)
+    pytester.makepyfile("""
+        import pytest
+        from tests.seeders.users_seeder import RUNS
+
+        pytestmark = [pytest.mark.seed("users.basic"), pytest.mark.apibean_readonly]
+
+        def test_a(apibean_seed_data):
+            assert apibean_seed_data == {"users.basic": 1}
+
+        def test_b(apibean_seed_data):
+            assert apibean_seed_data == {"users.basic": 1}
+            assert RUNS == ["users.basic"]
+    """)
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines(["*1 resets, 1 avoided; 1 seedings, 1 avoided*"])
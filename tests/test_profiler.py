@@ -0,0 +1,82 @@
+import json
+
+
+def test_profile_reports_phases(pytester):
+    pytester.mkpydir("tests")
+    pytester.mkpydir("tests/seeders")
+    pytester.path.joinpath("tests", "seeders", "users_seeder.py").write_text(
+        "class UsersSeeder:\n"
+        "    def __init__(self, seed, session, container, **kwargs):\n"
+        "        pass\n"
+        "    def run(self):\n"
+        "        pass\n"
+    )
+    pytester.makeconftest("""
+        import pytest
+
+        @pytest.fixture(scope="session")
+        def apibean_container():
+            return None
+
+        @pytest.fixture
+        def apibean_reset_db():
+            pass
+    """)
+    pytester.makepyfile("""
+        import pytest
+
+        @pytest.mark.seed("users.basic")
+        @pytest.mark.parametrize("i", range(2))
+        def test_users(i):
+            pass
+    """)
+    result = pytester.runpytest("--apibean-profile-json", "profile.json")
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines(["*apibean profile*", "*2  seeder [[]users.basic[]]"])
+
+    report = json.loads(pytester.path.joinpath("profile.json").read_text())
+    phases = {(entry["phase"], entry["label"]): entry["count"] for entry in report["phases"]}
+    assert phases == {
+        ("apibean_before_reset_db", None): 2,
+        ("apibean_reset_db", None): 2,
+        ("seeder", "users.basic"): 2,
+        ("test", None): 2,
+    }
+    assert len(report["tests"]) == 2
+
+
+def test_profile_counts_phases_in_test_body_as_body(pytester):
+    pytester.makeconftest("""
+        import time
+        import pytest
+
+        class AuthService:
+            def login(self, credentials):
+                time.sleep(0.05)
+                return {"access_token": "token"}
+
+        class Container:
+            def auth_service(self):
+                return AuthService()
+
+        @pytest.fixture(scope="session")
+        def apibean_container():
+            return Container()
+
+        @pytest.fixture
+        def apibean_reset_db():
+            pass
+    """)
+    pytester.makepyfile("""
+        def test_login(login):
+            assert login("alice@example.com", "secret") == "token"
+    """)
+    result = pytester.runpytest("--apibean-profile-json", "profile.json")
+    result.assert_outcomes(passed=1)
+
+    report = json.loads(pytester.path.joinpath("profile.json").read_text())
+    login = [timing for timing in report["timings"] if timing["phase"] == "login"]
+    assert len(login) == 1 and login[0]["in_test"]
+    [test] = report["tests"]
+    assert test["body"] >= 0.05
+    assert test["overhead"] < 0.05
@@ -0,0 +1,97 @@
+from apibean.pytest.queries import QueryBudget, QueryStats, normalize_statement
+
+
+def test_query_budget(pytester):
+    pytester.mkpydir("tests")
+    pytester.mkpydir("tests/seeders")
+    pytester.path.joinpath("tests", "seeders", "users_seeder.py").write_text(
+        "from conftest import DB\n"
+        "class UsersSeeder:\n"
+        "    def __init__(self, seed, session, container, **kwargs):\n"
+        "        pass\n"
+        "    def run(self):\n"
+        "        for i in range(5):\n"
+        "            DB.execute('INSERT INTO users VALUES (?)', (i,))\n"
+    )
+    pytester.makeconftest("""
+        import sqlite3
+        import pytest
+
+        DB = sqlite3.connect(":memory:", isolation_level=None)
+        DB.execute("CREATE TABLE users(id INTEGER)")
+
+        @pytest.fixture(scope="session")
+        def apibean_db():
+            return DB
+
+        @pytest.fixture(scope="session")
+        def apibean_container():
+            return None
+
+        @pytest.fixture
+        def apibean_reset_db(apibean_db):
+            apibean_db.execute("DELETE FROM users")
+    """)
+    pytester.makepyfile("""
+        import pytest
+
+        @pytest.mark.seed("users.basic")
+        @pytest.mark.apibean_query_budget(max_queries=2)
+        def test_within_budget(apibean_db, apibean_queries):
+            apibean_db.execute("SELECT COUNT(*) FROM users").fetchone()
+            assert (apibean_queries.seed.count, apibean_queries.body.count) == (5, 1)
+
+        @pytest.mark.seed("users.basic")
+        @pytest.mark.apibean_query_budget(max_queries=2)
+        def test_n_plus_one(apibean_db):
+            for i in range(5):
+                apibean_db.execute(f"SELECT * FROM users WHERE id = {i}").fetchone()
+
+        def test_not_counted(apibean_db):
+            apibean_db.execute("SELECT 1")
+    """)
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=2, failed=1)
+    result.stdout.fnmatch_lines([
+        "*apibean query budget exceeded: 5 queries > max_queries=2",
+        "*seeding: 5 queries, test body: 5 queries",
+        "*repeated statements in the test body:",
+        "*5 x SELECT * FROM users WHERE id = ?",
+    ])
+
+
+def test_normalize_statement():
+    assert normalize_statement("SELECT * FROM users WHERE id = 42") == "SELECT * FROM users WHERE id = ?"
+    assert normalize_statement("SELECT * FROM users WHERE name = 'O''Brien'") == "SELECT * FROM users WHERE name = ?"
+    assert normalize_statement("SELECT *\n  FROM t WHERE id IN (1, 2, 3)") == "SELECT * FROM t WHERE id IN (...)"
+    assert normalize_statement("UPDATE t SET x = :x WHERE id = %(id)s") == "UPDATE t SET x = ? WHERE id = ?"
+    assert normalize_statement("SELECT price FROM t2 WHERE a = $1") == "SELECT price FROM t2 WHERE a = ?"
+
+
+def test_query_budget_violations():
+    stats = QueryStats(count=5, time=0.020, timed=5)
+    assert QueryBudget(max_queries=5, max_time_ms=25).violations(stats) == []
+    assert QueryBudget(max_queries=4, max_time_ms=10).violations(stats) == [
+        "5 queries > max_queries=4",
+        "20.0ms > max_time_ms=10",
+    ]
+    # durations are unknown: the time budget cannot be checked
+    assert QueryBudget(max_time_ms=1).violations(QueryStats(count=5)) == []
+
+
+def test_query_counter_skips_transaction_control():
+    from apibean.pytest.queries import QueryCounter
+
+    counter = QueryCounter()
+    counter.phase = "body"
+    for statement in (
+        "BEGIN",
+        "SAVEPOINT apibean_test",
+        "SELECT * FROM users",
+        "  -- reset\nROLLBACK TO SAVEPOINT apibean_test",
+        "release savepoint apibean_test",
+        "COMMIT",
+    ):
+        counter(statement, 0.001)
+    assert counter.body.count == 1
+    assert list(counter.body.statements) == ["SELECT * FROM users"]
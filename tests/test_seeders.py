@@ -0,0 +1,241 @@
+import pytest
+
+
+@pytest.fixture
+def seeded_project(pytester):
+    pytester.mkpydir("tests")
+    pytester.mkpydir("tests/seeders")
+    pytester.path.joinpath("tests", "seeders", "user_roles_seeder.py").write_text(
+        "class UserRolesSeeder:\n"
+        "    def __init__(self, seed, session, container, **kwargs):\n"
+        "        pass\n"
+        "    def run(self):\n"
+        "        pass\n"
+    )
+    return pytester
+
+
+def test_unresolved_seeds_fail_before_running(seeded_project):
+    seeded_project.makepyfile("""
+        import pytest
+
+        @pytest.mark.seed("user_roles.basic")
+        def test_ok():
+            pass
+
+        @pytest.mark.seed("user_role.basic")
+        def test_typo():
+            pass
+
+        @pytest.mark.seed("nodot")
+        def test_malformed():
+            pass
+    """)
+    result = seeded_project.runpytest()
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines([
+        "*could not resolve the following seeds:*",
+        "*UserRoleSeeder*user_role.basic*test_typo*",
+        "*Invalid seed name: 'nodot'*test_malformed*",
+    ])
+
+
+def test_missing_abstract_fixtures_are_reported(seeded_project):
+    seeded_project.makepyfile("""
+        import pytest
+
+        @pytest.mark.seed("user_roles.basic")
+        def test_ok():
+            pass
+    """)
+    result = seeded_project.runpytest()
+    result.assert_outcomes(skipped=1)
+    result.stdout.fnmatch_lines([
+        "*abstract fixture 'apibean_container' is not provided*(1 tests will be skipped)",
+        "*abstract fixture 'apibean_reset_db' is not provided*(1 tests will be skipped)",
+    ])
+
+
+def test_async_seeders_share_the_session_portal(seeded_project):
+    seeded_project.path.joinpath("tests", "seeders", "orgs_seeder.py").write_text(
+        "import threading\n"
+        "import anyio\n"
+        "LOOP_THREADS = []\n"
+        "class OrgsSeeder:\n"
+        "    def __init__(self, seed, session, container, **kwargs):\n"
+        "        pass\n"
+        "    async def run(self):\n"
+        "        await anyio.sleep(0)\n"
+        "        LOOP_THREADS.append(threading.get_ident())\n"
+    )
+    seeded_project.makeconftest("""
+        import pytest
+
+        @pytest.fixture(scope="session")
+        def apibean_container():
+            return None
+
+        @pytest.fixture
+        def apibean_reset_db():
+            pass
+    """)
+    seeded_project.makepyfile("""
+        import threading
+        import pytest
+        from tests.seeders.orgs_seeder import LOOP_THREADS
+
+        @pytest.mark.seed("orgs.basic")
+        @pytest.mark.parametrize("i", range(3))
+        def test_orgs(apibean_portal, i):
+            assert len(set(LOOP_THREADS)) == 1
+            assert LOOP_THREADS[0] != threading.get_ident()
+            assert apibean_portal.call(threading.get_ident) == LOOP_THREADS[0]
+    """)
+    seeded_project.runpytest().assert_outcomes(passed=3)
+
+
+def test_seeder_requirements_run_once_in_dependency_order(seeded_project):
+    seeders = seeded_project.path.joinpath("tests", "seeders")
+    seeders.joinpath("log.py").write_text("import threading\nRUNS = []\nLOCK = threading.Lock()\n")
+    for prefix, requires in (("orgs", ()), ("users", ("orgs.basic",)), ("projects", ("orgs.basic",))):
+        seeders.joinpath(f"{prefix}_seeder.py").write_text(
+            "from tests.seeders.log import LOCK, RUNS\n"
+            f"class {prefix.capitalize()}Seeder:\n"
+            f"    requires = {requires!r}\n"
+            "    def __init__(self, seed, session, container, **kwargs):\n"
+            "        self.seed = seed\n"
+            "    def run(self):\n"
+            "        with LOCK:\n"
+            "            RUNS.append(self.seed)\n"
+            "        return self.seed.upper()\n"
+        )
+    seeded_project.makeconftest("""
+        import pytest
+
+        @pytest.fixture(scope="session")
+        def apibean_container():
+            return None
+
+        @pytest.fixture
+        def apibean_reset_db():
+            pass
+    """)
+    seeded_project.makepyfile("""
+        import pytest
+        from tests.seeders.log import RUNS
+
+        @pytest.mark.seed("projects.basic")
+        @pytest.mark.seed("users.basic")
+        @pytest.mark.seed("users.basic")
+        def test_dag(apibean_seed_data):
+            assert RUNS[0] == "orgs.basic"
+            assert sorted(RUNS) == ["orgs.basic", "projects.basic", "users.basic"]
+            assert apibean_seed_data["users.basic"] == "USERS.BASIC"
+    """)
+    seeded_project.makepyprojecttoml("""
+        [tool.pytest.apibean.options]
+        seed_workers = 2
+    """)
+    result = seeded_project.runpytest()
+    result.assert_outcomes(passed=1)
+
+
+def test_seeder_requirement_cycles_fail_before_running(seeded_project):
+    seeders = seeded_project.path.joinpath("tests", "seeders")
+    for prefix, requires in (("orgs", ("users.basic",)), ("users", ("orgs.basic",))):
+        seeders.joinpath(f"{prefix}_seeder.py").write_text(
+            f"class {prefix.capitalize()}Seeder:\n"
+            f"    requires = {requires!r}\n"
+        )
+    seeded_project.makepyfile("""
+        import pytest
+
+        @pytest.mark.seed("users.basic")
+        def test_cycle():
+            pass
+    """)
+    result = seeded_project.runpytest()
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["*Seed dependency cycle between: orgs.basic, users.basic*"])
+
+
+def test_marker_order_yields_to_declared_requirements():
+    from apibean.pytest.seeders import plan_seeders
+
+    class OrdersSeeder:
+        requires = ("users.basic",)
+
+    class UsersSeeder:
+        pass
+
+    seeders = {"orders": OrdersSeeder, "users": UsersSeeder}
+    # a class-level seed("orders.basic") followed by a function-level seed("users.basic")
+    markers = [pytest.mark.seed("orders.basic").mark, pytest.mark.seed("users.basic").mark]
+    steps = plan_seeders(markers, lambda prefix, seed_name: seeders[prefix])
+    assert [(step.seed_name, step.marker, step.requires) for step in steps] == [
+        ("users.basic", 1, ()),
+        ("orders.basic", 0, (0,)),
+    ]
+
+def test_data_file_seeds_are_bulk_inserted_in_batches(seeded_project):
+    catalog = seeded_project.path.joinpath("tests", "seeders", "products")
+    catalog.mkdir()
+    catalog.joinpath("large.jsonl").write_text(
+        "".join(f'{{"sku": "p{i}", "price": {i}}}\n' for i in range(25))
+    )
+    catalog.joinpath("small.csv").write_text("sku,price\na,1\nb,2\n")
+    seeded_project.makeconftest("""
+        import sqlite3
+        import pytest
+
+        BATCHES = []
+
+        class Database:
+            def __init__(self):
+                self.conn = sqlite3.connect(":memory:")
+                self.conn.execute("CREATE TABLE products(sku TEXT, price)")
+
+            def bulk_insert(self, table, rows):
+                BATCHES.append(len(rows))
+                self.conn.executemany(f"INSERT INTO {table} VALUES (:sku, :price)", rows)
+
+        @pytest.fixture(scope="session")
+        def apibean_db():
+            return Database()
+
+        @pytest.fixture(scope="session")
+        def apibean_container():
+            return None
+
+        @pytest.fixture
+        def apibean_reset_db(apibean_db):
+            apibean_db.conn.execute("DELETE FROM products")
+    """)
+    seeded_project.makepyfile("""
+        import pytest
+        from conftest import BATCHES
+
+        @pytest.mark.seed("products.large", batch_size=10)
+        @pytest.mark.parametrize("i", range(2))
+        def test_large(apibean_db, apibean_seed_data, i):
+            assert apibean_seed_data == {"products.large": 25}
+            assert apibean_db.conn.execute("SELECT COUNT(*) FROM products").fetchone() == (25,)
+            assert BATCHES[-3:] == [10, 10, 5]
+
+        @pytest.mark.seed("products.small")
+        def test_small(apibean_db):
+            assert apibean_db.conn.execute("SELECT sku FROM products").fetchall() == [("a",), ("b",)]
+    """)
+    result = seeded_project.runpytest()
+    result.assert_outcomes(passed=3)
+
+
+def test_default_bulk_insert_quotes_identifiers():
+    import sqlite3
+
+    from apibean.pytest.datafiles import bulk_inserter
+
+    db = sqlite3.connect(":memory:")
+    db.execute('CREATE TABLE "order" ("group" TEXT, "odd ""name" INTEGER)')
+    bulk_inserter(db)("order", [{"group": "a", 'odd "name': 1}, {"group": "b", 'odd "name': 2}])
+    assert db.execute('SELECT * FROM "order"').fetchall() == [("a", 1), ("b", 2)]
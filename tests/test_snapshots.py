@@ -0,0 +1,129 @@
+import sqlite3
+from contextlib import closing
+
+from apibean.pytest.snapshots.sqlite import SqliteSnapshotBackend
+from apibean.pytest.snapshots.store import SnapshotStore
+
+
+def rows(path):
+    with closing(sqlite3.connect(path)) as conn:
+        return [r[0] for r in conn.execute("SELECT name FROM users ORDER BY name")]
+
+
+def insert(path, *names):
+    with closing(sqlite3.connect(path)) as conn, conn:
+        conn.executemany("INSERT INTO users(name) VALUES (?)", [(n,) for n in names])
+
+
+def test_sqlite_snapshot_roundtrip(tmp_path):
+    database = tmp_path / "app.db"
+    with closing(sqlite3.connect(database)) as conn:
+        conn.execute("CREATE TABLE users(name TEXT)")
+    store = SnapshotStore(SqliteSnapshotBackend(database, tmp_path / "snapshots"))
+
+    insert(database, "alice")
+    assert not store.restore("users.basic")
+    store.capture("users.basic")
+
+    insert(database, "bob")
+    assert store.restore("users.basic")
+    assert rows(database) == ["alice"]
+    assert (store.hits, store.misses) == (1, 1)
+
+
+def test_snapshot_store_lru_eviction():
+    class Backend:
+        def __init__(self):
+            self.discarded = []
+        def capture(self, key):
+            return 10
+        def restore(self, key):
+            pass
+        def discard(self, key):
+            self.discarded.append(key)
+
+    backend = Backend()
+    store = SnapshotStore(backend, max_entries=3, max_bytes=25)
+    store.capture("a")
+    store.capture("b")
+    store.restore("a")
+    store.capture("c")
+    assert backend.discarded == ["b"]
+    assert list(store._entries) == ["a", "c"]
+
+
+def test_seed_data_restores_snapshot(pytester):
+    pytester.mkpydir("seeders")
+    pytester.path.joinpath("seeders", "users_seeder.py").write_text(
+        "import sqlite3\n"
+        "RUNS = []\n"
+        "class UsersSeeder:\n"
+        "    def __init__(self, seed, session, container, **kwargs):\n"
+        "        self.container = container\n"
+        "    def run(self):\n"
+        "        RUNS.append(1)\n"
+        "        with sqlite3.connect(self.container) as conn:\n"
+        "            conn.execute(\"INSERT INTO users VALUES ('alice')\")\n"
+        "        return 'alice'\n"
+    )
+    pytester.mkpydir("other_seeders")
+    pytester.path.joinpath("other_seeders", "users_seeder.py").write_text(
+        "import sqlite3\n"
+        "class UsersSeeder:\n"
+        "    def __init__(self, seed, session, container, **kwargs):\n"
+        "        self.container = container\n"
+        "    def run(self):\n"
+        "        with sqlite3.connect(self.container) as conn:\n"
+        "            conn.execute(\"INSERT INTO users VALUES ('bob')\")\n"
+        "        return 'bob'\n"
+    )
+    pytester.makeconftest("""
+        import sqlite3
+        import pytest
+        from apibean.pytest.snapshots.sqlite import SqliteSnapshotBackend
+
+        @pytest.fixture(scope="session")
+        def apibean_container(tmp_path_factory):
+            return str(tmp_path_factory.mktemp("db") / "app.db")
+
+        @pytest.fixture(scope="session")
+        def apibean_snapshot_backend(apibean_container, tmp_path_factory):
+            return SqliteSnapshotBackend(apibean_container, tmp_path_factory.mktemp("snapshots"))
+
+        @pytest.fixture
+        def apibean_seed_modules():
+            return "seeders"
+
+        @pytest.fixture
+        def apibean_reset_db(apibean_container):
+            with sqlite3.connect(apibean_container) as conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS users(name TEXT)")
+                conn.execute("DELETE FROM users")
+    """)
+    pytester.makepyfile("""
+        import sqlite3
+        import pytest
+        from seeders.users_seeder import RUNS
+
+        @pytest.mark.seed("users.basic")
+        @pytest.mark.parametrize("i", range(3))
+        def test_users(apibean_container, apibean_seed_data, i):
+            with sqlite3.connect(apibean_container) as conn:
+                assert conn.execute("SELECT name FROM users").fetchall() == [("alice",)]
+            assert apibean_seed_data == {"users.basic": "alice"}
+            assert len(RUNS) == 1
+
+        class TestOtherSeedModules:
+            @pytest.fixture
+            def apibean_seed_modules(self):
+                return "other_seeders"
+
+            @pytest.mark.seed("users.basic")
+            def test_users(self, apibean_container, apibean_seed_data):
+                with sqlite3.connect(apibean_container) as conn:
+                    assert conn.execute("SELECT name FROM users").fetchall() == [("bob",)]
+                assert apibean_seed_data == {"users.basic": "bob"}
+    """)
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=4)
+    result.stdout.fnmatch_lines(["*2 restored, 2 seeded, 0 evicted*"])
@@ -0,0 +1,23 @@
+import subprocess
+import sys
+
+SCRIPT = """
+import sys
+import pytest
+before = set(sys.modules)
+import apibean.pytest.plugin
+from apibean.pytest import settings
+loaded = set(sys.modules) - before
+heavy = sorted(
+    name for name in loaded
+    if name.split(".")[0] in ("anyio", "dependency_injector", "tomllib")
+)
+print(heavy, settings._cached_settings.cache_info().currsize)
+"""
+
+
+def test_plugin_import_defers_heavy_modules_and_settings():
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT], capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == "[] 0"
@@ -0,0 +1,104 @@
+import base64
+import json
+
+from apibean.pytest.tokens import TokenCache, decode_jwt_exp
+
+
+def make_jwt(exp):
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode()).rstrip(b"=")
+    return f"header.{payload.decode()}.signature"
+
+
+def test_decode_jwt_exp():
+    assert decode_jwt_exp(make_jwt(1700000000)) == 1700000000.0
+    assert decode_jwt_exp("opaque-token") is None
+    assert decode_jwt_exp("a.!!!.c") is None
+
+
+def test_token_cache_hits_and_refresh():
+    now = [1000.0]
+    cache = TokenCache(refresh_leeway=30, clock=lambda: now[0])
+    issued = []
+
+    def fetch():
+        issued.append(make_jwt(now[0] + 100))
+        return issued[-1]
+
+    first = cache.get("login", "alice", None, "secret", fetch)
+    assert cache.get("login", "alice", None, "secret", fetch) == first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    now[0] += 80
+    assert cache.get("login", "alice", None, "secret", fetch) != first
+    assert (cache.misses, cache.refreshes) == (2, 1)
+
+
+def test_token_cache_password_and_invalidate():
+    cache = TokenCache()
+    tokens = iter(["t1", "t2", "t3"])
+
+    assert cache.get("login", "alice", None, "secret", lambda: next(tokens)) == "t1"
+    assert cache.get("login", "alice", None, "other", lambda: next(tokens)) == "t2"
+    assert cache.invalidate("alice") == 1
+    assert cache.get("login", "alice", None, "other", lambda: next(tokens)) == "t3"
+
+
+def test_token_cache_fetches_outside_of_the_cache_lock():
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    cache = TokenCache()
+    cache.store("login", "bob", None, "secret", "cached-bob")
+    started, release = threading.Event(), threading.Event()
+    fetches = []
+
+    def slow_fetch():
+        fetches.append("alice")
+        started.set()
+        assert release.wait(5)
+        return "token-alice"
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        alice = [pool.submit(cache.get, "login", "alice", None, "secret", slow_fetch) for _ in range(2)]
+        assert started.wait(5)
+        # neither a cache hit nor the login of another user waits for alice
+        assert cache.get("login", "bob", None, "secret", lambda: "new-bob") == "cached-bob"
+        assert cache.get("login", "carol", None, "secret", lambda: "token-carol") == "token-carol"
+        release.set()
+        assert [future.result(5) for future in alice] == ["token-alice", "token-alice"]
+    assert fetches == ["alice"]
+
+def test_login_fixture_uses_cache(pytester):
+    pytester.makeconftest("""
+        import pytest
+
+        class AuthService:
+            calls = 0
+            def login(self, data):
+                AuthService.calls += 1
+                return {"access_token": "token-" + data["username"]}
+
+        class Container:
+            def auth_service(self):
+                return AuthService()
+
+        @pytest.fixture(scope="session")
+        def apibean_container():
+            return Container()
+
+        @pytest.fixture
+        def apibean_reset_db():
+            pass
+    """)
+    pytester.makepyfile("""
+        import pytest
+        from conftest import AuthService
+
+        @pytest.mark.parametrize("i", range(3))
+        def test_login(login, i):
+            assert login("alice", "secret") == "token-alice"
+            assert AuthService.calls == 1
+    """)
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines(["*2 hits, 1 misses*"])
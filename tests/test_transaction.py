@@ -0,0 +1,50 @@
+def test_transaction_reset_mode(pytester):
+    pytester.makeconftest("""
+        import sqlite3
+        import pytest
+
+        RESETS = []
+
+        @pytest.fixture(scope="session")
+        def apibean_db():
+            conn = sqlite3.connect(":memory:", isolation_level=None)
+            conn.execute("CREATE TABLE users(name TEXT)")
+            return conn
+
+        @pytest.fixture(scope="session")
+        def apibean_container():
+            return None
+
+        @pytest.fixture
+        def apibean_reset_db(apibean_db):
+            RESETS.append(1)
+            apibean_db.execute("DELETE FROM users")
+    """)
+    pytester.makepyfile("""
+        import pytest
+        from conftest import RESETS
+
+        def count(db):
+            return db.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+        @pytest.mark.apibean_reset("transaction")
+        @pytest.mark.parametrize("i", range(3))
+        def test_rolled_back(apibean_db, i):
+            assert count(apibean_db) == 0
+            apibean_db.execute("INSERT INTO users VALUES ('alice')")
+            assert len(RESETS) == 1
+
+        @pytest.mark.apibean_reset("transaction")
+        @pytest.mark.apibean_commits
+        def test_commits(apibean_db):
+            apibean_db.execute("INSERT INTO users VALUES ('bob')")
+            assert len(RESETS) == 2
+
+        @pytest.mark.apibean_reset("transaction")
+        def test_after_commits(apibean_db):
+            assert count(apibean_db) == 0
+            assert len(RESETS) == 3
+    """)
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=5)
+
@@ -0,0 +1,135 @@
+import pytest
+
+
+def test_warmup_resolves_services_and_premints_tokens(pytester):
+    pytester.makeconftest("""
+        import functools
+        import threading
+        import pytest
+        from dependency_injector import containers, providers
+
+        LOGINS = []
+
+        class AuthService:
+            def login(self, data):
+                LOGINS.append((data["username"], threading.current_thread().name))
+                return {"access_token": "token-" + data["username"]}
+
+        class Container(containers.DeclarativeContainer):
+            auth_service = providers.Singleton(AuthService)
+            user_service = providers.Singleton(object)
+
+        class Config:
+            ROOT_USER_EMAIL = "root@example.com"
+            ROOT_USER_PASSWORD = "secret"
+            SYNC_USER_EMAIL = "sync@example.com"
+            SYNC_USER_PASSWORD = "secret"
+
+        @functools.cache
+        def make_container():
+            return Container()
+
+        def pytest_apibean_warmup(config):
+            return {"container": make_container(), "config": Config()}
+
+        @pytest.fixture(scope="session")
+        def apibean_container():
+            return make_container()
+
+        @pytest.fixture
+        def apibean_config():
+            return Config()
+
+        @pytest.fixture
+        def apibean_reset_db():
+            pass
+    """)
+    pytester.makepyfile("""
+        from conftest import LOGINS
+
+        def test_tokens(apibean_warmup, root_access_token, sync_access_token):
+            assert apibean_warmup.services == ["auth_service", "user_service"]
+            assert root_access_token == "token-root@example.com"
+            assert sync_access_token == "token-sync@example.com"
+            assert [thread for _, thread in LOGINS] == ["apibean-warmup", "apibean-warmup"]
+    """)
+    result = pytester.runpytest("--apibean-warmup")
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(["*apibean warm-up*", "2 services, 2 tokens in *s"])
+
+
+def test_warmup_completes_before_session_fixtures(pytester):
+    pytester.makeconftest("""
+        import threading
+        import time
+        import pytest
+
+        DONE = threading.Event()
+
+        def pytest_apibean_warmup(config):
+            time.sleep(0.3)
+            DONE.set()
+
+        @pytest.fixture(scope="session")
+        def apibean_container():
+            # requested before apibean_testcase_loop by the test below
+            assert DONE.is_set()
+            return object()
+
+        @pytest.fixture
+        def apibean_reset_db():
+            pass
+    """)
+    pytester.makepyfile("""
+        def test_container(apibean_container):
+            pass
+    """)
+    result = pytester.runpytest("--apibean-warmup")
+    result.assert_outcomes(passed=1)
+
+
+def test_warmup_timeout_stops_the_session(pytester):
+    pytester.makepyprojecttoml("""
+        [tool.pytest.apibean.options]
+        warmup_timeout = 0.2
+    """)
+    pytester.makeconftest("""
+        import time
+        import pytest
+
+        def pytest_apibean_warmup(config):
+            time.sleep(3)
+
+        @pytest.fixture
+        def apibean_reset_db():
+            pass
+    """)
+    pytester.makepyfile("""
+        def test_never_runs():
+            pass
+    """)
+    result = pytester.runpytest("--apibean-warmup")
+    assert result.ret == pytest.ExitCode.INTERNAL_ERROR
+    result.stdout.fnmatch_lines(["*apibean warm-up did not complete within 0.2s*"])
+    result.stdout.no_fnmatch_line("*test_never_runs PASSED*")
+
+
+def test_failed_warmup_stops_the_session(pytester):
+    pytester.makeconftest("""
+        import pytest
+
+        def pytest_apibean_warmup(config):
+            raise PermissionError("bad credentials")
+
+        @pytest.fixture
+        def apibean_reset_db():
+            pass
+    """)
+    pytester.makepyfile("""
+        def test_never_runs():
+            pass
+    """)
+    result = pytester.runpytest("--apibean-warmup")
+    assert result.ret == pytest.ExitCode.INTERNAL_ERROR
+    result.stdout.fnmatch_lines(["*apibean warm-up failed: PermissionError: bad credentials*"])
+    result.stdout.no_fnmatch_line("*test_never_runs PASSED*")
@@ -0,0 +1,191 @@
+import pytest
+from dependency_injector import containers, providers
+
+from apibean.pytest.wrappers.container import ServiceWrappingMeta, reset_wrapped_services
+
+
+class AuthService:
+    pass
+
+
+class AppContainer(containers.DeclarativeContainer):
+    auth_service = providers.Singleton(AuthService)
+    org_service = providers.Factory(AuthService)
+
+
+def make_container(mode):
+    calls = []
+
+    def inject(service, api_invoker):
+        calls.append(service)
+        return (service, api_invoker)
+
+    class TestContainer(AppContainer, metaclass=ServiceWrappingMeta,
+                        injected_func_name="inject_invoker", wrapping_mode=mode):
+        api_invoker = providers.Object("invoker")
+        inject_invoker = inject
+
+    return TestContainer(), calls
+
+
+def test_callable_mode_injects_on_every_call():
+    container, calls = make_container("callable")
+    assert container.auth_service() == (container.auth_service()[0], "invoker")
+    assert len(calls) == 2
+
+
+def test_scoped_mode_preserves_parent_scope():
+    container, calls = make_container("scoped")
+    assert container.auth_service() is container.auth_service()
+    assert container.org_service() is not container.org_service()
+    assert len(calls) == 3
+
+
+def test_scoped_mode_follows_parent_resets():
+    container, calls = make_container("scoped")
+    first = container.auth_service()
+    container.auth_service.parent.reset()
+    second = container.auth_service()
+    assert second is not first and second[0] is not first[0]
+    assert container.auth_service() is second
+
+    container.reset_singletons()
+    third = container.auth_service()
+    assert third is not second and third[0] is not second[0]
+
+    container.auth_service.reset()
+    assert container.auth_service() is not third
+    assert len(calls) == 4
+
+def test_cached_mode_resets_between_tests():
+    container, calls = make_container("cached")
+    first = container.org_service()
+    assert container.org_service() is first
+    assert reset_wrapped_services(container) == 2
+    assert container.org_service() is not first
+    assert len(calls) == 2
+
+
+def test_wrapped_provider_can_be_overridden():
+    container, _ = make_container("cached")
+    with container.auth_service.override(providers.Object("mock")):
+        assert container.auth_service() == "mock"
+    assert container.auth_service()[1] == "invoker"
+
+
+def test_invalid_wrapping_mode():
+    with pytest.raises(ValueError, match="Invalid wrapping mode"):
+        make_container("eager")
+
+
+def test_provider_overlay_undoes_only_its_changes():
+    from apibean.pytest.wrappers.overrides import ProviderOverlay, singleton_dependents
+
+    class Container(containers.DeclarativeContainer):
+        auth_service = providers.Factory(AuthService)
+        org_service = providers.Singleton(lambda auth: ("org", auth), auth_service)
+        other_service = providers.Singleton(AuthService)
+
+    container = Container()
+    org, other = container.org_service(), container.other_service()
+
+    overlay = ProviderOverlay(container, singleton_dependents(container))
+    overlay.override("auth_service", "fake")
+    assert container.auth_service() == "fake"
+    assert container.org_service() == ("org", "fake")
+    assert container.other_service() is other
+    assert overlay.changed == 2
+
+    overlay.restore()
+    assert isinstance(container.auth_service(), AuthService)
+    assert container.org_service() is not org
+    assert isinstance(container.org_service()[1], AuthService)
+    assert container.other_service() is other
+    assert not container.auth_service.overridden
+
+
+def test_provider_overlay_resets_dependent_wrapped_services():
+    from apibean.pytest.wrappers.overrides import ProviderOverlay, singleton_dependents
+
+    container, _ = make_container("cached")
+    wrapped = container.auth_service()
+
+    overlay = ProviderOverlay(container, singleton_dependents(container))
+    overlay.override("api_invoker", "mock")
+    assert container.auth_service()[1] == "mock"
+
+    overlay.restore()
+    assert container.auth_service()[1] == "invoker"
+    assert container.auth_service() is not wrapped
+
+
+def test_apibean_overrides_fixture_is_function_scoped(pytester):
+    pytester.makeconftest("""
+        import pytest
+        from dependency_injector import containers, providers
+
+        class Container(containers.DeclarativeContainer):
+            mail_service = providers.Object("smtp")
+
+        @pytest.fixture(scope="session")
+        def apibean_container():
+            return Container()
+
+        @pytest.fixture
+        def apibean_reset_db():
+            pass
+    """)
+    pytester.makepyfile("""
+        def test_override(apibean_overrides, apibean_container):
+            apibean_overrides.override("mail_service", "fake")
+            assert apibean_container.mail_service() == "fake"
+
+        def test_restored(apibean_container):
+            assert apibean_container.mail_service() == "smtp"
+    """)
+    pytester.runpytest().assert_outcomes(passed=2)
+
+
+def test_cached_services_reset_after_readonly_tests(pytester):
+    pytester.makeconftest("""
+        import pytest
+        from dependency_injector import containers, providers
+        from apibean.pytest.wrappers.container import ServiceWrappingMeta
+
+        class OrgService:
+            pass
+
+        class AppContainer(containers.DeclarativeContainer):
+            org_service = providers.Factory(OrgService)
+
+        class Container(AppContainer, metaclass=ServiceWrappingMeta,
+                        injected_func_name="inject_invoker", wrapping_mode="cached"):
+            api_invoker = providers.Object("invoker")
+            inject_invoker = lambda service, api_invoker: service
+
+        @pytest.fixture(scope="session")
+        def apibean_container():
+            return Container()
+
+        @pytest.fixture
+        def apibean_reset_db():
+            pass
+    """)
+    pytester.makepyfile("""
+        import pytest
+
+        SEEN = []
+
+        @pytest.mark.apibean_readonly
+        @pytest.mark.parametrize("i", range(2))
+        def test_readonly(apibean_container, i):
+            SEEN.append(apibean_container.org_service())
+
+        def test_plain(apibean_container):
+            service = apibean_container.org_service()
+            assert all(service is not seen for seen in SEEN)
+            assert SEEN[0] is not SEEN[1]
+    """)
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines(["*2 resets, 1 avoided*"])